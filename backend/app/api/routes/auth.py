@@ -1,12 +1,30 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.config import get_settings
+from app.core.principal import load_principal, prefs_claim
+from app.core.security import (
+    PasswordHasherBusy,
+    create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from app.db.query_log import query_budget
 from app.db.session import get_db
-from app.models import User
+from app.models import UsedRefreshToken, User
 from app.schemas.auth import (
     LoginRequest,
     LoginResponse,
+    RefreshRequest,
     SignupRequest,
     SignupResponse,
 )
@@ -14,23 +32,79 @@ from app.schemas.auth import (
 router = APIRouter()
 
 
-@router.post("/signup", response_model=SignupResponse)
-def signup(body: SignupRequest, db: Session = Depends(get_db)):
+def _hasher_busy() -> HTTPException:
+    """503 when the bcrypt pool is saturated; clients should retry shortly."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _issue_tokens(db: AsyncSession, user_id: UUID) -> LoginResponse:
+    """Access token (with the current preferences claim) + a new refresh token for user_id."""
+    principal = await load_principal(db, user_id)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    sub = str(principal.id)
+    return LoginResponse(
+        access_token=create_access_token({"sub": sub, "prefs": prefs_claim(principal)}),
+        refresh_token=create_refresh_token({"sub": sub}),
+        expires_in=get_settings().ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
+async def _consume_refresh_token(db: AsyncSession, user_id: UUID, payload: dict) -> bool:
+    """
+    Record the refresh token's jti as used; False if it was already used, has no jti or its user
+    no longer exists.
+    Also prunes a bounded batch of expired entries, so the table only holds unexpired tokens.
+    """
+    jti, exp = payload.get("jti"), payload.get("exp")
+    if not isinstance(jti, str) or not isinstance(exp, (int, float)):
+        return False
+    now = datetime.now(timezone.utc)
+    expired = select(UsedRefreshToken.jti).where(UsedRefreshToken.expires_at < now).limit(100)
+    await db.execute(delete(UsedRefreshToken).where(UsedRefreshToken.jti.in_(expired)))
+    stmt = (
+        insert(UsedRefreshToken)
+        .values(jti=jti, user_id=user_id, expires_at=datetime.fromtimestamp(exp, timezone.utc))
+        .on_conflict_do_nothing(index_elements=[UsedRefreshToken.jti])
+        .returning(UsedRefreshToken.jti)
+    )
+    try:
+        consumed = (await db.execute(stmt)).first() is not None
+        await db.commit()
+    except IntegrityError:  # user deleted
+        await db.rollback()
+        return False
+    return consumed
+
+
+@router.post("/signup", response_model=SignupResponse, dependencies=[query_budget(3)])
+async def signup(body: SignupRequest, db: AsyncSession = Depends(get_db)):
     """Register with email, name, and password."""
-    existing = db.query(User).filter(User.email == body.email).first()
+    existing = (await db.execute(select(User.id).where(User.email == body.email))).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Email already registered",
         )
+    try:
+        hashed = await hash_password_async(body.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     user = User(
         email=body.email,
         name=body.name,
-        hashed_password=hash_password(body.password),
+        hashed_password=hashed,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return SignupResponse(
         id=str(user.id),
         email=user.email,
@@ -38,14 +112,39 @@ def signup(body: SignupRequest, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/login", response_model=LoginResponse)
-def login(body: LoginRequest, db: Session = Depends(get_db)):
-    """Authenticate and return JWT."""
-    user = db.query(User).filter(User.email == body.email).first()
-    if not user or not verify_password(body.password, user.hashed_password):
+@router.post("/login", response_model=LoginResponse, dependencies=[query_budget(4)])
+async def login(body: LoginRequest, db: AsyncSession = Depends(get_db)):
+    """Authenticate and return JWT. Hashes made with an outdated BCRYPT_ROUNDS are upgraded here."""
+    user = (await db.execute(select(User).where(User.email == body.email))).scalar_one_or_none()
+    try:
+        valid = user is not None and await verify_password_async(body.password, user.hashed_password)
+        if valid and password_needs_rehash(user.hashed_password):
+            user.hashed_password = await hash_password_async(body.password)
+            await db.commit()
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
-    token = create_access_token({"sub": str(user.id)})
-    return LoginResponse(access_token=token)
+    return await _issue_tokens(db, user.id)
+
+
+@router.post("/refresh", response_model=LoginResponse, dependencies=[query_budget(4)])
+async def refresh(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access/refresh pair; the access token gets fresh preferences.
+    Refresh tokens are single use: the one sent is revoked, and sending it again gets 401.
+    """
+    payload = decode_refresh_token(body.refresh_token)
+    try:
+        user_id = UUID(payload["sub"]) if payload else None
+    except (KeyError, ValueError, TypeError):
+        user_id = None
+    if user_id is None or not await _consume_refresh_token(db, user_id, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    return await _issue_tokens(db, user_id)
@@ -1,23 +1,74 @@
 from dataclasses import dataclass
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.core.deps import get_current_user
-from app.models import User
+from app.core.deps import get_token_payload, user_id_from_payload
+from app.core.principal import load_principal, preferences_from_claim
+from app.core.responses import FastJSONResponse
+from app.core.timing import timed
+from app.db.query_log import query_budget
+from app.db.session import get_db
+from app.models.enums import SectionType
 from app.schemas.dashboard import (
     AiInsightResponse,
     DashboardResponse,
+    ItemVotes,
     MemeResponse,
     NewsResponse,
     PricesResponse,
 )
-from app.services.ai_insight_service import get_ai_insight
-from app.services.coin_service import get_prices
+from app.services.ai_insight_service import FALLBACK_INSIGHT, build_prompt, get_ai_insight, insight_version
+from app.services.coin_service import get_prices, prices_version
+from app.services.dashboard_service import (
+    SECTION_FRESH,
+    Fragment,
+    SectionJob,
+    assets_key,
+    cached_response,
+    collect_sections,
+    dashboard_etag,
+    encode_fragment,
+    etag_matches,
+    render_json_object,
+    section_fragment,
+    store_response,
+)
 from app.services.meme_service import get_meme
-from app.services.news_service import get_news
+from app.services.news_service import get_news, get_news_page, news_version
+from app.services.vote_service import dashboard_vote_items, get_item_votes
 
 router = APIRouter()
 
+# ?sections= names: the section types plus the names of the per-section endpoints
+SECTION_ALIASES: dict[str, str] = {
+    "news": SectionType.news.value,
+    "price": SectionType.price.value,
+    "prices": SectionType.price.value,
+    "ai": SectionType.ai.value,
+    "ai-insight": SectionType.ai.value,
+    "meme": SectionType.meme.value,
+    "memes": SectionType.meme.value,
+}
+
+# Empty encodings for skipped and timed-out sections
+EMPTY_SECTIONS: dict[str, Fragment] = {
+    "news": Fragment([], b"[]"),
+    "price": Fragment({}, b"{}"),
+    "ai": Fragment("", b'""'),
+    "meme": Fragment(None, b"null"),
+}
+
+# Source cache version per section, for the dashboard ETag (the insight's is per prompt: see get_dashboard)
+SECTION_VERSIONS = {"price": prices_version, "news": news_version}
+
+# Prices are read from the in-memory cache and called inline. News, AI insight and memes may do
+# blocking I/O (upstream HTTP, file reads), so async handlers run them in the threadpool.
+# Section endpoints return FastJSONResponse with the service results (see app.core.responses).
+
 
 @dataclass
 class DashboardContext:
@@ -29,103 +80,253 @@ class DashboardContext:
     investor_type: str  # e.g. "HODLer", "DayTrader" from preferences
 
 
-def get_dashboard_context(current_user: User = Depends(get_current_user)) -> DashboardContext:
-    """Dependency: extract assets, content_types, investor_type from current user's preferences."""
-    if not current_user.preferences:
+async def get_dashboard_context(
+    payload: dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> DashboardContext:
+    """
+    Dependency: assets, content_types, investor_type of the current user.
+    Built from the access token's "prefs" claim when present (no DB, no principal lookup);
+    tokens issued before onboarding fall back to the cached principal.
+    """
+    pref = preferences_from_claim(payload.get("prefs"))
+    if pref is None:
+        with timed("principal"):
+            user = await load_principal(db, user_id_from_payload(payload))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        pref = user.preferences
+    if pref is None:
         return DashboardContext(has_preferences=False, assets=[], content_types=[], investor_type="")
-    raw = current_user.preferences.content_types or []
-    content_types = [str(c).strip().lower() for c in raw if c is not None]
-    assets = current_user.preferences.assets
-    if not isinstance(assets, list):
-        assets = []
-    it = current_user.preferences.investor_type
-    investor_type = getattr(it, "value", str(it) if it else "") or ""
     return DashboardContext(
         has_preferences=True,
-        assets=list(assets),
-        content_types=content_types,
-        investor_type=investor_type or "",
+        assets=list(pref.assets),
+        content_types=list(pref.content_types),
+        investor_type=pref.investor_type,
+    )
+
+
+def parse_sections(raw: str | None, content_types: list[str]) -> list[str]:
+    """
+    Section types to compute, in dashboard order: from a comma-separated ?sections= value, else the
+    user's content_types (all sections if those name none). Raises ValueError for unknown names.
+    """
+    if raw is not None and raw.strip():
+        wanted = set()
+        for name in raw.split(","):
+            name = name.strip().lower()
+            if name not in SECTION_ALIASES:
+                raise ValueError(f"Unknown dashboard section: {name or '(empty)'}")
+            wanted.add(SECTION_ALIASES[name])
+    else:
+        wanted = {SECTION_ALIASES[c] for c in content_types if c in SECTION_ALIASES}
+    return [s.value for s in SectionType if not wanted or s.value in wanted]
+
+
+def _insight_fragment(ctx: DashboardContext, prompt: str) -> Fragment:
+    """Shared insight fragment per prompt; the static fallback is not shared (retried next request)."""
+    return section_fragment(
+        "ai",
+        prompt,
+        insight_version(prompt),
+        lambda: get_ai_insight(
+            assets=ctx.assets,
+            content_types=ctx.content_types,
+            investor_type=ctx.investor_type or None,
+        ),
+        shareable=lambda text: bool(text) and text != FALLBACK_INSIGHT,
     )
 
 
-@router.get("", response_model=DashboardResponse)
-def get_dashboard(ctx: DashboardContext = Depends(get_dashboard_context)) -> DashboardResponse:
-    """Aggregated dashboard: prices, news, AI insight, meme in one call. Requires onboarding."""
+@router.get("", response_model=DashboardResponse, dependencies=[query_budget(3)])
+async def get_dashboard(
+    request: Request,
+    sections: str | None = Query(
+        None,
+        max_length=100,
+        description="Comma-separated sections to compute: news, prices, ai, meme (default: the user's content_types)",
+    ),
+    ctx: DashboardContext = Depends(get_dashboard_context),
+    payload: dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Aggregated dashboard: prices, news, AI insight, meme in one call, plus vote totals and the
+    user's own vote for every item (one DB query). Requires onboarding.
+    Only the requested sections are computed; the others are left empty. News, AI insight and
+    meme run concurrently under DASHBOARD_DEADLINE: late sections are served stale or empty.
+    Prices, news and insight come as shared pre-encoded fragments (see dashboard_service), so
+    the body is assembled from bytes rather than validated through DashboardResponse.
+    Complete responses carry a weak ETag over their inputs and the votes they show; an unchanged
+    dashboard is served from the user's cached body once its votes are re-read from the DB, or as
+    304 Not Modified when If-None-Match matches.
+    """
     if not ctx.has_preferences:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Complete onboarding to see dashboard",
         )
-    prices, prices_message = get_prices(ctx.assets)
-    news, news_message = get_news(ctx.assets)
-    ai_insight = get_ai_insight(
-        assets=ctx.assets,
-        content_types=ctx.content_types,
-        investor_type=ctx.investor_type or None,
-    )
-    meme = get_meme(investor_type=ctx.investor_type or None)
-    
-    return DashboardResponse(
-        prices=prices,
-        news=news,
-        ai_insight=ai_insight,
-        meme=meme,
+    try:
+        wanted = parse_sections(sections, ctx.content_types)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Versions are read before computing, so a body is never cached under newer versions than its data
+    user_id = user_id_from_payload(payload)
+    investor_type = ctx.investor_type or None
+    # The prompt is the insight's profile key (see ai_insight_service)
+    prompt = build_prompt(assets=ctx.assets, content_types=ctx.content_types, investor_type=investor_type)
+    versions = [SECTION_VERSIONS[s]() for s in wanted if s in SECTION_VERSIONS]
+    if SectionType.ai.value in wanted:
+        versions.append(insight_version(prompt))
+    key = dashboard_etag(user_id, ctx, wanted, *versions) if None not in versions else None
+    headers = {"Cache-Control": "private, no-cache"}
+    cached = cached_response(user_id, key) if key is not None else None
+    current_votes = None
+    if cached is not None:
+        # Votes are read from the DB, so votes written through any worker are seen
+        with timed("votes"):
+            current_votes = await get_item_votes(db, user_id, list(cached.votes))
+        if current_votes == cached.votes:
+            headers["ETag"] = cached.etag
+            if etag_matches(request.headers.get("if-none-match"), cached.etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    fragments = dict(EMPTY_SECTIONS)
+    section_status: dict[str, str] = {}
+    assets = assets_key(ctx.assets)
+    if SectionType.price.value in wanted:
+        with timed("prices"):
+            fragments["price"] = section_fragment(
+                "price", assets, prices_version(), lambda: get_prices(list(assets))[0]
+            )
+        section_status[SectionType.price.value] = SECTION_FRESH
+
+    jobs: list[SectionJob] = []
+    if SectionType.news.value in wanted:
+        jobs.append(
+            SectionJob(
+                "news",
+                assets,
+                lambda: section_fragment("news", assets, news_version(), lambda: get_news(list(assets))[0]),
+            )
+        )
+    if SectionType.ai.value in wanted:
+        jobs.append(SectionJob("ai", prompt, lambda: _insight_fragment(ctx, prompt)))
+    if SectionType.meme.value in wanted:
+        jobs.append(
+            SectionJob("meme", investor_type, lambda: encode_fragment(get_meme(investor_type=investor_type)))
+        )
+    results = await collect_sections(jobs)
+    for name, result in results.items():
+        section_status[name] = result.status
+        if result.value is not None:
+            fragments[name] = result.value
+
+    items = dashboard_vote_items(
+        fragments["price"].value,
+        fragments["news"].value,
+        fragments["ai"].value,
+        fragments["meme"].value,
     )
+    if current_votes is not None and list(current_votes) == list(dict.fromkeys(items)):
+        item_votes = current_votes  # same items as the cached body: already read above
+    else:
+        with timed("votes"):
+            item_votes = await get_item_votes(db, user_id, items)
+    votes = [
+        ItemVotes(section_type=section, item_id=item_id, up=up, down=down, my_vote=mine)
+        for (section, item_id), (up, down, mine) in item_votes.items()
+    ]
+    with timed("render"):
+        body = render_json_object(
+            {
+                "news": fragments["news"].body,
+                "prices": fragments["price"].body,
+                "ai_insight": fragments["ai"].body,
+                "meme": fragments["meme"].body,
+                "votes": to_json(votes),
+                "sections": to_json(wanted),
+                "section_status": to_json({s: section_status[s] for s in wanted}),
+            }
+        )
+    # Partial responses are not reused (nor tagged): the next request should pick up the late sections
+    if key is not None and all(section_status[s] == SECTION_FRESH for s in wanted):
+        headers["ETag"] = store_response(user_id, key, item_votes, body).etag
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
-@router.get("/prices", response_model=PricesResponse)
-def get_dashboard_prices(ctx: DashboardContext = Depends(get_dashboard_context)) -> PricesResponse:
+@router.get("/prices", response_model=PricesResponse, dependencies=[query_budget(2)])
+async def get_dashboard_prices(ctx: DashboardContext = Depends(get_dashboard_context)) -> FastJSONResponse:
     """Coin prices in USD for the user's chosen assets. Empty prices + message if no assets."""
     if not ctx.has_preferences:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Complete onboarding to see prices",
         ) 
-    prices, message = get_prices(ctx.assets)
-    return PricesResponse(prices=prices, message=message)
+    with timed("prices"):
+        prices, message = get_prices(ctx.assets)
+    return FastJSONResponse({"prices": prices, "message": message})
 
 
-@router.get("/news", response_model=NewsResponse)
-def get_dashboard_news(ctx: DashboardContext = Depends(get_dashboard_context)) -> NewsResponse:
-    """Market news (CryptoCompare). Requires onboarding (preferences)."""
+@router.get("/news", response_model=NewsResponse, dependencies=[query_budget(2)])
+async def get_dashboard_news(
+    limit: int | None = Query(None, ge=1, description="Page size (default NEWS_LIMIT, capped at NEWS_MAX_PAGE_SIZE)"),
+    cursor: str | None = Query(None, max_length=512, description="next_cursor from the previous page"),
+    ctx: DashboardContext = Depends(get_dashboard_context),
+) -> FastJSONResponse:
+    """Market news (CryptoCompare), newest first and cursor-paginated. Requires onboarding (preferences)."""
     if not ctx.has_preferences:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Complete onboarding to see news",
         )
-    news, message = get_news(ctx.assets)
-    return NewsResponse(news=news, message=message)
+    try:
+        with timed("news"):
+            news, next_cursor, message = await run_in_threadpool(
+                get_news_page, ctx.assets, limit=limit, cursor=cursor
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse({"news": news, "next_cursor": next_cursor, "message": message})
 
 
-@router.get("/ai-insight", response_model=AiInsightResponse)
-def get_dashboard_ai_insight(ctx: DashboardContext = Depends(get_dashboard_context)) -> AiInsightResponse:
+@router.get("/ai-insight", response_model=AiInsightResponse, dependencies=[query_budget(2)])
+async def get_dashboard_ai_insight(ctx: DashboardContext = Depends(get_dashboard_context)) -> FastJSONResponse:
     """AI insight of the day. Requires onboarding (preferences)."""
     if not ctx.has_preferences:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Complete onboarding to see AI insight",
         )
-    return AiInsightResponse(
-        ai_insight=get_ai_insight(
+    with timed("ai"):
+        ai_insight = await run_in_threadpool(
+            get_ai_insight,
             assets=ctx.assets,
             content_types=ctx.content_types,
             investor_type=ctx.investor_type or None,
         )
-    )
+    return FastJSONResponse({"ai_insight": ai_insight})
 
 
-@router.get("/meme", response_model=MemeResponse)
-def get_dashboard_meme(ctx: DashboardContext = Depends(get_dashboard_context)) -> MemeResponse:
+@router.get("/meme", response_model=MemeResponse, dependencies=[query_budget(2)])
+async def get_dashboard_meme(ctx: DashboardContext = Depends(get_dashboard_context)) -> FastJSONResponse:
     """Fun crypto meme, chosen by investor_type. Requires onboarding (preferences)."""
     if not ctx.has_preferences:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Complete onboarding to see meme",
         )
-    meme = get_meme(investor_type=ctx.investor_type or None)
+    with timed("meme"):
+        meme = await run_in_threadpool(get_meme, investor_type=ctx.investor_type or None)
     if not meme:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="No meme available",
         )
-    return MemeResponse(meme=meme)
+    return FastJSONResponse({"meme": meme})
@@ -0,0 +1,47 @@
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.profiling import PROFILE_TOKEN_HEADER, has_profiling_token, list_profiles, load_profile
+
+# Mounted only when PROFILING_ENABLED (see main.py)
+
+
+def require_profiling_token(
+    token: str | None = Header(None, alias=PROFILE_TOKEN_HEADER),
+) -> None:
+    """Admin-only: the X-Profile-Token header must match PROFILING_TOKEN; otherwise 403."""
+    if not has_profiling_token(token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling token required")
+
+
+router = APIRouter(dependencies=[Depends(require_profiling_token)])
+
+
+@router.get("/profiles")
+async def get_profiles() -> list[dict[str, Any]]:
+    """Stored request profiles (metadata only), newest first."""
+    return await run_in_threadpool(list_profiles)
+
+
+@router.get("/profiles/{profile_id}", response_model=None)
+async def get_profile(
+    profile_id: str,
+    format: Literal["json", "collapsed"] = Query("json", description="json artifact or collapsed stacks"),
+) -> dict[str, Any] | PlainTextResponse:
+    """
+    One profile artifact. format=collapsed returns "frame;frame;... count" lines for flame graph
+    tools (flamegraph.pl, speedscope).
+    """
+    artifact = await run_in_threadpool(load_profile, profile_id)
+    if artifact is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "collapsed":
+        lines = [f"{stack} {count}" for stack, count in sorted(artifact["stacks"].items())]
+        return PlainTextResponse(
+            "\n".join(lines) + "\n",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed.txt"'},
+        )
+    return artifact
@@ -0,0 +1,37 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core.admission import admission_stats
+from app.db.pool_metrics import pool_status
+from app.db.session import async_engine, engine
+from app.services.vote_buffer import vote_buffer_stats
+
+router = APIRouter()
+
+
+@router.get("")
+async def health() -> dict[str, str]:
+    """Liveness check."""
+    return {"status": "ok"}
+
+
+@router.get("/db-pool")
+async def db_pool() -> dict[str, dict]:
+    """Connection pool gauges and checkout counters per engine (for sizing DB_POOL_*)."""
+    return {
+        "async": pool_status(async_engine.sync_engine, "async"),
+        "sync": pool_status(engine, "sync"),
+    }
+
+
+@router.get("/vote-buffer")
+async def vote_buffer() -> dict[str, Any]:
+    """Write-behind vote queue depth, oldest pending age and flush size/lag counters."""
+    return vote_buffer_stats()
+
+
+@router.get("/threadpool")
+async def threadpool() -> dict[str, Any]:
+    """Worker threadpool size, busy threads, queue depth and queueing delay (for sizing THREADPOOL_SIZE)."""
+    return admission_stats()
@@ -0,0 +1,101 @@
+from collections.abc import Iterable
+
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.admission import queue_delay
+from app.core.cache import cache_stats
+from app.core.metrics import Sample, render_metrics
+from app.core.singleflight import singleflight_stats
+from app.db.pool_metrics import pool_status
+from app.db.session import async_engine, engine
+from app.services.vote_buffer import vote_buffer_stats
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Values below are read when scraped: each source keeps its own counters already
+
+
+def _threadpool_threads() -> Iterable[Sample]:
+    limiter = current_default_thread_limiter()
+    stats = limiter.statistics()
+    yield {"state": "total"}, limiter.total_tokens
+    yield {"state": "busy"}, stats.borrowed_tokens
+    yield {"state": "waiting"}, stats.tasks_waiting
+
+
+def _threadpool_utilization() -> Iterable[Sample]:
+    limiter = current_default_thread_limiter()
+    total = limiter.total_tokens
+    yield {}, limiter.statistics().borrowed_tokens / total if total else 0.0
+
+
+def _threadpool_current_delay() -> Iterable[Sample]:
+    yield {}, queue_delay()
+
+
+def _ttl_cache_requests() -> Iterable[Sample]:
+    for name, stats in cache_stats().items():
+        yield {"cache": name, "result": "hit"}, stats["hits"]
+        yield {"cache": name, "result": "miss"}, stats["misses"]
+
+
+def _ttl_cache_entries() -> Iterable[Sample]:
+    for name, stats in cache_stats().items():
+        yield {"cache": name}, stats["size"]
+
+
+def _singleflight_calls() -> Iterable[Sample]:
+    for name, stats in singleflight_stats().items():
+        yield {"flight": name, "result": "executed"}, stats["executions"]
+        yield {"flight": name, "result": "coalesced"}, stats["coalesced"]
+
+
+def _pool_statuses() -> Iterable[tuple[str, dict]]:
+    yield "async", pool_status(async_engine.sync_engine, "async")
+    yield "sync", pool_status(engine, "sync")
+
+
+def _db_pool_connections() -> Iterable[Sample]:
+    for name, status in _pool_statuses():
+        for state in ("checked_out", "checked_in", "overflow"):
+            if state in status:
+                yield {"pool": name, "state": state}, status[state]
+
+
+def _db_pool_events() -> Iterable[Sample]:
+    for name, status in _pool_statuses():
+        for event in ("checkouts", "waits", "timeouts"):
+            yield {"pool": name, "event": event}, status[event]
+
+
+def _vote_buffer_pending() -> Iterable[Sample]:
+    stats = vote_buffer_stats()
+    yield {}, stats["pending"]
+
+
+_COLLECTORS = (
+    ("cache_requests_total", "counter", "", _ttl_cache_requests),
+    ("cache_entries", "gauge", "Entries held per TTL cache", _ttl_cache_entries),
+    ("threadpool_threads", "gauge", "Worker threadpool size, busy threads and tasks waiting", _threadpool_threads),
+    ("threadpool_utilization", "gauge", "Busy / total worker threads", _threadpool_utilization),
+    (
+        "threadpool_queue_delay_current_seconds",
+        "gauge",
+        "Current threadpool queueing delay estimate (admission control input)",
+        _threadpool_current_delay,
+    ),
+    ("singleflight_calls_total", "counter", "Coalesced upstream calls by result", _singleflight_calls),
+    ("db_pool_connections", "gauge", "Connection pool gauges per engine", _db_pool_connections),
+    ("db_pool_events_total", "counter", "Pool checkouts, waits and timeouts per engine", _db_pool_events),
+    ("vote_buffer_pending", "gauge", "Write-behind votes not yet flushed", _vote_buffer_pending),
+)
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition: request/provider latency, caches, fallbacks, threadpool, DB pool."""
+    return PlainTextResponse(render_metrics(_COLLECTORS), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_user
+from app.core.principal import CurrentUser
+from app.db.query_log import query_budget
 from app.db.session import get_db
-from app.models import User
 from app.schemas.preferences import OnboardingRequest, OnboardingResponse
 from app.services.preferences_service import save_preferences
 
 router = APIRouter()
 
 
-@router.post("/", response_model=OnboardingResponse)
-def onboarding(
+@router.post("/", response_model=OnboardingResponse, dependencies=[query_budget(5)])
+async def onboarding(
     body: OnboardingRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ) -> OnboardingResponse:
     """Save onboarding preferences (assets, investor type, content types). Allowed only once per user."""
     if current_user.preferences is not None:
@@ -22,7 +23,7 @@ def onboarding(
             status_code=status.HTTP_409_CONFLICT,
             detail="Onboarding already completed",
         )
-    pref = save_preferences(db, current_user.id, body)
+    pref = await save_preferences(db, current_user.id, body)
     return OnboardingResponse(
         id=str(pref.id),
         user_id=str(pref.user_id),
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends
 
 from app.core.deps import get_current_user
-from app.models import User
+from app.core.principal import CurrentUser
+from app.db.query_log import query_budget
 from app.schemas.user import UserMeResponse
 
 router = APIRouter()
 
 
-@router.get("/me", response_model=UserMeResponse)
-def me(current_user: User = Depends(get_current_user)) -> UserMeResponse:
+@router.get("/me", response_model=UserMeResponse, dependencies=[query_budget(2)])
+async def me(current_user: CurrentUser = Depends(get_current_user)) -> UserMeResponse:
     """Return current user (id, email, name, onboarding done)."""
     return UserMeResponse(
         id=str(current_user.id),
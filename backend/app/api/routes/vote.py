@@ -1,32 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, Literal
+from uuid import UUID
 
-from app.core.deps import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.deps import get_current_user, get_token_payload
+from app.core.principal import CurrentUser
+from app.core.responses import FastJSONResponse
+from app.db.query_log import query_budget
 from app.db.session import get_db
-from app.models import User
+from app.models.enums import SectionType
 from app.schemas.vote import (
+    VOTE_COUNTS_MAX_ITEMS,
+    VOTE_HISTORY_DEFAULT_PAGE_SIZE,
+    VOTE_HISTORY_MAX_PAGE_SIZE,
+    VoteBatchRequest,
+    VoteBatchResponse,
     VoteCancelRequest,
     VoteCancelResponse,
+    VoteCountsResponse,
+    VoteHistoryResponse,
     VoteRequest,
     VoteResponse,
 )
-from app.services.vote_service import cancel_vote, save_or_update_vote
+from app.services.vote_buffer import VoteBufferFull, enqueue_votes
+from app.services.vote_service import (
+    apply_vote_batch,
+    cancel_vote,
+    export_user_votes,
+    get_vote_counts,
+    list_user_votes,
+    save_or_update_vote,
+    top_voted,
+)
 
 router = APIRouter()
 
+# Responses are plain dicts of already-validated data returned as FastJSONResponse, which skips
+# response_model re-validation; response_model still documents them (see app.core.responses).
+
+
+async def _enqueue(user_id: UUID, operations: list[tuple]) -> None:
+    """Queue votes in write-behind mode; 400 for a blank item_id, 503 when the buffer is full."""
+    try:
+        await run_in_threadpool(enqueue_votes, user_id, operations)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except VoteBufferFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+
 
-@router.post("/", response_model=VoteResponse)
-def post_vote(
+@router.post("/", response_model=VoteResponse, dependencies=[query_budget(4)])
+async def post_vote(
     body: VoteRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> VoteResponse:
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
     """
     Cast or update a vote (up/down) for a dashboard item. Idempotent: same (section_type, item_id)
     updates the existing vote. Requires authentication.
+    In write-behind mode the vote is queued and the action is "queued".
     """
+    if settings.VOTE_WRITE_BEHIND:
+        await _enqueue(current_user.id, [("vote", body.section_type, body.item_id, body.vote_type)])
+        return FastJSONResponse({"status": "ok", "action": "queued"})
     try:
-        action = save_or_update_vote(
+        action = await save_or_update_vote(
             db=db,
             user_id=current_user.id,
             section_type=body.section_type,
@@ -35,20 +81,24 @@ def post_vote(
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    return VoteResponse(status="ok", action=action)
+    return FastJSONResponse({"status": "ok", "action": action})
 
 
-@router.delete("/", response_model=VoteCancelResponse)
-def delete_vote(
+@router.delete("/", response_model=VoteCancelResponse, dependencies=[query_budget(4)])
+async def delete_vote(
     body: VoteCancelRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> VoteCancelResponse:
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
     """
     Cancel (remove) a vote for the given section and item. Returns 404 if no vote existed.
+    In write-behind mode the cancel is queued (no 404) and the action is "queued".
     """
+    if settings.VOTE_WRITE_BEHIND:
+        await _enqueue(current_user.id, [("cancel", body.section_type, body.item_id, None)])
+        return FastJSONResponse({"status": "ok", "action": "queued"})
     try:
-        removed = cancel_vote(
+        removed = await cancel_vote(
             db=db,
             user_id=current_user.id,
             section_type=body.section_type,
@@ -61,4 +111,122 @@ def delete_vote(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No vote found for this section and item",
         )
-    return VoteCancelResponse(status="ok", action="cancelled")
+    return FastJSONResponse({"status": "ok", "action": "cancelled"})
+
+
+@router.post("/batch", response_model=VoteBatchResponse, dependencies=[query_budget(5)])
+async def post_vote_batch(
+    body: VoteBatchRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """
+    Apply up to VOTE_BATCH_MAX_OPERATIONS vote/cancel operations in one transaction.
+    Returns one result per operation, in request order. 400 (nothing applied) if an item_id is blank.
+    In write-behind mode the operations are queued and every action is "queued".
+    """
+    operations = [(o.op, o.section_type, o.item_id, o.vote_type) for o in body.operations]
+    if settings.VOTE_WRITE_BEHIND:
+        await _enqueue(current_user.id, operations)
+        return FastJSONResponse(
+            {
+                "status": "ok",
+                "results": [
+                    {"section_type": o.section_type.value, "item_id": o.item_id.strip(), "action": "queued"}
+                    for o in body.operations
+                ],
+            }
+        )
+    try:
+        results = await apply_vote_batch(
+            db=db,
+            user_id=current_user.id,
+            operations=operations,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse(
+        {
+            "status": "ok",
+            "results": [
+                {"section_type": section, "item_id": item_id, "action": action}
+                for section, item_id, action in results
+            ],
+        }
+    )
+
+
+@router.get("/counts", response_model=VoteCountsResponse, dependencies=[query_budget(1)])
+async def get_counts(
+    section_type: SectionType,
+    item_id: list[str] = Query(..., max_length=VOTE_COUNTS_MAX_ITEMS, description="Repeat for each item"),
+    _: dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """
+    Up/down totals for up to VOTE_COUNTS_MAX_ITEMS items of one section, in request order.
+    Items without votes are returned with zero counts.
+    """
+    counts = await get_vote_counts(db, section_type, item_id)
+    return FastJSONResponse(
+        {
+            "section_type": section_type,
+            "counts": [{"item_id": i, "up": up, "down": down} for i, (up, down) in counts.items()],
+        }
+    )
+
+
+@router.get("/top", response_model=VoteCountsResponse, dependencies=[query_budget(1)])
+async def get_top(
+    section_type: SectionType,
+    limit: int = Query(10, ge=1, le=VOTE_COUNTS_MAX_ITEMS),
+    _: dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """Most liked items of a section (highest up count first)."""
+    top = await top_voted(db, section_type, limit)
+    return FastJSONResponse(
+        {
+            "section_type": section_type,
+            "counts": [{"item_id": i, "up": up, "down": down} for i, up, down in top],
+        }
+    )
+
+
+@router.get("/mine", response_model=VoteHistoryResponse, dependencies=[query_budget(3)])
+async def get_my_votes(
+    limit: int = Query(VOTE_HISTORY_DEFAULT_PAGE_SIZE, ge=1, le=VOTE_HISTORY_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, max_length=512, description="next_cursor from the previous page"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """The current user's votes, newest first, keyset-paginated. 400 if the cursor is malformed."""
+    try:
+        rows, next_cursor = await list_user_votes(db, current_user.id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse(
+        {
+            "votes": [
+                {"section_type": section, "item_id": item_id, "vote_type": vote_type, "created_at": created_at}
+                for section, item_id, vote_type, created_at in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+_EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+@router.get("/mine/export", dependencies=[query_budget(2)])
+async def export_my_votes(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> StreamingResponse:
+    """Download all of the current user's votes (newest first), streamed from a server-side cursor."""
+    return StreamingResponse(
+        export_user_votes(current_user.id, export_format),
+        media_type=_EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="votes.{export_format}"'},
+    )
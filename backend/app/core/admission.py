@@ -0,0 +1,187 @@
+"""
+Threadpool sizing, queue-delay tracking and admission control.
+
+Blocking work (upstream HTTP in dashboard sections, file reads, inline hashing) runs in AnyIO's
+default threadpool, sized by THREADPOOL_SIZE. When all threads are busy, new work waits for a
+thread with nothing to show for it but latency. A probe measures that wait every
+ADMISSION_PROBE_INTERVAL seconds: it submits a no-op to the threadpool and times it until the
+result is back on the event loop, so event-loop lag is included too. While a probe is still
+waiting, its age counts as the current delay, so a saturated pool shows up at once rather than
+when the probe finally runs.
+
+AdmissionMiddleware rejects requests with 503 and Retry-After once the delay passes a per-priority
+threshold: low-priority requests (logins and signups: bcrypt; AI insight: upstream LLM) are shed at
+ADMISSION_MAX_QUEUE_DELAY, normal ones at twice that, and cheap cache reads (prices, vote counts)
+at four times that. /health and /metrics are never shed. The state is per process.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any
+
+from anyio.to_thread import current_default_thread_limiter
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+# Multiple of ADMISSION_MAX_QUEUE_DELAY at which each priority is shed
+SHED_FACTORS = {PRIORITY_LOW: 1.0, PRIORITY_NORMAL: 2.0, PRIORITY_HIGH: 4.0}
+
+# Cheap reads served from in-process caches
+HIGH_PRIORITY_PATHS = frozenset({"/dashboard/prices", "/vote/counts", "/vote/top"})
+# Expensive: bcrypt hashing, LLM generation
+LOW_PRIORITY_PATHS = frozenset({"/auth/login", "/auth/signup", "/dashboard/ai-insight"})
+# Never shed (health checks and scrapes must see the overload)
+EXEMPT_PREFIXES = ("/health", "/metrics")
+
+QUEUE_DELAY_BUCKETS: tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+QUEUE_DELAY_SECONDS = Histogram(
+    "threadpool_queue_delay_seconds",
+    "Time a probe waited for a worker thread and the event loop",
+    buckets=QUEUE_DELAY_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests shed with 503 because of threadpool queueing delay", ("priority",)
+)
+
+_probe: asyncio.Task | None = None
+_probe_started: float | None = None  # monotonic start of the probe in flight
+_last_delay = 0.0
+
+
+def configure_threadpool(size: int) -> None:
+    """Set the default threadpool size of the running event loop (call from a startup hook)."""
+    if size > 0:
+        current_default_thread_limiter().total_tokens = size
+
+
+def _noop() -> None:
+    pass
+
+
+async def probe_queue_delay() -> float:
+    """Measure one threadpool round trip (seconds) and record it as the latest delay."""
+    global _probe_started, _last_delay
+    start = _probe_started = time.monotonic()
+    try:
+        await run_in_threadpool(_noop)
+    finally:
+        _probe_started = None
+    _last_delay = time.monotonic() - start
+    QUEUE_DELAY_SECONDS.observe(_last_delay)
+    return _last_delay
+
+
+def queue_delay() -> float:
+    """Current queueing delay estimate: the last probe, or the age of the probe still waiting."""
+    started = _probe_started
+    waiting = time.monotonic() - started if started is not None else 0.0
+    return max(_last_delay, waiting)
+
+
+async def _probe_forever(interval: float) -> None:
+    while True:
+        try:
+            await probe_queue_delay()
+        except Exception:
+            logger.exception("Threadpool queue-delay probe failed")
+        await asyncio.sleep(interval)
+
+
+async def start_admission() -> None:
+    """Apply THREADPOOL_SIZE and start the queue-delay probe."""
+    global _probe
+    settings = get_settings()
+    configure_threadpool(settings.THREADPOOL_SIZE)
+    if _probe is None:
+        _probe = asyncio.create_task(_probe_forever(max(0.01, settings.ADMISSION_PROBE_INTERVAL)))
+
+
+async def stop_admission() -> None:
+    """Stop the queue-delay probe."""
+    global _probe
+    if _probe is not None:
+        _probe.cancel()
+        try:
+            await _probe
+        except asyncio.CancelledError:
+            pass
+        _probe = None
+
+
+def request_priority(method: str, path: str) -> str | None:
+    """Priority of a request; None for requests that are never shed."""
+    if method == "OPTIONS" or path.startswith(EXEMPT_PREFIXES):
+        return None
+    path = path.rstrip("/") or "/"
+    if path in HIGH_PRIORITY_PATHS:
+        return PRIORITY_HIGH
+    if path in LOW_PRIORITY_PATHS:
+        return PRIORITY_LOW
+    return PRIORITY_NORMAL
+
+
+def shed_threshold(priority: str) -> float:
+    """Queue delay (seconds) above which requests of this priority are rejected; 0 = never."""
+    return max(0.0, get_settings().ADMISSION_MAX_QUEUE_DELAY) * SHED_FACTORS[priority]
+
+
+def retry_after(delay: float) -> int:
+    """Retry-After seconds for a rejected request: the current delay, at least 1."""
+    return max(1, math.ceil(delay))
+
+
+def admission_stats() -> dict[str, Any]:
+    """Threadpool size, busy threads, queue depth and the current queueing delay (seconds)."""
+    limiter = current_default_thread_limiter()
+    stats = limiter.statistics()
+    return {
+        "size": limiter.total_tokens,
+        "busy": stats.borrowed_tokens,
+        "waiting": stats.tasks_waiting,
+        "queue_delay_seconds": queue_delay(),
+        "max_queue_delay_seconds": get_settings().ADMISSION_MAX_QUEUE_DELAY,
+    }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware: 503 + Retry-After when queueing delay exceeds the request's shed threshold."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            priority = request_priority(scope["method"], scope["path"])
+            if priority is not None:
+                threshold = shed_threshold(priority)
+                delay = queue_delay()
+                if threshold and delay > threshold:
+                    ADMISSION_REJECTED.inc(priority)
+                    response = JSONResponse(
+                        {"detail": "Server is busy, please retry"},
+                        status_code=503,
+                        headers={"Retry-After": str(retry_after(delay))},
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+
+def clear_admission() -> None:
+    """Reset the recorded queue delay (for tests)."""
+    global _probe_started, _last_delay
+    _probe_started = None
+    _last_delay = 0.0
@@ -17,16 +17,69 @@ class Settings:
         self.POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
         self.POSTGRES_PORT: int = int(os.getenv("POSTGRES_PORT", "5432"))
         self.POSTGRES_DB: str = os.getenv("POSTGRES_DB", "ai_crypto_advisor")
+        # Disable connection pooling for the async engine (e.g. tests, where each TestClient
+        # request may run on its own event loop and pooled asyncpg connections can't be shared)
+        self.DB_NULL_POOL: bool = os.getenv("DB_NULL_POOL", "false").lower() in ("1", "true", "yes")
+        # Connection pool: persistent connections, extra burst connections, max connection age (s)
+        # and how long a request waits for a free connection before failing (s)
+        self.DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+        self.DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        # Log statements taking at least this many ms (parameters redacted); 0 disables
+        self.SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+        # Raise instead of warn when an endpoint exceeds its query budget (set by the test suite)
+        self.QUERY_BUDGET_STRICT: bool = os.getenv("QUERY_BUDGET_STRICT", "false").lower() in ("1", "true", "yes")
 
         # App
         self.PROJECT_NAME: str = os.getenv("PROJECT_NAME", "AI Crypto Advisor")
+        # Fraction of requests timed (Server-Timing header + timing log line); 0 disables, 1 times all
+        self.TIMING_SAMPLE_RATE: float = float(os.getenv("TIMING_SAMPLE_RATE", "0.01"))
+        # Worker threads for blocking work (AnyIO's default threadpool, 40 threads by default)
+        self.THREADPOOL_SIZE: int = int(os.getenv("THREADPOOL_SIZE", "40"))
+        # Admission control: shed requests with 503 once threadpool queueing delay (s, measured by a
+        # probe every ADMISSION_PROBE_INTERVAL s) passes this, scaled by priority; 0 disables shedding
+        self.ADMISSION_MAX_QUEUE_DELAY: float = float(os.getenv("ADMISSION_MAX_QUEUE_DELAY", "0.5"))
+        self.ADMISSION_PROBE_INTERVAL: float = float(os.getenv("ADMISSION_PROBE_INTERVAL", "0.1"))
+        # Request profiling (off by default; when off the profiler is not installed at all).
+        # A request is profiled when it sends X-Profile-Token: <PROFILING_TOKEN> or is sampled at
+        # PROFILING_SAMPLE_RATE; artifacts (at most PROFILING_MAX_ARTIFACTS) go to PROFILING_DIR
+        self.PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+        self.PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+        self.PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+        self.PROFILING_DIR: str = os.getenv("PROFILING_DIR", "")
+        self.PROFILING_MAX_ARTIFACTS: int = int(os.getenv("PROFILING_MAX_ARTIFACTS", "50"))
 
         # JWT
         self.SECRET_KEY: str = os.getenv("SECRET_KEY", "")
         self.ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-        self.ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
-            os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", str(60 * 24 * 7))
+        # Access tokens are short-lived (they carry a preferences snapshot); refresh tokens renew them
+        self.ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+        self.REFRESH_TOKEN_EXPIRE_MINUTES: int = int(
+            os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", str(60 * 24 * 7))
         )
+        # Verified-token cache (token digest -> payload; entries never outlive the token's exp)
+        self.JWT_CACHE_TTL: int = int(os.getenv("JWT_CACHE_TTL", "3600"))
+        self.JWT_CACHE_MAX_SIZE: int = int(os.getenv("JWT_CACHE_MAX_SIZE", "10000"))
+
+        # Password hashing (bcrypt in a dedicated process pool; 0 workers = hash in the request thread)
+        self.BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+        self.BCRYPT_POOL_WORKERS: int = int(os.getenv("BCRYPT_POOL_WORKERS", "2"))
+        self.BCRYPT_QUEUE_SIZE: int = int(os.getenv("BCRYPT_QUEUE_SIZE", "32"))
+
+        # Authenticated-principal cache (user + preferences snapshot per user id). Per process: a
+        # preferences save invalidates only its own worker's entry, others keep theirs up to the TTL
+        self.PRINCIPAL_CACHE_TTL: int = int(os.getenv("PRINCIPAL_CACHE_TTL", "300"))
+        self.PRINCIPAL_CACHE_MAX_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+        # Write-behind votes: acknowledge after an fsync'd append to a local log; a background task
+        # flushes the merged latest state per (user, item) to the DB in batches
+        self.VOTE_WRITE_BEHIND: bool = os.getenv("VOTE_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+        self.VOTE_LOG_PATH: str = os.getenv("VOTE_LOG_PATH", "")
+        self.VOTE_BUFFER_MAX_PENDING: int = int(os.getenv("VOTE_BUFFER_MAX_PENDING", "10000"))
+        self.VOTE_FLUSH_INTERVAL: float = float(os.getenv("VOTE_FLUSH_INTERVAL", "0.5"))
+        self.VOTE_FLUSH_MAX_BATCH: int = int(os.getenv("VOTE_FLUSH_MAX_BATCH", "500"))
 
         # CoinGecko
         self.COINGECKO_API_KEY: str = os.getenv("COINGECKO_API_KEY", "")
@@ -34,6 +87,10 @@ class Settings:
             "COINGECKO_API_URL", "https://api.coingecko.com/api/v3/simple/price"
         )
         self.COINGECKO_TIMEOUT: float = float(os.getenv("COINGECKO_TIMEOUT", "10"))
+        # Binance (prices fallback)
+        self.BINANCE_TICKER_URL: str = os.getenv(
+            "BINANCE_TICKER_URL", "https://api.binance.com/api/v3/ticker/price"
+        )
 
         # CryptoCompare (news)
         self.CRYPTOCOMPARE_NEWS_URL: str = os.getenv(
@@ -41,8 +98,11 @@ class Settings:
         )
         self.NEWS_TIMEOUT: float = float(os.getenv("NEWS_TIMEOUT", "10"))
         self.NEWS_LIMIT: int = int(os.getenv("NEWS_LIMIT", "10"))
+        self.NEWS_MAX_PAGE_SIZE: int = int(os.getenv("NEWS_MAX_PAGE_SIZE", "50"))
+        self.NEWS_CACHE_TTL: int = int(os.getenv("NEWS_CACHE_TTL", "300"))
         self.STATIC_NEWS_PATH: str = os.getenv("STATIC_NEWS_PATH", "")
         self.MEMES_JSON_PATH: str = os.getenv("MEMES_JSON_PATH", "")
+        self.MEMES_CACHE_TTL: int = int(os.getenv("MEMES_CACHE_TTL", "300"))
 
         # CryptoPanic (optional – unused; kept for reference)
         self.CRYPTOPANIC_API_KEY: str = os.getenv("CRYPTOPANIC_API_KEY", "")
@@ -63,16 +123,42 @@ class Settings:
         self.OPENROUTER_TEMPERATURE: float = float(os.getenv("OPENROUTER_TEMPERATURE", "0.3"))
         self.OPENROUTER_REFERER: str = os.getenv("OPENROUTER_REFERER", "")
         self.OPENROUTER_TITLE: str = os.getenv("OPENROUTER_TITLE", "")
-
-    @property
-    def database_url(self) -> str:
+        self.AI_INSIGHT_CACHE_TTL: int = int(os.getenv("AI_INSIGHT_CACHE_TTL", "3600"))
+        self.AI_INSIGHT_CACHE_MAX_SIZE: int = int(os.getenv("AI_INSIGHT_CACHE_MAX_SIZE", "1000"))
+
+        # GET /dashboard deadlines (seconds): a section missing min(its budget, DASHBOARD_DEADLINE) is
+        # served from its last good value (kept DASHBOARD_STALE_TTL seconds) or left empty. 0 = no limit.
+        self.DASHBOARD_DEADLINE: float = float(os.getenv("DASHBOARD_DEADLINE", "3"))
+        self.DASHBOARD_NEWS_BUDGET: float = float(os.getenv("DASHBOARD_NEWS_BUDGET", "2"))
+        self.DASHBOARD_AI_BUDGET: float = float(os.getenv("DASHBOARD_AI_BUDGET", "2.5"))
+        self.DASHBOARD_MEME_BUDGET: float = float(os.getenv("DASHBOARD_MEME_BUDGET", "1"))
+        self.DASHBOARD_STALE_TTL: int = int(os.getenv("DASHBOARD_STALE_TTL", "86400"))
+        # Pre-serialized prices/news/insight sections shared by users with the same assets (profile)
+        self.DASHBOARD_FRAGMENT_TTL: int = int(os.getenv("DASHBOARD_FRAGMENT_TTL", "60"))
+        self.DASHBOARD_FRAGMENT_MAX_SIZE: int = int(os.getenv("DASHBOARD_FRAGMENT_MAX_SIZE", "5000"))
+        # Last rendered /dashboard body per user, served (or answered 304) while its inputs are unchanged
+        # and the votes it shows, re-read from the DB on every request, still match
+        self.DASHBOARD_RESPONSE_CACHE_TTL: int = int(os.getenv("DASHBOARD_RESPONSE_CACHE_TTL", "30"))
+        self.DASHBOARD_RESPONSE_CACHE_MAX_SIZE: int = int(os.getenv("DASHBOARD_RESPONSE_CACHE_MAX_SIZE", "10000"))
+
+    def _postgres_url(self, driver: str) -> str:
         user = quote_plus(self.POSTGRES_USER)
         password = quote_plus(self.POSTGRES_PASSWORD)
         return (
-            f"postgresql://{user}:{password}@"
+            f"postgresql+{driver}://{user}:{password}@"
             f"{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def database_url(self) -> str:
+        """Sync URL (psycopg2): schema creation and scripts."""
+        return self._postgres_url("psycopg2")
+
+    @property
+    def async_database_url(self) -> str:
+        """Async URL (asyncpg): request handling."""
+        return self._postgres_url("asyncpg")
+
 
 @lru_cache
 def get_settings() -> Settings:
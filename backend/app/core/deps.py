@@ -1,46 +1,61 @@
+from typing import Any
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principal import CurrentUser, load_principal
 from app.core.security import decode_access_token
+from app.core.timing import timed
 from app.db.session import get_db
-from app.models import User
 
 security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+def get_token_payload(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Require a valid JWT and return the current user; otherwise raise 401."""
+) -> dict[str, Any]:
+    """Require a valid access token and return its claims; otherwise raise 401. No DB access."""
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    payload = decode_access_token(credentials.credentials)
+    with timed("auth"):
+        payload = decode_access_token(credentials.credentials)
     if not payload or "sub" not in payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
+
+
+def user_id_from_payload(payload: dict[str, Any]) -> UUID:
+    """The token subject as a user id; 401 if it is not a UUID."""
     try:
-        user_id = UUID(payload["sub"])
+        return UUID(payload["sub"])
     except (ValueError, TypeError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.execute(
-        select(User).options(selectinload(User.preferences)).where(User.id == user_id)
-    ).scalar_one_or_none()
+
+
+async def get_current_user(
+    payload: dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> CurrentUser:
+    """
+    Require a valid JWT and return the current user; otherwise raise 401.
+    The user is served from the principal cache; the DB is queried only on a miss.
+    """
+    with timed("principal"):
+        user = await load_principal(db, user_id_from_payload(payload))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
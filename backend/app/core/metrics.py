@@ -0,0 +1,273 @@
+"""
+In-process metrics with Prometheus text exposition (GET /metrics).
+
+Counters and histograms are sharded per thread: each thread updates its own dicts without a
+lock (the event loop thread and each threadpool worker have one shard), and a scrape sums the
+shards. Shards of threads that have exited (AnyIO retires idle workers) are folded into one
+retired shard, so the shard list stays as long as the number of live threads. Gauges and
+counters kept elsewhere (caches, pools, buffers) are read at scrape time by collectors passed to
+render_metrics, so the request path pays nothing for them.
+"""
+
+import bisect
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets (seconds) for request and provider histograms; the last bucket is +Inf
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (metric name, label values) -> value / histogram row
+_Key = tuple[str, tuple[str, ...]]
+# A collected sample: (labels, value)
+Sample = tuple[dict[str, str], float]
+
+
+class _Shard:
+    """One thread's metric values; written only by its owning thread."""
+
+    __slots__ = ("counters", "histograms", "owner")
+
+    def __init__(self, owner: threading.Thread | None = None) -> None:
+        self.counters: dict[_Key, float] = {}
+        # row: bucket counts (len(buckets) + 1 for +Inf), then the sum of observed values
+        self.histograms: dict[_Key, list[float]] = {}
+        self.owner = weakref.ref(owner) if owner is not None else None
+
+    def alive(self) -> bool:
+        owner = self.owner() if self.owner is not None else None
+        return owner is not None and owner.is_alive()
+
+    def merge_into(self, target: "_Shard") -> None:
+        for key, value in self.counters.items():
+            target.counters[key] = target.counters.get(key, 0.0) + value
+        for key, row in self.histograms.items():
+            total = target.histograms.setdefault(key, [0.0] * len(row))
+            for i, v in enumerate(row):
+                total[i] += v
+
+
+_local = threading.local()
+_shards: list[_Shard] = []
+_shards_lock = threading.Lock()  # taken once per thread, when its shard is created, and per scrape
+_retired = _Shard()  # values recorded by threads that have exited; written under _shards_lock
+_families: dict[str, "_Metric"] = {}
+
+
+def _fold_dead_shards() -> None:
+    """Move the values of exited threads into _retired (call with _shards_lock held)."""
+    live = []
+    for shard in _shards:
+        if shard.alive():
+            live.append(shard)
+        else:
+            shard.merge_into(_retired)  # its thread is gone: nothing writes to it any more
+    _shards[:] = live
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard(threading.current_thread())
+        with _shards_lock:
+            _fold_dead_shards()
+            _shards.append(shard)
+    return shard
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        _families[name] = self
+
+
+class Counter(_Metric):
+    """Monotonic counter; inc() takes one value per label name."""
+
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        counters = _shard().counters
+        key = (self.name, labels)
+        counters[key] = counters.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    """Cumulative histogram over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        histograms = _shard().histograms
+        key = (self.name, labels)
+        row = histograms.get(key)
+        if row is None:
+            row = histograms[key] = [0.0] * (len(self.buckets) + 2)
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of the block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route", "status")
+)
+PROVIDER_REQUEST_SECONDS = Histogram(
+    "provider_request_duration_seconds", "Upstream HTTP call latency", ("provider", "outcome")
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by result (hit or miss)", ("cache", "result"))
+FALLBACKS = Counter(
+    "provider_fallbacks_total", "Times a fallback replaced a failed upstream provider", ("fallback",)
+)
+
+
+@contextmanager
+def track_provider(provider: str) -> Iterator[None]:
+    """Observe an upstream call's latency; outcome is "error" if the block raises."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        PROVIDER_REQUEST_SECONDS.observe(time.perf_counter() - start, provider, outcome)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_metrics(collectors: Iterable[tuple[str, str, str, Callable[[], Iterable[Sample]]]] = ()) -> str:
+    """
+    Prometheus text exposition of all counters/histograms plus collector output.
+    A collector is (family name, type, help, fn) where fn returns that family's samples; it may
+    add samples to a family also fed by a Counter (e.g. cache_requests_total).
+    """
+    with _shards_lock:
+        _fold_dead_shards()
+        shards = list(_shards)
+        retired = _Shard()
+        _retired.merge_into(retired)
+    counters: dict[_Key, float] = {}
+    histograms: dict[_Key, list[float]] = {}
+    for shard in [retired, *shards]:
+        for key, value in shard.counters.copy().items():
+            counters[key] = counters.get(key, 0.0) + value
+        for key, row in shard.histograms.copy().items():
+            total = histograms.setdefault(key, [0.0] * len(row))
+            for i, v in enumerate(list(row)):
+                total[i] += v
+
+    families: dict[str, tuple[str, str, list[str]]] = {
+        name: (m.type_name, m.help, []) for name, m in _families.items()
+    }
+    for (name, labels), value in sorted(counters.items()):
+        labels_text = _format_labels(dict(zip(_families[name].labelnames, labels)))
+        families[name][2].append(f"{name}{labels_text} {_format_value(value)}")
+    for (name, labels), row in sorted(histograms.items()):
+        metric = _families[name]
+        base = dict(zip(metric.labelnames, labels))
+        lines = families[name][2]
+        cumulative = 0.0
+        for bound, count in zip([*map(str, metric.buckets), "+Inf"], row[:-1]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels({**base, 'le': bound})} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{_format_labels(base)} {_format_value(row[-1])}")
+        lines.append(f"{name}_count{_format_labels(base)} {_format_value(cumulative)}")
+
+    for name, type_name, help_text, collect in collectors:
+        lines = families.setdefault(name, (type_name, help_text, []))[2]
+        for labels, value in collect():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    out: list[str] = []
+    for name, (type_name, help_text, lines) in families.items():
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {type_name}")
+        out.extend(lines)
+    return "\n".join(out) + "\n"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Matched path with parameter values put back as {name} (e.g. /users/{id}), or "unmatched".
+    Templates keep the label set bounded: unknown paths (404s, scans) share one label.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    params: dict[str, Any] = scope.get("path_params") or {}
+    if not params:
+        return scope["path"]
+    names = {str(v): k for k, v in params.items()}
+    return "/".join(f"{{{names[s]}}}" if s in names else s for s in scope["path"].split("/"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request latency per (method, route template, status)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, scope["method"], route_template(scope), str(status_code)
+            )
+
+
+def clear_metrics() -> None:
+    """Reset all counters and histograms (for tests)."""
+    with _shards_lock:
+        for shard in [*_shards, _retired]:
+            shard.counters.clear()
+            shard.histograms.clear()
@@ -0,0 +1,143 @@
+"""
+Authenticated principal: a detached, immutable snapshot of the user plus preferences.
+Cached per user id (TTL + LRU) so authenticated requests skip the users/preferences query.
+Invalidated when preferences are saved and when a user row is deleted. Invalidation only reaches
+the current process: other workers keep their cached principal for up to PRINCIPAL_CACHE_TTL.
+The preferences snapshot is also embedded in access tokens as a compact, versioned claim.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.models import User
+
+
+@dataclass(frozen=True)
+class PreferencesSnapshot:
+    """Onboarding preferences as plain values (content_types normalized to lowercase)."""
+
+    assets: tuple[str, ...]
+    investor_type: str  # e.g. "HODLer"
+    content_types: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """The authenticated user; safe to share between requests (no session attached)."""
+
+    id: UUID
+    email: str
+    name: str
+    preferences: PreferencesSnapshot | None
+
+
+# Version of the "prefs" access-token claim; tokens with another version fall back to a lookup
+PREFS_CLAIM_VERSION = 1
+
+_principal_cache = TTLCache(
+    maxsize=get_settings().PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=get_settings().PRINCIPAL_CACHE_TTL,
+    name="principal",
+)
+# Bumped by every invalidation; user_id -> generation of the user's last invalidation. A load that
+# started before the user's last invalidation does not fill the cache (it may have read old rows).
+_generation = 0
+_invalidated = TTLCache(
+    maxsize=get_settings().PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=get_settings().PRINCIPAL_CACHE_TTL,
+)
+_generation_lock = threading.Lock()
+
+
+def principal_from_user(user: User) -> CurrentUser:
+    """Build the immutable snapshot from a loaded User (preferences must be loaded)."""
+    pref = user.preferences
+    snapshot: PreferencesSnapshot | None = None
+    if pref is not None:
+        assets = pref.assets if isinstance(pref.assets, list) else []
+        raw = pref.content_types if isinstance(pref.content_types, list) else []
+        it = pref.investor_type
+        snapshot = PreferencesSnapshot(
+            assets=tuple(str(a) for a in assets),
+            investor_type=getattr(it, "value", str(it) if it else "") or "",
+            content_types=tuple(str(c).strip().lower() for c in raw if c is not None),
+        )
+    return CurrentUser(id=user.id, email=user.email, name=user.name, preferences=snapshot)
+
+
+async def load_principal(db: AsyncSession, user_id: UUID) -> CurrentUser | None:
+    """Return the principal for user_id from cache, or load it from the DB; None if no such user."""
+    principal = _principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    with _generation_lock:
+        started = _generation
+    result = await db.execute(
+        select(User).options(selectinload(User.preferences)).where(User.id == user_id)
+    )
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    principal = principal_from_user(user)
+    with _generation_lock:
+        if _invalidated.get(user_id, 0) <= started:
+            _principal_cache.set(user_id, principal)
+    return principal
+
+
+def prefs_claim(principal: CurrentUser) -> dict[str, Any] | None:
+    """Compact "prefs" claim for access tokens; None before onboarding."""
+    pref = principal.preferences
+    if pref is None:
+        return None
+    return {
+        "v": PREFS_CLAIM_VERSION,
+        "a": list(pref.assets),
+        "c": list(pref.content_types),
+        "i": pref.investor_type,
+    }
+
+
+def preferences_from_claim(claim: Any) -> PreferencesSnapshot | None:
+    """Parse a "prefs" claim; None when absent, malformed or of another version."""
+    if not isinstance(claim, dict) or claim.get("v") != PREFS_CLAIM_VERSION:
+        return None
+    assets, content_types, investor_type = claim.get("a"), claim.get("c"), claim.get("i")
+    if not isinstance(assets, list) or not isinstance(content_types, list) or not isinstance(investor_type, str):
+        return None
+    return PreferencesSnapshot(
+        assets=tuple(str(a) for a in assets),
+        investor_type=investor_type,
+        content_types=tuple(str(c) for c in content_types),
+    )
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    """
+    Drop the cached principal (call after committing user or preferences changes); loads already
+    in flight for this user will not cache what they read. Affects this process only.
+    """
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        _invalidated.set(user_id, _generation)
+        _principal_cache.pop(user_id)
+
+
+def clear_principal_cache() -> None:
+    """Clear the in-memory principal cache (for tests)."""
+    _principal_cache.clear()
+    _invalidated.clear()
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target: User) -> None:
+    invalidate_principal(target.id)
@@ -0,0 +1,222 @@
+"""
+Opt-in request profiling (PROFILING_ENABLED). A profiled request is sampled by a background thread
+that records the Python stack of every busy thread every PROFILING_INTERVAL_MS: the event loop and
+the worker threads its run_in_threadpool calls land on. The result is stored as a JSON artifact
+(request metadata, top functions, collapsed stacks for flame graphs) under PROFILING_DIR and served
+by /debug/profiles. Profiled responses carry an X-Profile-Id header.
+
+- Selection: header X-Profile-Token equal to PROFILING_TOKEN, or a PROFILING_SAMPLE_RATE fraction.
+- One request is profiled at a time; requests arriving meanwhile run unprofiled.
+- Samples cover all busy threads, so work of concurrent requests shows up too: profile on a quiet
+  instance (or read the request's own frames) when that matters.
+- Disabled: main.py installs neither the middleware nor the routes, so there is no per-request cost.
+"""
+
+import hmac
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+TOP_FUNCTIONS = 40
+
+# Default artifact directory when PROFILING_DIR not set (backend/data/profiles)
+_DEFAULT_PROFILE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "profiles"
+_SOURCE_ROOT = str(Path(__file__).resolve().parent.parent.parent) + "/"
+
+# Top-of-stack functions of a thread that is waiting for work rather than running
+_IDLE_FRAMES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+
+_active = threading.Lock()  # held while a request is being profiled
+
+
+def profile_dir() -> Path:
+    """Artifact directory: from env PROFILING_DIR or default backend/data/profiles."""
+    settings = get_settings()
+    if (settings.PROFILING_DIR or "").strip():
+        return Path(settings.PROFILING_DIR.strip())
+    return _DEFAULT_PROFILE_DIR
+
+
+def has_profiling_token(token: str | None) -> bool:
+    """True when PROFILING_TOKEN is set and `token` matches it."""
+    expected = get_settings().PROFILING_TOKEN
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def _frame_label(code: Any) -> str:
+    filename = code.co_filename
+    if filename.startswith(_SOURCE_ROOT):
+        filename = filename[len(_SOURCE_ROOT):]
+    else:
+        filename = "/".join(filename.rsplit("/", 2)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Background thread collecting collapsed stacks (outermost first) of busy threads."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = max(0.001, interval)
+        self.stacks: dict[str, int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (code.co_filename.rsplit("/", 1)[-1], code.co_name) in _IDLE_FRAMES:
+                    continue
+                stack: list[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                key = ";".join([names.get(ident, str(ident)), *reversed(stack)])
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+
+def top_functions(stacks: dict[str, int], limit: int = TOP_FUNCTIONS) -> list[dict[str, Any]]:
+    """Functions by samples in which they were on the stack (total) and on top (self)."""
+    total: dict[str, int] = {}
+    self_: dict[str, int] = {}
+    for key, count in stacks.items():
+        frames = key.split(";")[1:]
+        for name in set(frames):
+            total[name] = total.get(name, 0) + count
+        if frames:
+            self_[frames[-1]] = self_.get(frames[-1], 0) + count
+    ranked = sorted(total, key=lambda n: (-total[n], n))[:limit]
+    return [{"function": n, "total": total[n], "self": self_.get(n, 0)} for n in ranked]
+
+
+def _save_artifact(artifact: dict[str, Any]) -> None:
+    """Write one artifact and drop the oldest beyond PROFILING_MAX_ARTIFACTS."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{artifact['id']}.json").write_text(json.dumps(artifact), encoding="utf-8")
+    keep = max(1, get_settings().PROFILING_MAX_ARTIFACTS)
+    files = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[keep:]:
+        old.unlink(missing_ok=True)
+
+
+def list_profiles() -> list[dict[str, Any]]:
+    """Metadata of stored artifacts, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    out: list[dict[str, Any]] = []
+    for path in sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            artifact = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        out.append({k: v for k, v in artifact.items() if k not in ("stacks", "top")})
+    return out
+
+
+def load_profile(profile_id: str) -> dict[str, Any] | None:
+    """One artifact by id, or None if the id is malformed or unknown."""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = profile_dir() / f"{profile_id}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: profiles selected requests (see module docstring)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    def _trigger(self, scope: Scope) -> str | None:
+        for name, value in scope.get("headers") or ():
+            if name == b"x-profile-token":
+                return "header" if has_profiling_token(value.decode("latin-1")) else None
+        rate = get_settings().PROFILING_SAMPLE_RATE
+        if rate > 0 and random.random() < rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None or not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        sampler = StackSampler(get_settings().PROFILING_INTERVAL_MS / 1000)
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            duration_ms = (time.perf_counter() - start) * 1000
+            _active.release()
+            artifact = {
+                "id": profile_id,
+                "started_at": started_at.isoformat(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_template(scope),
+                "status": status_code,
+                "duration_ms": round(duration_ms, 2),
+                "trigger": trigger,
+                "interval_ms": sampler.interval * 1000,
+                "samples": sampler.samples,
+                "top": top_functions(sampler.stacks),
+                "stacks": sampler.stacks,
+            }
+            try:
+                await run_in_threadpool(_save_artifact, artifact)
+            except OSError as e:
+                logger.warning("Could not store request profile %s: %s", profile_id, e)
@@ -0,0 +1,57 @@
+"""
+Fast JSON responses for hot endpoints (/dashboard*, /vote).
+
+Routes return FastJSONResponse with plain dicts and lists of already-validated data (service
+results, DB rows, NewsItem/MemeItem models). The content is encoded with orjson (stdlib json
+when orjson is not installed) with the same output as pydantic's JSON mode (e.g. UTC datetimes
+end in "Z"). Returning a Response skips FastAPI's response_model re-validation and dump; the
+route's response_model still documents the schema in OpenAPI.
+"""
+
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.timing import timed
+
+try:
+    import orjson
+except ImportError:  # optional dependency: stdlib json below
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types the encoders don't handle natively (stdlib json: also datetime, UUID, Enum)."""
+    if isinstance(obj, BaseModel):
+        # model_dump() without its argument handling; this runs once per model in a list
+        return obj.__pydantic_serializer__.to_python(obj, mode="json", by_alias=True)
+    if isinstance(obj, datetime):
+        text = obj.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, with pydantic models, datetimes, UUIDs and enums encoded as pydantic would."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with dumps(); records body rendering as "render"."""
+
+    def render(self, content: Any) -> bytes:
+        with timed("render"):
+            return dumps(content)
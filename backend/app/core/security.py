@@ -1,34 +1,166 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import bcrypt
 from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
 
+T = TypeVar("T")
+
+# "typ" claim of refresh tokens; they are rejected where an access token is expected
+REFRESH_TOKEN_TYPE = "refresh"
+
 # bcrypt has a 72-byte limit; we truncate to avoid errors
 BCRYPT_MAX_PASSWORD_BYTES = 72
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+
+
+class PasswordHasherBusy(Exception):
+    """The bcrypt pool and its queue are full; the caller should answer 503."""
+
+
+# bcrypt runs in a dedicated process pool so hashing never holds the API's GIL.
+# _bcrypt_slots bounds pool work (running + queued); a full pool rejects instead of queueing.
+_bcrypt_pool: ProcessPoolExecutor | None = None
+_bcrypt_slots: threading.BoundedSemaphore | None = None
+_bcrypt_pool_lock = threading.Lock()
+
+# Verified tokens: sha256(token) -> decoded payload, kept until the token's exp at the latest.
+# _token_cache_key is the (SECRET_KEY, ALGORITHM) the entries were verified with; when it
+# changes (key rotation) the cache is dropped before use.
+_token_cache = TTLCache(
+    maxsize=get_settings().JWT_CACHE_MAX_SIZE,
+    ttl=get_settings().JWT_CACHE_TTL,
+    name="jwt",
+)
+_token_cache_key: tuple[str, str] | None = None
+
+
+def _bcrypt_rounds() -> int:
+    """Configured bcrypt cost factor (BCRYPT_ROUNDS), clamped to bcrypt's valid range."""
+    rounds = int(get_settings().BCRYPT_ROUNDS or 12)
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, rounds))
+
+
+def _hashpw(pwd_bytes: bytes, rounds: int) -> str:
+    """bcrypt hash (runs in a pool worker process)."""
+    return bcrypt.hashpw(pwd_bytes, bcrypt.gensalt(rounds=rounds)).decode("ascii")
+
+
+def _checkpw(pwd_bytes: bytes, hashed: bytes) -> bool:
+    """bcrypt check (runs in a pool worker process)."""
+    return bcrypt.checkpw(pwd_bytes, hashed)
+
+
+def _get_bcrypt_pool() -> tuple[ProcessPoolExecutor | None, threading.BoundedSemaphore | None]:
+    """Lazily start the bcrypt pool. (None, None) when BCRYPT_POOL_WORKERS is 0 (hash inline)."""
+    global _bcrypt_pool, _bcrypt_slots
+    if _bcrypt_pool is not None:
+        return _bcrypt_pool, _bcrypt_slots
+    settings = get_settings()
+    workers = max(0, int(settings.BCRYPT_POOL_WORKERS))
+    if workers == 0:
+        return None, None
+    with _bcrypt_pool_lock:
+        if _bcrypt_pool is None:
+            _bcrypt_slots = threading.BoundedSemaphore(workers + max(0, int(settings.BCRYPT_QUEUE_SIZE)))
+            _bcrypt_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _bcrypt_pool, _bcrypt_slots
+
+
+def _submit_bcrypt(
+    pool: ProcessPoolExecutor, slots: threading.BoundedSemaphore, fn: Callable[..., T], *args: Any
+) -> Future[T]:
+    """Queue a bcrypt function on the pool; raise PasswordHasherBusy if the pool is full."""
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing is at capacity")
+    try:
+        future = pool.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def _run_bcrypt(fn: Callable[..., T], *args: Any) -> T:
+    """Run a bcrypt function in the pool and wait for it (blocks the calling thread)."""
+    pool, slots = _get_bcrypt_pool()
+    if pool is None or slots is None:
+        return fn(*args)
+    return _submit_bcrypt(pool, slots, fn, *args).result()
+
+
+async def _run_bcrypt_async(fn: Callable[..., T], *args: Any) -> T:
+    """Run a bcrypt function in the pool and await it without blocking the event loop."""
+    pool, slots = _get_bcrypt_pool()
+    if pool is None or slots is None:
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.wrap_future(_submit_bcrypt(pool, slots, fn, *args))
+
+
+def shutdown_password_pool() -> None:
+    """Stop the bcrypt worker processes (app shutdown)."""
+    global _bcrypt_pool, _bcrypt_slots
+    with _bcrypt_pool_lock:
+        pool, _bcrypt_pool, _bcrypt_slots = _bcrypt_pool, None, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 def hash_password(password: str) -> str:
-    """Hash a plain password with bcrypt."""
+    """Hash a plain password with bcrypt (cost BCRYPT_ROUNDS) in the bcrypt process pool."""
     pwd_bytes = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
-    return bcrypt.hashpw(pwd_bytes, bcrypt.gensalt()).decode("ascii")
+    return _run_bcrypt(_hashpw, pwd_bytes, _bcrypt_rounds())
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Check that a plain password matches the stored hash."""
+    """Check that a plain password matches the stored hash (in the bcrypt process pool)."""
     pwd_bytes = plain_password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
-    return bcrypt.checkpw(pwd_bytes, hashed_password.encode("ascii"))
+    return _run_bcrypt(_checkpw, pwd_bytes, hashed_password.encode("ascii"))
 
 
-def create_access_token(data: dict[str, Any]) -> str:
-    """Build a JWT access token. `data` should include at least 'sub' (e.g. user id or email)."""
+async def hash_password_async(password: str) -> str:
+    """hash_password for async handlers: awaits the bcrypt pool instead of blocking a thread."""
+    pwd_bytes = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+    return await _run_bcrypt_async(_hashpw, pwd_bytes, _bcrypt_rounds())
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password for async handlers."""
+    pwd_bytes = plain_password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+    return await _run_bcrypt_async(_checkpw, pwd_bytes, hashed_password.encode("ascii"))
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the stored hash was made with a cost factor other than BCRYPT_ROUNDS."""
+    try:
+        # "$2b$12$<salt+hash>" -> 12
+        return int(hashed_password.split("$")[2]) != _bcrypt_rounds()
+    except (IndexError, ValueError):
+        return True
+
+
+def _encode_token(data: dict[str, Any], expire_minutes: int) -> str:
+    """Sign `data` as a JWT expiring in expire_minutes."""
     settings = get_settings()
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
+    expire = datetime.now(timezone.utc) + timedelta(minutes=expire_minutes)
     to_encode["exp"] = expire
     return jwt.encode(
         to_encode,
@@ -37,15 +169,64 @@ def create_access_token(data: dict[str, Any]) -> str:
     )
 
 
-def decode_access_token(token: str) -> dict[str, Any] | None:
-    """Decode and validate a JWT; return the payload or None if invalid."""
+def create_access_token(data: dict[str, Any]) -> str:
+    """Build a JWT access token. `data` should include at least 'sub' (e.g. user id or email)."""
+    return _encode_token(data, get_settings().ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+def create_refresh_token(data: dict[str, Any]) -> str:
+    """Build a long-lived refresh token (REFRESH_TOKEN_EXPIRE_MINUTES); only POST /auth/refresh accepts it."""
+    to_encode = {**data, "typ": REFRESH_TOKEN_TYPE, "jti": uuid.uuid4().hex}
+    return _encode_token(to_encode, get_settings().REFRESH_TOKEN_EXPIRE_MINUTES)
+
+
+def _decode_token(token: str) -> dict[str, Any] | None:
+    """
+    Decode and validate a JWT; return the payload or None if invalid.
+    Verified payloads are cached by token digest until their exp (see _token_cache), so a
+    reused token skips signature verification and claim parsing.
+    """
+    global _token_cache_key
     settings = get_settings()
+    signing_key = (settings.SECRET_KEY, settings.ALGORITHM)
+    if signing_key != _token_cache_key:
+        _token_cache.clear()
+        _token_cache_key = signing_key
+
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _token_cache.get(digest)
+    if cached is not None and cached.get("exp", 0) > time.time():
+        return dict(cached)
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM],
         )
-        return payload
     except JWTError:
         return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _token_cache.set(digest, dict(payload), ttl=exp - time.time())
+    return payload
+
+
+def decode_access_token(token: str) -> dict[str, Any] | None:
+    """Decode and validate an access token; return the payload or None if invalid (or a refresh token)."""
+    payload = _decode_token(token)
+    if payload is None or payload.get("typ") == REFRESH_TOKEN_TYPE:
+        return None
+    return payload
+
+
+def decode_refresh_token(token: str) -> dict[str, Any] | None:
+    """Decode and validate a refresh token; return the payload or None if invalid (or not a refresh token)."""
+    payload = _decode_token(token)
+    if payload is None or payload.get("typ") != REFRESH_TOKEN_TYPE:
+        return None
+    return payload
+
+
+def clear_token_cache() -> None:
+    """Drop all verified tokens (e.g. after rotating SECRET_KEY; also used by tests)."""
+    _token_cache.clear()
@@ -0,0 +1,113 @@
+"""
+Single-flight call coalescing: concurrent callers for the same key share one execution.
+The first caller (leader) runs the function; callers arriving while it is in flight wait for
+the leader's result (or exception) instead of repeating the upstream request.
+`do` is for sync code (threads), `do_async` for coroutines; the two paths do not share flights.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# name -> SingleFlight, for reporting counters (see singleflight_stats)
+_registry: dict[str, "SingleFlight"] = {}
+_registry_lock = threading.Lock()
+
+
+class _Call:
+    """One in-flight sync execution; followers block on `done`."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls per key. Counters: calls, executions (leaders) and coalesced."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: dict[tuple[int, Hashable], asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        with _registry_lock:
+            _registry[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run fn() once for all concurrent callers with the same key; return its result."""
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of do(): await fn() once for all concurrent callers on this event loop."""
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(task_key)
+            if task is not None:
+                self.coalesced += 1
+            else:
+                task = asyncio.ensure_future(fn())
+                self._tasks[task_key] = task
+                self.executions += 1
+
+                def _forget(_: asyncio.Future) -> None:
+                    with self._lock:
+                        if self._tasks.get(task_key) is task:
+                            del self._tasks[task_key]
+
+                task.add_done_callback(_forget)
+        # shield: a cancelled caller must not cancel the work others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        """Counters since startup: calls, executions (leader runs), coalesced (waited on a leader)."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._tasks),
+            }
+
+
+def singleflight_stats() -> dict[str, dict[str, int]]:
+    """Counters of every SingleFlight created in this process, by name."""
+    with _registry_lock:
+        flights = list(_registry.values())
+    return {f.name: f.stats() for f in flights}
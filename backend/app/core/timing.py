@@ -0,0 +1,116 @@
+"""
+Per-request timing. `timed(name)` blocks add their duration to the current request's timings;
+TimingMiddleware emits them as a Server-Timing header and one structured log line per request.
+Only a TIMING_SAMPLE_RATE fraction of requests is timed; elsewhere `timed` is a no-op.
+Timings travel in a context variable, so they follow the request into threadpool calls and
+SQLAlchemy's async bridge (DB time is recorded by the cursor events of app.db.query_log).
+"""
+
+import json
+import logging
+import random
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# (name, seconds) entries of the current request; None when the request is not sampled
+_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar("request_timings", default=None)
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Add a measured duration to the current request (no-op when not sampled)."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((name, seconds))  # list.append is atomic: safe from threadpool calls
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Time the block as `name`; repeated names are summed in the report."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((name, time.perf_counter() - start))
+
+
+def summarize(timings: list[tuple[str, float]]) -> dict[str, float]:
+    """Milliseconds per name (summed), in order of first occurrence."""
+    totals: dict[str, float] = {}
+    for name, seconds in list(timings):
+        totals[name] = totals.get(name, 0.0) + seconds * 1000
+    return totals
+
+
+def server_timing_header(totals: dict[str, float], total_ms: float) -> str:
+    """Server-Timing value, e.g. "auth;dur=0.4, db;dur=3.1, total;dur=12.0"."""
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in [*totals.items(), ("total", total_ms)])
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records body rendering as "render"."""
+
+    def render(self, content: Any) -> bytes:
+        with timed("render"):
+            return super().render(content)
+
+
+class TimingMiddleware:
+    """ASGI middleware: times sampled requests and adds a Server-Timing header to their responses."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rate = get_settings().TIMING_SAMPLE_RATE
+        if scope["type"] != "http" or rate <= 0 or (rate < 1 and random.random() >= rate):
+            await self.app(scope, receive, send)
+            return
+
+        timings: list[tuple[str, float]] = []
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    server_timing_header(summarize(timings), (time.perf_counter() - start) * 1000),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            total_ms = (time.perf_counter() - start) * 1000
+            logger.info(
+                "request timing %s",
+                json.dumps(
+                    {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "total_ms": round(total_ms, 2),
+                        "timings_ms": {k: round(v, 2) for k, v in summarize(timings).items()},
+                    }
+                ),
+            )
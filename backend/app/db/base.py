@@ -1,3 +1,4 @@
+from sqlalchemy import event
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -5,3 +6,11 @@ class Base(DeclarativeBase):
     """Base class for all DB models."""
 
     pass
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_missing_indexes(target, connection, **kw) -> None:
+    """create_all skips tables that already exist; add indexes declared on them since."""
+    for table in target.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
@@ -0,0 +1,150 @@
+"""
+Connection pool instrumentation: checkout latency, wait events and timeouts per engine pool.
+Pools are created with the Instrumented* classes below and a pool_logging_name ("sync", "async"),
+which names their PoolStats. Checked-out / overflow gauges are read from the pool on demand.
+
+Only public pool API is used: Pool.connect() is timed and claims a connection slot, and the
+pool's checkin event releases it. A checkout that starts while every connection (pool_size +
+max_overflow) is claimed has to wait for a checkin, and is counted in `waits`.
+"""
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Upper bounds (seconds) of the checkout latency histogram buckets; the last bucket is +Inf
+CHECKOUT_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolStats:
+    """Counters for one pool. The lock is taken on checkout and checkin."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0  # checkouts started and not checked in yet (including those waiting)
+        self.waits = 0  # checkouts that found the pool (incl. overflow) exhausted
+        self.timeouts = 0  # checkouts that gave up after DB_POOL_TIMEOUT
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.bucket_counts = [0] * (len(CHECKOUT_BUCKETS) + 1)
+
+    def begin_checkout(self, capacity: int | None) -> None:
+        """Claim a connection slot; a claim beyond capacity (None = unbounded) has to wait."""
+        with self._lock:
+            self.in_use += 1
+            if capacity is not None and self.in_use > capacity:
+                self.waits += 1
+
+    def end_checkout(self) -> None:
+        """Release a slot: on checkin, or when a checkout failed."""
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def record_checkout(self, seconds: float) -> None:
+        bucket = next((i for i, b in enumerate(CHECKOUT_BUCKETS) if seconds <= b), len(CHECKOUT_BUCKETS))
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds_total += seconds
+            self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+            self.bucket_counts[bucket] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "checkout_seconds_total": self.checkout_seconds_total,
+                "checkout_seconds_max": self.checkout_seconds_max,
+                "checkout_buckets": dict(zip([*map(str, CHECKOUT_BUCKETS), "+Inf"], self.bucket_counts)),
+            }
+
+
+_pool_stats: dict[str, PoolStats] = {}
+_pool_stats_lock = threading.Lock()
+
+
+def get_pool_stats(name: str) -> PoolStats:
+    """PoolStats for a pool logging name (created on first use)."""
+    stats = _pool_stats.get(name)
+    if stats is None:
+        with _pool_stats_lock:
+            stats = _pool_stats.setdefault(name, PoolStats(name))
+    return stats
+
+
+# record_info key of a connection checked out through Pool.connect(): its PoolStats, released on checkin
+_CLAIM_KEY = "pool_stats_claim"
+
+
+class _InstrumentedPoolMixin:
+    """Times Pool.connect() (the blocking checkout) and claims a slot until the connection's checkin."""
+
+    def __init__(self, creator: Any, pool_size: int = 5, max_overflow: int = 10, **kw: Any) -> None:
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.max_overflow = max_overflow
+        self.stats = get_pool_stats(self.logging_name or "default")
+        # recreate() (engine.dispose()) hands the old pool's listeners over in _dispatch
+        if "_dispatch" not in kw:
+            event.listen(self, "checkin", _release_claim)
+
+    def capacity(self) -> int | None:
+        """Most connections open at once; None when max_overflow is unlimited (-1)."""
+        return self.size() + self.max_overflow if self.max_overflow >= 0 else None
+
+    def connect(self) -> Any:
+        self.stats.begin_checkout(self.capacity())
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except BaseException as exc:
+            # a record taken before the failure is checked in without a claim (see _release_claim)
+            self.stats.end_checkout()
+            if isinstance(exc, PoolTimeoutError):
+                self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        conn.record_info[_CLAIM_KEY] = self.stats
+        return conn
+
+
+def _release_claim(dbapi_connection: Any, connection_record: Any) -> None:
+    """checkin event: release the slot claimed by connect() (failed checkouts never set a claim)."""
+    stats = connection_record.record_info.pop(_CLAIM_KEY, None) if connection_record is not None else None
+    if stats is not None:
+        stats.end_checkout()
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool with checkout metrics (sync engine)."""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout metrics (async engine)."""
+
+
+def pool_status(engine: Engine, name: str) -> dict[str, Any]:
+    """Current gauges (size, checked out, overflow) plus the pool's checkout counters."""
+    pool: Pool = engine.pool
+    status: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=getattr(pool, "max_overflow", None),
+        )
+    status.update(get_pool_stats(name).snapshot())
+    return status
@@ -0,0 +1,144 @@
+"""
+SQL cost per request: slow-query log, per-endpoint query budgets and DB time for Server-Timing.
+
+- instrument_queries(engine): one before/after cursor-execute listener pair times every
+  statement once. The duration is recorded as "db" for timed requests (app.core.timing),
+  statements taking SLOW_QUERY_MS or longer are logged (logger app.db.query_log) with their
+  parameters redacted to type names, and every statement is counted toward the current request.
+- query_budget(n): route dependency declaring that an endpoint runs at most n statements
+  (route-level dependencies run first, so the user lookup in get_current_user counts too).
+  Exceeding it logs a warning, or raises QueryBudgetExceeded when QUERY_BUDGET_STRICT is set
+  (the test suite does), which catches N+1 patterns such as lazy-loading User.votes per item.
+"""
+
+import logging
+import re
+import time
+from collections.abc import AsyncIterator
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+from app.core.metrics import Histogram, route_template
+from app.core.timing import record_timing
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_STATEMENT = 2000
+
+QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements per request, for endpoints with a query budget",
+    ("route",),
+    buckets=(1, 2, 3, 4, 5, 8, 13, 20, 50, 100),
+)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """An endpoint ran more SQL statements than its declared budget (QUERY_BUDGET_STRICT)."""
+
+
+class QueryCounter:
+    """Statements executed in the current request."""
+
+    __slots__ = ("count",)
+
+    def __init__(self) -> None:
+        self.count = 0
+
+
+_query_counter: ContextVar[QueryCounter | None] = ContextVar("query_counter", default=None)
+
+
+def query_count() -> int | None:
+    """Statements counted so far in the current request; None outside a budgeted endpoint."""
+    counter = _query_counter.get()
+    return counter.count if counter is not None else None
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Same shape as the bound parameters with each value replaced by its type name."""
+    if isinstance(parameters, dict):
+        return {k: redact_parameters(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if len(parameters) > 3 and all(isinstance(p, (dict, list, tuple)) for p in parameters):
+            # executemany: describe the first row only
+            return [redact_parameters(parameters[0]), f"... {len(parameters)} rows"]
+        return [redact_parameters(p) for p in parameters]
+    if parameters is None:
+        return None
+    return f"<{type(parameters).__name__}>"
+
+
+def _one_line(statement: str) -> str:
+    statement = re.sub(r"\s+", " ", statement).strip()
+    if len(statement) > MAX_LOGGED_STATEMENT:
+        statement = statement[:MAX_LOGGED_STATEMENT] + " ..."
+    return statement
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_log_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("query_log_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    record_timing("db", elapsed)
+    elapsed_ms = elapsed * 1000
+    counter = _query_counter.get()
+    if counter is not None:
+        counter.count += 1
+    threshold = get_settings().SLOW_QUERY_MS
+    if threshold > 0 and elapsed_ms >= threshold:
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s",
+            elapsed_ms,
+            _one_line(statement),
+            redact_parameters(parameters),
+        )
+
+
+def _handle_error(exception_context) -> None:
+    """A failed statement never reaches after_cursor_execute: drop its start time."""
+    conn = exception_context.connection
+    starts = conn.info.get("query_log_start") if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Time statements for Server-Timing, count them per request and log slow ones (see module docstring)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def query_budget(max_queries: int) -> Any:
+    """Route dependency: `dependencies=[query_budget(3)]` declares the endpoint's statement budget."""
+
+    async def check_query_budget(request: Request) -> AsyncIterator[QueryCounter]:
+        counter = QueryCounter()
+        token = _query_counter.set(counter)
+        try:
+            yield counter
+        finally:
+            try:
+                _query_counter.reset(token)
+            except ValueError:  # exited in another context
+                pass
+        route = route_template(request.scope)
+        QUERIES_PER_REQUEST.observe(counter.count, route)
+        if counter.count > max_queries:
+            message = f"{request.method} {route} ran {counter.count} SQL statements (budget {max_queries})"
+            if get_settings().QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    return Depends(check_query_budget, scope="function")
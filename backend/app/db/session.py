@@ -1,24 +1,60 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import get_settings
 from app.db.base import Base
+from app.db.pool_metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+from app.db.query_log import instrument_queries
 
 settings = get_settings()
+
+# Pool sizing shared by both engines (see DB_POOL_* settings)
+_pool_options = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+}
+
+# Sync engine (psycopg2): schema creation at startup and scripts
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="sync",
+    **_pool_options,
 )
 
+instrument_queries(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg): used by all request handlers
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_pre_ping=True,
+    pool_logging_name="async",
+    **(
+        {"poolclass": NullPool}
+        if settings.DB_NULL_POOL
+        else {"poolclass": InstrumentedAsyncAdaptedQueuePool, **_pool_options}
+    ),
+)
+
+instrument_queries(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
-def get_db() -> Generator[Session, None, None]:
-    """Dependency that yields a DB session and closes it after the request."""
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that yields an async DB session and closes it after the request."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
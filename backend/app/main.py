@@ -4,15 +4,27 @@ import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import auth, dashboard, onboarding, users, vote
+from app.api.routes import auth, dashboard, debug, health, metrics, onboarding, users, vote
+from app.core.admission import AdmissionMiddleware, start_admission, stop_admission
 from app.core.config import settings
-from app.db.session import Base, engine
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.security import shutdown_password_pool
+from app.core.timing import TimedJSONResponse, TimingMiddleware
+from app.db.session import Base, async_engine, engine
 from app.models import Preferences, User, Vote
 from app.services.coin_service import refresh_prices_cache
+from app.services.vote_buffer import start_vote_buffer, stop_vote_buffer
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, default_response_class=TimedJSONResponse)
+
+
+@app.on_event("startup")
+async def startup_admission() -> None:
+    """Size the worker threadpool and start measuring its queueing delay."""
+    await start_admission()
 
 
 @app.on_event("startup")
@@ -26,16 +38,61 @@ def startup_prices_cache() -> None:
     t = threading.Thread(target=run, daemon=True)
     t.start()
 
+
+@app.on_event("startup")
+async def startup_vote_buffer() -> None:
+    """Replay queued votes and start the write-behind flusher (VOTE_WRITE_BEHIND only)."""
+    if settings.VOTE_WRITE_BEHIND:
+        await start_vote_buffer()
+
+
+@app.on_event("shutdown")
+async def shutdown_vote_buffer() -> None:
+    """Flush queued votes before the DB engine is disposed."""
+    if settings.VOTE_WRITE_BEHIND:
+        await stop_vote_buffer()
+
+
+@app.on_event("shutdown")
+async def shutdown_admission() -> None:
+    """Stop the threadpool queue-delay probe."""
+    await stop_admission()
+
+
+@app.on_event("shutdown")
+def shutdown_password_hashing() -> None:
+    """Stop the bcrypt worker processes."""
+    shutdown_password_pool()
+
+
+@app.on_event("shutdown")
+async def shutdown_db() -> None:
+    """Close pooled async DB connections."""
+    await async_engine.dispose()
+
+
+# Inside CORS, timing and metrics: shed responses still get CORS headers and are measured
+if settings.ADMISSION_MAX_QUEUE_DELAY > 0:
+    app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Retry-After"],
 )
+app.add_middleware(TimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
+app.include_router(health.router, prefix="/health", tags=["health"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(onboarding.router, prefix="/onboarding", tags=["onboarding"])
 app.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
-app.include_router(vote.router, prefix="/vote", tags=["vote"])
\ No newline at end of file
+app.include_router(vote.router, prefix="/vote", tags=["vote"])
+if settings.PROFILING_ENABLED:
+    app.include_router(debug.router, prefix="/debug", tags=["debug"])
\ No newline at end of file
@@ -1,5 +1,6 @@
 from app.models.user import User
 from app.models.preferences import Preferences
-from app.models.votes import Vote
+from app.models.refresh_token import UsedRefreshToken
+from app.models.votes import Vote, VoteCount
 
-__all__ = ["User", "Preferences", "Vote"]
+__all__ = ["User", "Preferences", "UsedRefreshToken", "Vote", "VoteCount"]
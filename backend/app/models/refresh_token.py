@@ -0,0 +1,29 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class UsedRefreshToken(Base):
+    """
+    Refresh tokens already exchanged at POST /auth/refresh, by jti. A refresh token is single use:
+    the insert of its jti is what accepts it. Rows are only needed until the token expires.
+    """
+
+    __tablename__ = "used_refresh_tokens"
+    __table_args__ = (
+        # pruning expired rows
+        Index("ix_used_refresh_tokens_expires_at", "expires_at"),
+    )
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
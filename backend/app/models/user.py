@@ -44,4 +44,6 @@ class User(Base):
         "Vote",
         back_populates="user",
         cascade="all, delete-orphan",
+        # leave the votes to ON DELETE CASCADE, after the trigger that subtracts them from vote_counts
+        passive_deletes=True,
     )
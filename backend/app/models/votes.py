@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, UniqueConstraint, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, event, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -18,6 +18,8 @@ class Vote(Base):
             "item_id",
             name="uq_vote_user_section_item",
         ),
+        # vote history: keyset pagination on (created_at, id) per user
+        Index("ix_votes_user_created", "user_id", "created_at", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -39,3 +41,80 @@ class Vote(Base):
     )
 
     user: Mapped["User"] = relationship("User", back_populates="votes")
+
+
+class VoteCount(Base):
+    """
+    Up/down totals per (section_type, item_id). Maintained incrementally by the vote service in the
+    same transaction as each vote upsert/cancel, so reads never aggregate the votes table. Votes
+    removed with their user are subtracted by a trigger on users (see _USER_VOTE_COUNTS_TRIGGER).
+    """
+
+    __tablename__ = "vote_counts"
+    __table_args__ = (
+        # top-K per section: ORDER BY up DESC, item_id DESC is a backward scan of this index
+        Index("ix_vote_counts_section_up", "section_type", "up", "item_id"),
+    )
+
+    section_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    item_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    up: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    down: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+_BACKFILL_VOTE_COUNTS = text(
+    "INSERT INTO vote_counts (section_type, item_id, up, down) "
+    "SELECT section_type, item_id, "
+    "count(*) FILTER (WHERE vote_type = 'up'), count(*) FILTER (WHERE vote_type = 'down') "
+    "FROM votes GROUP BY section_type, item_id"
+)
+
+
+@event.listens_for(VoteCount.__table__, "after_create")
+def _mark_vote_counts_created(target, connection, **kw) -> None:
+    connection.info["vote_counts_created"] = True
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _backfill_vote_counts(target, connection, **kw) -> None:
+    """Seed vote_counts from existing votes when create_all has just added the table."""
+    if connection.info.pop("vote_counts_created", False):
+        connection.execute(_BACKFILL_VOTE_COUNTS)
+
+
+# Deleting a user cascades to votes in the database, past the vote service: subtract the user's
+# votes from vote_counts first. Rows are locked in key order, like the service's count upserts.
+_USER_VOTE_COUNTS_FUNCTION = text(
+    """
+    CREATE OR REPLACE FUNCTION subtract_user_vote_counts() RETURNS trigger AS $$
+    BEGIN
+        PERFORM 1 FROM vote_counts c
+        WHERE (c.section_type, c.item_id) IN (SELECT section_type, item_id FROM votes WHERE user_id = OLD.id)
+        ORDER BY c.section_type, c.item_id
+        FOR UPDATE;
+        UPDATE vote_counts c
+        SET up = c.up - d.up, down = c.down - d.down
+        FROM (
+            SELECT section_type, item_id,
+                count(*) FILTER (WHERE vote_type = 'up') AS up,
+                count(*) FILTER (WHERE vote_type = 'down') AS down
+            FROM votes WHERE user_id = OLD.id GROUP BY section_type, item_id
+        ) d
+        WHERE c.section_type = d.section_type AND c.item_id = d.item_id;
+        RETURN OLD;
+    END
+    $$ LANGUAGE plpgsql
+    """
+)
+_USER_VOTE_COUNTS_TRIGGER = text(
+    "CREATE OR REPLACE TRIGGER users_subtract_vote_counts BEFORE DELETE ON users "
+    "FOR EACH ROW EXECUTE FUNCTION subtract_user_vote_counts()"
+)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_user_vote_counts_trigger(target, connection, **kw) -> None:
+    """(Re)install the trigger on every startup: create_all skips existing tables, not this."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(_USER_VOTE_COUNTS_FUNCTION)
+        connection.execute(_USER_VOTE_COUNTS_TRIGGER)
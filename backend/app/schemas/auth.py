@@ -19,5 +19,11 @@ class LoginRequest(BaseModel):
 
 
 class LoginResponse(BaseModel):
-    access_token: str
+    access_token: str  # Short-lived; carries the user's preferences snapshot
     token_type: str = "bearer"
+    refresh_token: str | None = None  # Exchange at POST /auth/refresh for a new pair
+    expires_in: int | None = None  # Access token lifetime in seconds
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
@@ -2,6 +2,7 @@ from pydantic import BaseModel
 
 
 class NewsItem(BaseModel):
+    id: str = ""  # Stable article id (provider id or hash of url); used in the feed cursor
     title: str
     url: str
     source: str = ""
@@ -26,6 +27,7 @@ class NewsResponse(BaseModel):
     """Market news section. When loading fails, news is empty and message explains."""
 
     news: list[NewsItem] = []
+    next_cursor: str | None = None  # Pass as ?cursor= to get the next page; None on the last page
     message: str | None = None  # Set when loading failed
 
 
@@ -41,6 +43,16 @@ class MemeResponse(BaseModel):
     meme: MemeItem
 
 
+class ItemVotes(BaseModel):
+    """Vote totals for one dashboard item and the current user's vote on it."""
+
+    section_type: str
+    item_id: str  # Same id the frontend sends to POST /vote
+    up: int = 0
+    down: int = 0
+    my_vote: str | None = None  # "up", "down" or None
+
+
 class DashboardResponse(BaseModel):
     """Daily dashboard: 4 sections. Prefer separate GET /dashboard/{prices|news|ai-insight|meme} for different cache/update needs."""
 
@@ -48,3 +60,6 @@ class DashboardResponse(BaseModel):
     prices: dict[str, float] = {}
     ai_insight: str = ""
     meme: MemeItem | None = None
+    votes: list[ItemVotes] = []  # One entry per votable item above
+    sections: list[str] = []  # Sections computed for this response (news, price, ai, meme); others are left empty
+    section_status: dict[str, str] = {}  # Per computed section: fresh, stale (last good value) or timed_out (empty)
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
 
 from app.models.enums import SectionType, VoteType
 
@@ -28,7 +31,7 @@ class VoteResponse(BaseModel):
     status: str = "ok"
     action: str = Field(
         ...,
-        description="created (new vote) or updated (existing vote changed)",
+        description="created (new vote), updated (existing vote changed) or queued (write-behind mode)",
     )
 
 
@@ -52,3 +55,87 @@ class VoteCancelResponse(BaseModel):
 
     status: str = "ok"
     action: str = "cancelled"
+
+
+# Maximum operations accepted by POST /vote/batch
+VOTE_BATCH_MAX_OPERATIONS = 100
+# Maximum item ids per GET /vote/counts and items per GET /vote/top
+VOTE_COUNTS_MAX_ITEMS = 100
+# Page size limits for GET /vote/mine
+VOTE_HISTORY_DEFAULT_PAGE_SIZE = 50
+VOTE_HISTORY_MAX_PAGE_SIZE = 200
+
+
+class VoteBatchOperation(BaseModel):
+    """One operation in POST /vote/batch: cast/update a vote, or cancel it."""
+
+    op: Literal["vote", "cancel"] = Field("vote", description="vote (cast or update) or cancel")
+    section_type: SectionType
+    item_id: str = Field(..., min_length=1, max_length=255)
+    vote_type: VoteType | None = Field(None, description="up or down; required when op is vote")
+
+    @model_validator(mode="after")
+    def _vote_type_required_for_vote(self) -> "VoteBatchOperation":
+        if self.op == "vote" and self.vote_type is None:
+            raise ValueError("vote_type is required when op is vote")
+        return self
+
+
+class VoteBatchRequest(BaseModel):
+    """Body for POST /vote/batch – applied in order, in one transaction."""
+
+    operations: list[VoteBatchOperation] = Field(
+        ...,
+        min_length=1,
+        max_length=VOTE_BATCH_MAX_OPERATIONS,
+    )
+
+
+class VoteBatchItemResult(BaseModel):
+    """Result for one operation, in request order."""
+
+    section_type: str
+    item_id: str
+    action: str = Field(
+        ...,
+        description="created, updated, cancelled, not_found (cancel without a vote), "
+        "superseded (a later operation in the batch targets the same item) or queued (write-behind mode)",
+    )
+
+
+class VoteBatchResponse(BaseModel):
+    """Response after applying a vote batch."""
+
+    status: str = "ok"
+    results: list[VoteBatchItemResult]
+
+
+class VoteCountItem(BaseModel):
+    """Up/down totals for one item."""
+
+    item_id: str
+    up: int = 0
+    down: int = 0
+
+
+class VoteCountsResponse(BaseModel):
+    """Response for GET /vote/counts and GET /vote/top."""
+
+    section_type: SectionType
+    counts: list[VoteCountItem]
+
+
+class VoteHistoryItem(BaseModel):
+    """One of the user's votes."""
+
+    section_type: str
+    item_id: str
+    vote_type: str
+    created_at: datetime
+
+
+class VoteHistoryResponse(BaseModel):
+    """Response for GET /vote/mine – newest first."""
+
+    votes: list[VoteHistoryItem]
+    next_cursor: str | None = None  # Pass as ?cursor= to get the next page; None on the last page
@@ -1,14 +1,21 @@
 """
 AI Insight of the day via OpenRouter. Dynamic prompt from content_types + assets; static fallback on failure.
+Generated insights are cached per prompt (i.e. per preference profile) for AI_INSIGHT_CACHE_TTL seconds;
+concurrent misses for the same profile share one OpenRouter call. Each cached insight carries a
+generation id (see insight_version), so derived data is keyed per profile rather than globally.
 """
 
 import logging
+import threading
 import time
 from typing import Any
 
 import httpx
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
+from app.core.metrics import FALLBACKS, track_provider
+from app.core.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +37,17 @@ FALLBACK_INSIGHT = (
     "This is a static insight; add OPENROUTER_API_KEY for a daily AI-generated take."
 )
 
+# prompt -> (generation id, generated insight); fallback text is never cached
+_insight_cache = TTLCache(
+    maxsize=get_settings().AI_INSIGHT_CACHE_MAX_SIZE,
+    ttl=get_settings().AI_INSIGHT_CACHE_TTL,
+    name="insight",
+)
+_insight_flight = SingleFlight("insight")
+# Last generation id handed out; each stored insight gets the next one
+_insight_generation = 0
+_generation_lock = threading.Lock()
+
 
 def build_prompt(
     assets: list[str] | None = None,
@@ -88,7 +106,43 @@ def get_ai_insight(
         content_types=content_types,
         investor_type=investor_type,
     )
+    cached = _insight_cache.get(prompt)
+    if cached is not None:
+        return cached[1]
+
+    def generate() -> str:
+        text = _request_insight(prompt, api_key)
+        if text != FALLBACK_INSIGHT:
+            _store_insight(prompt, text)
+        else:
+            FALLBACKS.inc("openrouter_fallback_insight")
+        return text
+
+    return _insight_flight.do(prompt, generate)
+
+
+def _store_insight(prompt: str, text: str) -> None:
+    global _insight_generation
+    with _generation_lock:
+        _insight_generation += 1
+        generation = _insight_generation
+    _insight_cache.set(prompt, (generation, text))
+
 
+def insight_version(prompt: str) -> int | None:
+    """
+    Generation id of the cached insight for this prompt; None when none is cached (the next read
+    generates one). 0 without OPENROUTER_API_KEY, where the insight is always the static fallback.
+    """
+    if not (get_settings().OPENROUTER_API_KEY or "").strip():
+        return 0
+    cached = _insight_cache.peek(prompt)  # not a read of the insight: keep it out of the hit ratio
+    return cached[0] if cached is not None else None
+
+
+def _request_insight(prompt: str, api_key: str) -> str:
+    """Call OpenRouter (primary model, then fallback model); FALLBACK_INSIGHT if all attempts fail."""
+    settings = get_settings()
     headers: dict[str, str] = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
@@ -118,7 +172,7 @@ def get_ai_insight(
         }
         for attempt in range(MAX_RETRIES):
             try:
-                with httpx.Client(timeout=timeout) as client:
+                with track_provider("openrouter"), httpx.Client(timeout=timeout) as client:
                     response = client.post(url, json=payload, headers=headers)
                 if response.status_code == 200:
                     try:
@@ -156,3 +210,8 @@ def get_ai_insight(
                 break
 
     return FALLBACK_INSIGHT
+
+
+def clear_insight_cache() -> None:
+    """Clear the in-memory insight cache (for tests)."""
+    _insight_cache.clear()
@@ -10,6 +10,8 @@ from typing import Any
 import httpx
 
 from app.core.config import get_settings
+from app.core.metrics import CACHE_REQUESTS, FALLBACKS, track_provider
+from app.core.singleflight import SingleFlight
 from app.models.enums import AssetSymbol
 
 logger = logging.getLogger(__name__)
@@ -24,7 +26,10 @@ PRICES_UNAVAILABLE_MESSAGE = (
 
 # In-memory cache: symbol -> price (USD). Refreshed periodically for all enum coins.
 _prices_cache: dict[str, float] = {}
+_prices_version = 0  # bumped whenever the cache contents change
 _cache_lock = threading.Lock()
+# Concurrent refreshes (startup warm-up + background thread) share one upstream request
+_prices_flight = SingleFlight("prices")
 
 # CoinGecko coin id per supported asset (single source of truth: AssetSymbol enum)
 ASSET_TO_COINGECKO_ID: dict[AssetSymbol, str] = {
@@ -69,8 +74,8 @@ def _fetch_prices_binance(timeout: float = 10.0) -> dict[str, float]:
     """
     result: dict[str, float] = {}
     try:
-        with httpx.Client(timeout=timeout) as client:
-            response = client.get(BINANCE_TICKER_URL)
+        with track_provider("binance"), httpx.Client(timeout=timeout) as client:
+            response = client.get(get_settings().BINANCE_TICKER_URL or BINANCE_TICKER_URL)
             response.raise_for_status()
         items = response.json()
     except (httpx.HTTPError, httpx.TimeoutException) as e:
@@ -111,8 +116,14 @@ def _fetch_prices_binance(timeout: float = 10.0) -> dict[str, float]:
 def refresh_prices_cache() -> None:
     """
     Fetch USD prices for ALL AssetSymbol enum coins. Primary: CoinGecko; on failure use Binance fallback.
-    Called every 5 minutes by a background thread; one API call per refresh.
+    Called every 5 minutes by a background thread; one API call per refresh. Concurrent calls
+    wait for the refresh already in flight instead of starting another.
     """
+    _prices_flight.do("all", _refresh_prices_cache)
+
+
+def _refresh_prices_cache() -> None:
+    """Do one prices refresh (see refresh_prices_cache)."""
     ids = list(ASSET_TO_COINGECKO_ID.values())
     symbol_by_id: dict[str, str] = {cg_id: sym.value for sym, cg_id in ASSET_TO_COINGECKO_ID.items()}
     settings = get_settings()
@@ -126,7 +137,7 @@ def refresh_prices_cache() -> None:
         "vs_currencies": "usd",
     }
     try:
-        with httpx.Client(timeout=timeout) as client:
+        with track_provider("coingecko"), httpx.Client(timeout=timeout) as client:
             response = client.get(url, params=params)
             if response.status_code == 429:
                 raise httpx.HTTPStatusError("429 Too Many Requests", request=response.request, response=response)
@@ -140,9 +151,7 @@ def refresh_prices_cache() -> None:
                 except (TypeError, ValueError):
                     pass
         if result:
-            with _cache_lock:
-                _prices_cache.clear()
-                _prices_cache.update(result)
+            _store_prices(result)
             logger.info("Prices cache refreshed from CoinGecko: %s symbols", len(result))
             return
     except (httpx.HTTPError, httpx.TimeoutException) as e:
@@ -151,14 +160,28 @@ def refresh_prices_cache() -> None:
         logger.warning("CoinGecko cache refresh error: %s", e)
 
     # Fallback: Binance (no API key)
+    FALLBACKS.inc("coingecko_binance")
     result = _fetch_prices_binance(timeout=timeout)
     if result:
-        with _cache_lock:
-            _prices_cache.clear()
-            _prices_cache.update(result)
+        _store_prices(result)
         logger.info("Prices cache refreshed from Binance fallback: %s symbols", len(result))
 
 
+def _store_prices(result: dict[str, float]) -> None:
+    """Replace the cache contents and bump its version."""
+    global _prices_version
+    with _cache_lock:
+        _prices_cache.clear()
+        _prices_cache.update(result)
+        _prices_version += 1
+
+
+def prices_version() -> int | None:
+    """Version of the prices cache, bumped on every refresh; None while the cache is empty."""
+    with _cache_lock:
+        return _prices_version if _prices_cache else None
+
+
 def get_prices(user_assets: list[str]) -> tuple[dict[str, float], str | None]:
     """
     Return USD prices for the given asset symbols from the in-memory cache.
@@ -175,6 +198,7 @@ def get_prices(user_assets: list[str]) -> tuple[dict[str, float], str | None]:
 
     with _cache_lock:
         result = {s: _prices_cache[s] for s in wanted if s in _prices_cache}
+    CACHE_REQUESTS.inc("prices", "hit" if len(result) == len(wanted) else "miss")
 
     if not result and wanted:
         return {}, PRICES_UNAVAILABLE_MESSAGE
@@ -183,5 +207,7 @@ def get_prices(user_assets: list[str]) -> tuple[dict[str, float], str | None]:
 
 def clear_prices_cache() -> None:
     """Clear the in-memory prices cache (for tests)."""
+    global _prices_version
     with _cache_lock:
         _prices_cache.clear()
+        _prices_version += 1
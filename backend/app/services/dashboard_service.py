@@ -0,0 +1,266 @@
+"""
+Dashboard sections under a deadline. Sections that may block on upstreams (news, AI insight, meme)
+run concurrently in the threadpool, and each is awaited for min(its budget, DASHBOARD_DEADLINE)
+seconds. A section that misses its budget is answered from the last good value for the same
+profile ("stale") or left empty ("timed_out"); so is a section whose job raised. The work is not
+cancelled: it finishes in the background and fills the service caches and the last-good store for
+the next request. At most one job per (section, profile key) runs at a time: requests arriving
+while it is in flight wait on it instead of taking another thread.
+
+Sections travel as Fragments: the value plus its JSON encoding. Prices, news and insight
+fragments are shared by every user with the same profile key (asset set, insight prompt) and
+keyed by the source cache's version, so a hit skips rebuilding and re-encoding the section and
+the response is assembled by joining encoded fragments (render_json_object).
+
+Each user's last all-fresh response body is kept with a key over its inputs (see dashboard_etag)
+and the vote totals and own votes it shows (vote_service.get_item_votes). A request with the same
+inputs re-reads those votes from the DB; while they are unchanged the body is reused, or answered
+304 via If-None-Match. The ETag covers both, so a vote written through any worker changes it, and
+votes on items the body does not show leave it alone. Only stored bodies are sent with the ETag.
+Preference writes drop the user's entry (invalidate_dashboard); source changes show up as new
+versions in the key.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.metrics import Counter
+from app.core.singleflight import SingleFlight
+from app.core.timing import timed
+
+logger = logging.getLogger(__name__)
+
+SECTION_FRESH = "fresh"
+SECTION_STALE = "stale"
+SECTION_TIMED_OUT = "timed_out"
+
+LAST_GOOD_MAX_ENTRIES = 10000
+
+SECTION_RESULTS = Counter(
+    "dashboard_sections_total",
+    "Dashboard sections served, by status (fresh, stale, timed_out)",
+    ("section", "status"),
+)
+
+# (section, profile key) -> last non-empty value
+_last_good = TTLCache(
+    maxsize=LAST_GOOD_MAX_ENTRIES,
+    ttl=get_settings().DASHBOARD_STALE_TTL,
+    name="dashboard_last_good",
+)
+# Sections still running: strong references so unfinished work is not garbage-collected
+_background: set[asyncio.Future] = set()
+# One in-flight job per (section, profile key)
+_section_flight = SingleFlight("dashboard_section")
+# (section, profile key, source version) -> Fragment
+_fragments = TTLCache(
+    maxsize=get_settings().DASHBOARD_FRAGMENT_MAX_SIZE,
+    ttl=get_settings().DASHBOARD_FRAGMENT_TTL,
+    name="dashboard_fragments",
+)
+
+
+# user_id -> CachedResponse: the user's last all-fresh /dashboard response
+_responses = TTLCache(
+    maxsize=get_settings().DASHBOARD_RESPONSE_CACHE_MAX_SIZE,
+    ttl=get_settings().DASHBOARD_RESPONSE_CACHE_TTL,
+    name="dashboard_responses",
+)
+
+
+@dataclass(frozen=True)
+class Fragment:
+    """A section value and its JSON encoding. Shared between requests: never mutate `value`."""
+
+    value: Any
+    body: bytes
+
+    def __bool__(self) -> bool:
+        return bool(self.value)
+
+
+def encode_fragment(value: Any) -> Fragment:
+    """Fragment for a value that is not shared (e.g. a random meme)."""
+    return Fragment(value, to_json(value))
+
+
+def section_fragment(
+    section: str,
+    key: Hashable,
+    version: int | None,
+    build: Callable[[], Any],
+    shareable: Callable[[Any], bool] = bool,
+) -> Fragment:
+    """
+    Shared Fragment of `section` for a profile key at the given source version; on a miss, build()
+    the value and encode it. Read the version before building, so data newer than the version is
+    never cached under it. Nothing is cached when version is None (source empty or expired) or
+    shareable(value) is false (by default: empty values).
+    """
+    if version is not None:
+        cached = _fragments.get((section, key, version))
+        if cached is not None:
+            return cached
+    fragment = encode_fragment(build())
+    if version is not None and shareable(fragment.value):
+        _fragments.set((section, key, version), fragment)
+    return fragment
+
+
+def assets_key(assets: list[str]) -> tuple[str, ...]:
+    """Canonical profile key for asset-based sections: the sorted, de-duplicated symbols."""
+    return tuple(sorted({a.strip().upper() for a in assets if a and a.strip()}))
+
+
+def render_json_object(members: dict[str, bytes]) -> bytes:
+    """JSON object from already-encoded member values, in order (names must not need escaping)."""
+    return b"{" + b",".join(b'"%s":%s' % (name.encode(), body) for name, body in members.items()) + b"}"
+
+
+@dataclass
+class SectionJob:
+    """One section to compute: `fn` runs in the threadpool; `key` identifies the profile it serves."""
+
+    name: str
+    key: Hashable
+    fn: Callable[[], Any]
+
+
+@dataclass
+class SectionResult:
+    value: Any  # None when timed out without a last good value
+    status: str
+
+
+def section_timeout(name: str) -> float | None:
+    """Seconds to wait for a section: min(its budget, DASHBOARD_DEADLINE), ignoring zeros; None = no limit."""
+    settings = get_settings()
+    budget = {
+        "news": settings.DASHBOARD_NEWS_BUDGET,
+        "ai": settings.DASHBOARD_AI_BUDGET,
+        "meme": settings.DASHBOARD_MEME_BUDGET,
+    }.get(name, 0.0)
+    limits = [t for t in (budget, settings.DASHBOARD_DEADLINE) if t > 0]
+    return min(limits) if limits else None
+
+
+def _run(job: SectionJob) -> Any:
+    try:
+        with timed(job.name):
+            value = job.fn()
+    except Exception:
+        logger.exception("Dashboard section %s failed", job.name)
+        raise
+    if value:
+        _last_good.set((job.name, job.key), value)
+    return value
+
+
+def _finished(task: asyncio.Future) -> None:
+    _background.discard(task)
+    if not task.cancelled():
+        task.exception()  # logged in _run; retrieved so asyncio does not warn about it
+
+
+def _start(job: SectionJob) -> asyncio.Future:
+    """Run the job in the threadpool, or join the one already running for its section and key."""
+    return asyncio.ensure_future(
+        _section_flight.do_async((job.name, job.key), lambda: run_in_threadpool(_run, job))
+    )
+
+
+async def collect_sections(jobs: list[SectionJob]) -> dict[str, SectionResult]:
+    """Start all jobs at once and return each section's value and status, by name, within its timeout."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks: list[tuple[SectionJob, asyncio.Future]] = []
+    for job in jobs:
+        task = _start(job)
+        _background.add(task)
+        task.add_done_callback(_finished)
+        tasks.append((job, task))
+
+    results: dict[str, SectionResult] = {}
+    for job, task in tasks:
+        timeout = section_timeout(job.name)
+        remaining = None if timeout is None else max(0.0, timeout - (loop.time() - start))
+        await asyncio.wait({task}, timeout=remaining)
+        if task.done() and not task.cancelled() and task.exception() is None:
+            results[job.name] = SectionResult(task.result(), SECTION_FRESH)
+        else:
+            last = _last_good.get((job.name, job.key))
+            status = SECTION_STALE if last is not None else SECTION_TIMED_OUT
+            results[job.name] = SectionResult(last, status)
+            if not task.done():
+                logger.info("Dashboard section %s missed its %.2fs budget (%s)", job.name, timeout, status)
+        SECTION_RESULTS.inc(job.name, results[job.name].status)
+    return results
+
+
+def dashboard_etag(*inputs: Any) -> str:
+    """
+    Weak ETag over everything a response depends on (user, preferences, source versions, votes).
+    Weak because the random meme is not an input: bodies rendered for the same inputs are
+    equivalent, not byte-identical.
+    """
+    return 'W/"%s"' % hashlib.blake2b(repr(inputs).encode(), digest_size=16).hexdigest()
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header value lists etag (weak comparison, as for GET)."""
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A user's rendered dashboard. Shared between requests: never mutate `votes`."""
+
+    key: str  # dashboard_etag over the user, preferences, sections and source versions
+    votes: dict[tuple[str, str], tuple[int, int, str | None]]  # get_item_votes result it shows
+    body: bytes
+
+    @property
+    def etag(self) -> str:
+        return dashboard_etag(self.key, tuple(self.votes.items()))
+
+
+def cached_response(user_id: Hashable, key: str) -> CachedResponse | None:
+    """The user's cached dashboard if it was rendered for this key (its votes still need checking)."""
+    entry = _responses.get(user_id)
+    return entry if entry is not None and entry.key == key else None
+
+
+def store_response(
+    user_id: Hashable, key: str, votes: dict[tuple[str, str], tuple[int, int, str | None]], body: bytes
+) -> CachedResponse:
+    entry = CachedResponse(key, votes, body)
+    _responses.set(user_id, entry)
+    return entry
+
+
+def invalidate_dashboard(user_id: Hashable) -> None:
+    """Drop the user's cached dashboard response (call after committing preference changes)."""
+    _responses.pop(user_id)
+
+
+def clear_last_good() -> None:
+    """Clear the last-good section values (for tests)."""
+    _last_good.clear()
+
+
+def clear_fragments() -> None:
+    """Clear the shared section fragments and per-user responses (for tests)."""
+    _fragments.clear()
+    _responses.clear()
@@ -1,5 +1,6 @@
 """
 Fun crypto meme for the dashboard. Loads from JSON with categories by investor_type.
+The parsed file is cached for MEMES_CACHE_TTL seconds.
 """
 
 import json
@@ -7,6 +8,7 @@ import logging
 import random
 from pathlib import Path
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
 from app.schemas.dashboard import MemeItem
 
@@ -15,6 +17,9 @@ logger = logging.getLogger(__name__)
 # Default path when MEMES_JSON_PATH not set (backend/data/memes.json)
 _DEFAULT_MEMES_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "memes.json"
 
+# memes file path -> parsed categories (a missing or invalid file is not cached)
+_memes_cache = TTLCache(maxsize=4, ttl=get_settings().MEMES_CACHE_TTL, name="memes")
+
 
 def _get_memes_path() -> Path:
     """Path to memes.json: from env MEMES_JSON_PATH or default backend/data/memes.json."""
@@ -27,6 +32,9 @@ def _get_memes_path() -> Path:
 def _load_memes_by_category() -> dict[str, list[dict]]:
     """Load memes.json and return categories dict (category -> list of {title, url, image_url})."""
     path = _get_memes_path()
+    cached = _memes_cache.get(str(path))
+    if cached is not None:
+        return cached
     if not path.is_file():
         logger.warning("Memes file not found: %s", path)
         return {}
@@ -39,9 +47,15 @@ def _load_memes_by_category() -> dict[str, list[dict]]:
     categories = data.get("categories")
     if not isinstance(categories, dict):
         return {}
+    _memes_cache.set(str(path), categories)
     return categories
 
 
+def clear_memes_cache() -> None:
+    """Clear the in-memory memes cache (for tests)."""
+    _memes_cache.clear()
+
+
 def get_meme(investor_type: str | None = None) -> MemeItem | None:
     """
     Return a random crypto meme. Picks from the category matching investor_type
@@ -1,11 +1,18 @@
 """
 Market news via CryptoCompare News API (free, no key). Fallback to static_news.json on failure.
 Only headline, link, timestamp, and coins are used; source attributed to CryptoCompare.
+Fetched articles are kept in an in-memory corpus (refreshed after NEWS_CACHE_TTL seconds);
+pages are served from that corpus with an opaque (published_at, id) cursor.
 """
 
+import base64
+import binascii
+import hashlib
 import json
 import logging
 import re
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -13,6 +20,8 @@ from typing import Any
 import httpx
 
 from app.core.config import get_settings
+from app.core.metrics import CACHE_REQUESTS, FALLBACKS, track_provider
+from app.core.singleflight import SingleFlight
 from app.models.enums import AssetSymbol
 from app.schemas.dashboard import NewsItem
 
@@ -30,6 +39,14 @@ NEWS_SOURCE_ATTRIBUTION = "CryptoCompare"
 _KNOWN_SYMBOLS = [s.value for s in AssetSymbol]
 _KNOWN_SYMBOLS_SET = set(_KNOWN_SYMBOLS)
 
+# In-memory news corpus: all parsed articles, newest first (published_at desc, id desc).
+_news_corpus: list[dict[str, Any]] = []
+_news_corpus_at: float = 0.0  # time.monotonic() of the last refresh; 0 = never
+_news_version = 0  # bumped whenever the corpus is replaced
+_news_lock = threading.Lock()
+# Concurrent corpus refreshes (cold or expired cache) share one upstream request
+_news_flight = SingleFlight("news")
+
 
 def _extract_coins_from_text(text: str) -> list[str]:
     """Find coin symbols mentioned in text (e.g. BTC, ETH) using word boundaries."""
@@ -53,6 +70,38 @@ def _published_on_to_iso(published_on: int | None) -> str:
         return ""
 
 
+def _news_item_id(url: str) -> str:
+    """Stable id for an article without a provider id: short hash of its URL."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+def _sort_key(item: dict[str, Any]) -> tuple[str, str]:
+    """Feed order key: (published_at, id); the corpus is sorted by it descending."""
+    return (item.get("published_at") or "", item.get("id") or "")
+
+
+def encode_news_cursor(item: dict[str, Any]) -> str:
+    """Opaque cursor pointing just after `item` in feed order."""
+    raw = json.dumps(list(_sort_key(item)), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_news_cursor(cursor: str) -> tuple[str, str]:
+    """Decode a cursor from encode_news_cursor; raise ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeEncodeError) as e:
+        raise ValueError("Invalid news cursor") from e
+    if (
+        not isinstance(value, list)
+        or len(value) != 2
+        or not all(isinstance(v, str) for v in value)
+    ):
+        raise ValueError("Invalid news cursor")
+    return value[0], value[1]
+
+
 def _parse_cryptocompare_response(data: dict[str, Any]) -> list[dict[str, Any]]:
     """Parse CryptoCompare API response into list of { title, url, published_at, coins }."""
     items: list[dict[str, Any]] = []
@@ -88,6 +137,7 @@ def _parse_cryptocompare_response(data: dict[str, Any]) -> list[dict[str, Any]]:
         coins = sorted(coins_set)  # stable order for JSON
 
         items.append({
+            "id": str(r.get("id") or "").strip() or _news_item_id(url),
             "title": title,
             "url": url,
             "published_at": published_at,
@@ -130,28 +180,27 @@ def _load_static_news() -> list[dict[str, Any]]:
             coins = []
         coins = [str(c).strip().upper() for c in coins if c]
         if title and url:
-            items.append({"title": title, "url": url, "published_at": published_at, "coins": coins})
+            items.append({
+                "id": _news_item_id(url),
+                "title": title,
+                "url": url,
+                "published_at": published_at,
+                "coins": coins,
+            })
     return items
 
 
-def fetch_market_news(user_coins: list[str]) -> list[dict[str, Any]]:
+def refresh_news_corpus() -> list[dict[str, Any]]:
     """
-    Fetch latest market news from CryptoCompare News API; filter by user coins; limit 10.
-    Returns list of dicts with keys: title, url, published_at, coins (list of symbols).
-    On API failure (network, rate limit, parse error), falls back to static_news.json.
-    Output is JSON-ready for FastAPI/frontend. Source: CryptoCompare (headline/link/timestamp/coins only).
+    Fetch latest market news from CryptoCompare (static_news.json on failure) and replace the
+    in-memory corpus. Returns the new corpus, newest first.
     """
-    # Step 1: Normalize user coins for filtering (uppercase, non-empty)
-    user_set = {str(c).strip().upper() for c in (user_coins or []) if c}
-
-    # Step 2: Request latest news from CryptoCompare (no API key needed)
     settings = get_settings()
     news_url = settings.CRYPTOCOMPARE_NEWS_URL or "https://min-api.cryptocompare.com/data/v2/news/"
     news_timeout = max(5.0, float(settings.NEWS_TIMEOUT or 10))
-    news_limit = max(1, int(settings.NEWS_LIMIT or 10))
     raw_items: list[dict[str, Any]] = []
     try:
-        with httpx.Client(timeout=news_timeout) as client:
+        with track_provider("cryptocompare"), httpx.Client(timeout=news_timeout) as client:
             response = client.get(news_url)
             response.raise_for_status()
             data = response.json()
@@ -160,32 +209,119 @@ def fetch_market_news(user_coins: list[str]) -> list[dict[str, Any]]:
         logger.warning("CryptoCompare API failed, using static fallback: %s", e)
         raw_items = []
 
-    # Step 3: If API returned no items, use local static_news.json
+    # If API returned no items, use local static_news.json
     if not raw_items:
+        FALLBACKS.inc("cryptocompare_static")
         raw_items = _load_static_news()
 
-    # Step 4: Filter to articles related to at least one of the user's coins (or all if no filter)
-    if user_set:
-        filtered = [i for i in raw_items if set(i.get("coins") or []) & user_set]
-    else:
-        filtered = raw_items
+    # Drop duplicate ids (same article listed twice) and order newest first
+    corpus = list({i["id"]: i for i in raw_items}.values())
+    corpus.sort(key=_sort_key, reverse=True)
 
-    # Step 5: Limit to latest news_limit items
-    return filtered[:news_limit]
+    global _news_corpus_at, _news_version
+    with _news_lock:
+        _news_corpus[:] = corpus
+        _news_corpus_at = time.monotonic()
+        _news_version += 1
+    return corpus
 
 
-def get_news(assets: list[str] | None = None) -> tuple[list[NewsItem], str | None]:
+def news_version() -> int | None:
     """
-    Fetch recent crypto market news (CryptoCompare + static fallback).
-    Returns (news_list, None) on success, or ([], message) when both API and fallback fail.
+    Version of the news corpus, bumped on every refresh. None while the corpus is empty or older
+    than NEWS_CACHE_TTL (the next read refreshes it), so derived data is never reused past expiry.
     """
-    try:
-        items = fetch_market_news(assets or [])
-    except Exception as e:
-        logger.exception("fetch_market_news failed: %s", e)
-        return [], NEWS_UNAVAILABLE_MESSAGE
+    ttl = max(0, int(get_settings().NEWS_CACHE_TTL))
+    with _news_lock:
+        if not _news_corpus or time.monotonic() - _news_corpus_at >= ttl:
+            return None
+        return _news_version
+
+
+def _get_news_corpus(allow_refresh: bool = True) -> list[dict[str, Any]]:
+    """
+    Current corpus snapshot. Refreshes from upstream when empty, or when stale and allow_refresh
+    is set (first page only – follow-up pages never trigger an upstream fetch).
+    Concurrent refreshes are coalesced into one upstream request.
+    """
+    ttl = max(0, int(get_settings().NEWS_CACHE_TTL))
+    with _news_lock:
+        corpus = list(_news_corpus)
+        seen_at = _news_corpus_at
+    if corpus and (not allow_refresh or time.monotonic() - seen_at < ttl):
+        CACHE_REQUESTS.inc("news", "hit")
+        return corpus
+    CACHE_REQUESTS.inc("news", "miss")
 
-    # Map to dashboard schema and attribute source
+    def refresh_unless_done() -> list[dict[str, Any]]:
+        # Another flight may have refreshed the corpus since our snapshot was taken
+        with _news_lock:
+            if _news_corpus and _news_corpus_at != seen_at:
+                return list(_news_corpus)
+        return refresh_news_corpus()
+
+    return _news_flight.do("corpus", refresh_unless_done)
+
+
+def fetch_market_news_page(
+    user_coins: list[str],
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    One page of market news filtered by user coins, newest first.
+    Returns (items, next_cursor); next_cursor is None on the last page. Items are dicts with keys:
+    id, title, url, published_at, coins. A cursor continues from the in-memory corpus and never
+    refetches upstream. Raises ValueError for a malformed cursor.
+    """
+    settings = get_settings()
+    max_page = max(1, int(settings.NEWS_MAX_PAGE_SIZE or 50))
+    page_size = max(1, min(int(limit or settings.NEWS_LIMIT or 10), max_page))
+    after = decode_news_cursor(cursor) if cursor else None
+
+    # Normalize user coins for filtering (uppercase, non-empty)
+    user_set = {str(c).strip().upper() for c in (user_coins or []) if c}
+    corpus = _get_news_corpus(allow_refresh=after is None)
+
+    page: list[dict[str, Any]] = []
+    has_more = False
+    for item in corpus:
+        if after is not None and _sort_key(item) >= after:
+            continue
+        # Only articles related to at least one of the user's coins (or all if no filter)
+        if user_set and not set(item.get("coins") or []) & user_set:
+            continue
+        if len(page) == page_size:
+            has_more = True
+            break
+        page.append(item)
+
+    next_cursor = encode_news_cursor(page[-1]) if page and has_more else None
+    return page, next_cursor
+
+
+def fetch_market_news(user_coins: list[str]) -> list[dict[str, Any]]:
+    """
+    Latest market news from CryptoCompare filtered by user coins; limit NEWS_LIMIT (default 10).
+    Returns list of dicts with keys: id, title, url, published_at, coins (list of symbols).
+    On API failure (network, rate limit, parse error), falls back to static_news.json.
+    Output is JSON-ready for FastAPI/frontend. Source: CryptoCompare (headline/link/timestamp/coins only).
+    """
+    items, _ = fetch_market_news_page(user_coins)
+    return items
+
+
+def clear_news_cache() -> None:
+    """Clear the in-memory news corpus (for tests)."""
+    global _news_corpus_at, _news_version
+    with _news_lock:
+        _news_corpus.clear()
+        _news_corpus_at = 0.0
+        _news_version += 1
+
+
+def _to_news_items(items: list[dict[str, Any]]) -> list[NewsItem]:
+    """Map corpus dicts to the dashboard schema and attribute source."""
     news: list[NewsItem] = []
     for it in items:
         # Include coin symbols so frontend can show "News for: BTC, ETH"
@@ -194,6 +330,7 @@ def get_news(assets: list[str] | None = None) -> tuple[list[NewsItem], str | Non
             coins = []
         news.append(
             NewsItem(
+                id=it.get("id") or "",
                 title=it.get("title") or "",
                 url=it.get("url") or "",
                 source=NEWS_SOURCE_ATTRIBUTION,
@@ -201,10 +338,43 @@ def get_news(assets: list[str] | None = None) -> tuple[list[NewsItem], str | Non
                 coins=coins,
             )
         )
-    return news, None
+    return news
+
+
+def get_news(assets: list[str] | None = None) -> tuple[list[NewsItem], str | None]:
+    """
+    Fetch recent crypto market news (CryptoCompare + static fallback).
+    Returns (news_list, None) on success, or ([], message) when both API and fallback fail.
+    """
+    try:
+        items = fetch_market_news(assets or [])
+    except Exception as e:
+        logger.exception("fetch_market_news failed: %s", e)
+        return [], NEWS_UNAVAILABLE_MESSAGE
+    return _to_news_items(items), None
+
+
+def get_news_page(
+    assets: list[str] | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[list[NewsItem], str | None, str | None]:
+    """
+    One page of the news feed. Returns (news_list, next_cursor, None) on success, or
+    ([], None, message) when loading fails. Raises ValueError for a malformed cursor.
+    """
+    try:
+        items, next_cursor = fetch_market_news_page(assets or [], limit=limit, cursor=cursor)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.exception("fetch_market_news_page failed: %s", e)
+        return [], None, NEWS_UNAVAILABLE_MESSAGE
+    return _to_news_items(items), next_cursor, None
 
 
 # Example usage (optional):
 #   from app.services.news_service import fetch_market_news
 #   items = fetch_market_news(["BTC", "ETH"])
-#   # items is a list of dicts: [{"title": "...", "url": "...", "published_at": "...", "coins": ["BTC", ...]}, ...]
+#   # items is a list of dicts: [{"id": "...", "title": "...", "url": "...", "published_at": "...", "coins": ["BTC", ...]}, ...]
+#   page, next_cursor = fetch_market_news_page(["BTC"], limit=20, cursor=next_cursor)
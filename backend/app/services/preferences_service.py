@@ -1,29 +1,37 @@
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principal import invalidate_principal
 from app.models import Preferences
 from app.schemas.preferences import OnboardingRequest
+from app.services.dashboard_service import invalidate_dashboard
 
 
-def save_preferences(
-    db: Session,
+async def save_preferences(
+    db: AsyncSession,
     user_id: UUID,
     payload: OnboardingRequest,
 ) -> Preferences:
     """
     Save or update onboarding preferences for a user.
     Prevents duplicate rows: one preferences row per user (create or update).
+    The user's cached principal and dashboard response are invalidated after the commit.
     """
-    existing = db.query(Preferences).filter(Preferences.user_id == user_id).first()
+    existing = (
+        await db.execute(select(Preferences).where(Preferences.user_id == user_id))
+    ).scalar_one_or_none()
     content_types_values = [x.value for x in payload.content_types]
     assets_values = [a.value for a in payload.assets]
     if existing:
         existing.assets = assets_values
         existing.investor_type = payload.investor_type
         existing.content_types = content_types_values
-        db.commit()
-        db.refresh(existing)
+        await db.commit()
+        invalidate_principal(user_id)
+        invalidate_dashboard(user_id)
+        await db.refresh(existing)
         return existing
     pref = Preferences(
         user_id=user_id,
@@ -32,6 +40,8 @@ def save_preferences(
         content_types=content_types_values,
     )
     db.add(pref)
-    db.commit()
-    db.refresh(pref)
+    await db.commit()
+    invalidate_principal(user_id)
+    invalidate_dashboard(user_id)
+    await db.refresh(pref)
     return pref
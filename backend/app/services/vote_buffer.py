@@ -0,0 +1,368 @@
+"""
+Write-behind vote buffer (VOTE_WRITE_BEHIND). Votes are acknowledged once appended to a local
+append-only log and fsync'd; a background task merges the latest state per (user, section, item)
+and writes it to the DB in batches through vote_service.apply_vote_states.
+
+- Durability: every acknowledged vote is in the log until it has been flushed; the log is replayed
+  on startup and rewritten (compacted to the still-pending entries) after each flush. The rewrite
+  is fsync'd outside the buffer lock and swapped in with a rename that is made durable by an fsync
+  of the directory.
+- Group commit: concurrent requests share one fsync when they arrive while another is in progress.
+- Bounded memory: at most VOTE_BUFFER_MAX_PENDING distinct items are pending; beyond that new items
+  are rejected with VoteBufferFull (updates to already-pending items are still accepted).
+- The log belongs to one process: run one worker per VOTE_LOG_PATH.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.models.enums import SectionType, VoteType
+from app.services.vote_service import _normalize_item, apply_vote_states
+
+logger = logging.getLogger(__name__)
+
+# Default log path when VOTE_LOG_PATH not set (backend/data/vote_log.jsonl)
+_DEFAULT_LOG_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "vote_log.jsonl"
+
+_Key = tuple[UUID, str, str]
+
+
+class VoteBufferFull(Exception):
+    """Too many distinct items pending; the caller should retry later."""
+
+
+class _Pending:
+    """Latest state for one item; `since` is when the item became pending (kept across updates)."""
+
+    __slots__ = ("op", "vote_type", "since")
+
+    def __init__(self, op: str, vote_type: str | None, since: float) -> None:
+        self.op = op
+        self.vote_type = vote_type
+        self.since = since
+
+
+# Lock order: _rewrite_lock, then _sync_lock, then _lock
+_lock = threading.Lock()  # pending, log file, counters
+_sync_lock = threading.Lock()  # serializes fsync (group commit)
+_rewrite_lock = threading.Lock()  # one log rewrite at a time
+_pending: "OrderedDict[_Key, _Pending]" = OrderedDict()
+_log_file: Any = None
+_seq = 0  # last sequence number written to the log
+_synced_seq = 0  # last sequence number known to be on disk
+
+_stats: dict[str, float] = {
+    "enqueued": 0,
+    "rejected": 0,
+    "flushes": 0,
+    "flushed_items": 0,
+    "flush_failures": 0,
+    "dropped": 0,
+    "last_flush_size": 0,
+    "max_flush_size": 0,
+    "last_flush_lag_seconds": 0.0,
+    "max_flush_lag_seconds": 0.0,
+    "replayed": 0,
+}
+
+_flush_wakeup: asyncio.Event | None = None
+_flush_loop: asyncio.AbstractEventLoop | None = None
+_flusher: asyncio.Task | None = None
+
+
+def _log_path() -> Path:
+    """Path to the vote log: from env VOTE_LOG_PATH or default backend/data/vote_log.jsonl."""
+    settings = get_settings()
+    if (settings.VOTE_LOG_PATH or "").strip():
+        return Path(settings.VOTE_LOG_PATH.strip())
+    return _DEFAULT_LOG_PATH
+
+
+def _entry_line(key: _Key, op: str, vote_type: str | None) -> str:
+    return json.dumps({"u": str(key[0]), "s": key[1], "i": key[2], "op": op, "v": vote_type}) + "\n"
+
+
+def _fsync_up_to(seq: int) -> None:
+    """Make sure log writes up to `seq` are on disk; one fsync covers every write made before it."""
+    global _synced_seq
+    with _sync_lock:
+        if _synced_seq >= seq:
+            return
+        with _lock:
+            target = _seq
+            _log_file.flush()
+            # own descriptor: a concurrent log rewrite may close _log_file meanwhile
+            fd = os.dup(_log_file.fileno())
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        _synced_seq = max(_synced_seq, target)
+
+
+def _wake_flusher() -> None:
+    if _flush_loop is not None and _flush_wakeup is not None:
+        _flush_loop.call_soon_threadsafe(_flush_wakeup.set)
+
+
+def enqueue_votes(
+    user_id: UUID,
+    operations: Sequence[tuple[str, SectionType | str, str, VoteType | str | None]],
+) -> None:
+    """
+    Durably queue (op, section_type, item_id, vote_type) operations of one user; returns after the
+    log append is fsync'd. Blocking (file I/O): call from a worker thread.
+    Raises ValueError for an empty item_id and VoteBufferFull when the buffer is at capacity
+    (nothing is queued in either case).
+    """
+    global _seq
+    entries: list[tuple[_Key, str, str | None]] = []
+    for op, section_type, item_id, vote_type in operations:
+        key = (user_id, *_normalize_item(section_type, item_id))
+        entries.append((key, op, vote_type.value if hasattr(vote_type, "value") else vote_type))
+
+    max_pending = get_settings().VOTE_BUFFER_MAX_PENDING
+    with _lock:
+        if _log_file is None:
+            raise RuntimeError("Vote buffer is not running")
+        new_keys = {key for key, _, _ in entries if key not in _pending}
+        if len(_pending) + len(new_keys) > max_pending:
+            _stats["rejected"] += 1
+            raise VoteBufferFull("Vote buffer is full")
+        _log_file.write("".join(_entry_line(*e) for e in entries))
+        _seq += 1
+        seq = _seq
+        now = time.monotonic()
+        for key, op, vote_type in entries:
+            prev = _pending.get(key)
+            _pending[key] = _Pending(op, vote_type, prev.since if prev else now)
+        _stats["enqueued"] += len(entries)
+        full_batch = len(_pending) >= get_settings().VOTE_FLUSH_MAX_BATCH
+    _fsync_up_to(seq)
+    if full_batch:
+        _wake_flusher()
+
+
+def _fsync_dir(path: Path) -> None:
+    """fsync a directory, so a rename inside it survives a crash (POSIX)."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _rewrite_log() -> None:
+    """
+    Compact the log to the pending entries (atomic replace). The snapshot is written and fsync'd
+    without holding _lock, so enqueue_votes is not blocked on it; entries appended meanwhile are
+    copied over from the old log before the swap.
+    """
+    global _log_file, _synced_seq
+    path = _log_path()
+    tmp = path.with_name(path.name + ".tmp")
+    with _rewrite_lock:
+        with _lock:
+            snapshot = "".join(_entry_line(k, p.op, p.vote_type) for k, p in _pending.items())
+            snapshot_seq = _seq
+            offset = 0
+            if _log_file is not None:
+                _log_file.flush()
+                offset = os.fstat(_log_file.fileno()).st_size
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        with _sync_lock:
+            with _lock:
+                if _seq != snapshot_seq:
+                    # appended after the snapshot: a small tail of the old log
+                    _log_file.flush()
+                    with open(path, "rb") as old_log, open(tmp, "ab") as f:
+                        old_log.seek(offset)
+                        f.write(old_log.read())
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(tmp, path)
+                if _log_file is not None:
+                    _log_file.close()
+                _log_file = open(path, "a", encoding="utf-8")
+                swapped_seq = _seq
+            # appends to the new file are not acknowledged before this (they wait for _sync_lock)
+            _fsync_dir(path.parent)
+            # everything acknowledged so far is either in the DB or in the rewritten file
+            _synced_seq = max(_synced_seq, swapped_seq)
+
+
+def _replay_log() -> int:
+    """Load pending entries from the log (last state per item wins). Caller holds _lock."""
+    path = _log_path()
+    if not path.exists():
+        return 0
+    count = 0
+    now = time.monotonic()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                d = json.loads(line)
+                key = (UUID(d["u"]), str(d["s"]), str(d["i"]))
+                op, vote_type = d["op"], d.get("v")
+            except (ValueError, KeyError, TypeError):
+                # a torn last line from a crash mid-append was never acknowledged
+                logger.warning("Skipping unreadable vote log line")
+                continue
+            prev = _pending.get(key)
+            _pending[key] = _Pending(op, vote_type, prev.since if prev else now)
+            count += 1
+    return count
+
+
+def _take_batch(limit: int) -> dict[_Key, _Pending]:
+    with _lock:
+        return {k: _pending[k] for k in list(_pending)[:limit]}
+
+
+async def _write_states(states: dict[_Key, tuple[str, str | None]]) -> None:
+    async with AsyncSessionLocal() as db:
+        await apply_vote_states(db, states)
+
+
+async def _write_each(states: dict[_Key, tuple[str, str | None]]) -> None:
+    """Write items one by one, dropping those the DB rejects (e.g. the user was deleted meanwhile)."""
+    for key, state in states.items():
+        try:
+            await _write_states({key: state})
+        except IntegrityError as e:
+            with _lock:
+                _stats["dropped"] += 1
+            logger.warning("Dropping queued vote %s/%s of user %s: %s", key[1], key[2], key[0], e)
+
+
+def _finish_flush(batch: dict[_Key, _Pending]) -> None:
+    """Drop written items from the buffer, compact the log and record the flush."""
+    lag = time.monotonic() - min(p.since for p in batch.values())
+    with _lock:
+        for key, p in batch.items():
+            # keep items that changed again while the batch was being written
+            if _pending.get(key) is p:
+                del _pending[key]
+        _stats["flushes"] += 1
+        _stats["flushed_items"] += len(batch)
+        _stats["last_flush_size"] = len(batch)
+        _stats["max_flush_size"] = max(_stats["max_flush_size"], len(batch))
+        _stats["last_flush_lag_seconds"] = lag
+        _stats["max_flush_lag_seconds"] = max(_stats["max_flush_lag_seconds"], lag)
+    _rewrite_log()
+
+
+async def flush_votes() -> int:
+    """Write up to VOTE_FLUSH_MAX_BATCH pending items to the DB; returns how many were written."""
+    batch = _take_batch(get_settings().VOTE_FLUSH_MAX_BATCH)
+    if not batch:
+        return 0
+    states = {k: (p.op, p.vote_type) for k, p in batch.items()}
+    try:
+        try:
+            await _write_states(states)
+        except IntegrityError:
+            await _write_each(states)
+    except Exception as e:
+        with _lock:
+            _stats["flush_failures"] += 1
+        logger.warning("Vote flush failed (%d items, will retry): %s", len(batch), e)
+        raise
+    await run_in_threadpool(_finish_flush, batch)
+    return len(batch)
+
+
+async def _flush_forever() -> None:
+    interval = get_settings().VOTE_FLUSH_INTERVAL
+    while True:
+        try:
+            await asyncio.wait_for(_flush_wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        _flush_wakeup.clear()
+        try:
+            while await flush_votes() >= get_settings().VOTE_FLUSH_MAX_BATCH:
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await asyncio.sleep(interval)
+
+
+async def start_vote_buffer() -> None:
+    """Open the log, replay entries left by a previous run and start the background flusher."""
+    global _flush_wakeup, _flush_loop, _flusher
+    path = _log_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        replayed = _replay_log()
+        _stats["replayed"] += replayed
+    _rewrite_log()
+    if replayed:
+        logger.info("Replayed %d queued votes from %s", replayed, path)
+    _flush_loop = asyncio.get_running_loop()
+    _flush_wakeup = asyncio.Event()
+    if replayed:
+        _flush_wakeup.set()
+    _flusher = asyncio.create_task(_flush_forever())
+
+
+async def stop_vote_buffer() -> None:
+    """Stop the flusher, write everything still pending and close the log."""
+    global _log_file, _flusher, _flush_loop, _flush_wakeup
+    if _flusher is not None:
+        _flusher.cancel()
+        try:
+            await _flusher
+        except asyncio.CancelledError:
+            pass
+        _flusher = None
+    try:
+        while await flush_votes():
+            pass
+    except Exception:
+        logger.warning("Unflushed votes remain in %s; they will be replayed on next start", _log_path())
+    with _lock:
+        if _log_file is not None:
+            _log_file.close()
+            _log_file = None
+    _flush_loop = _flush_wakeup = None
+
+
+def vote_buffer_stats() -> dict[str, Any]:
+    """Queue depth, age of the oldest pending item (seconds) and flush counters since startup."""
+    with _lock:
+        oldest = next(iter(_pending.values()), None)
+        return {
+            "enabled": _log_file is not None,
+            "pending": len(_pending),
+            "oldest_pending_seconds": time.monotonic() - oldest.since if oldest else 0.0,
+            **_stats,
+        }
+
+
+def clear_vote_buffer() -> None:
+    """Drop pending items and reset counters (for tests)."""
+    global _seq, _synced_seq
+    with _lock:
+        _pending.clear()
+        _seq = _synced_seq = 0
+        for k in _stats:
+            _stats[k] = 0
@@ -1,18 +1,94 @@
 """
 Vote service: store or update user feedback (up/down) per dashboard item.
 Idempotent: one row per (user_id, section_type, item_id); update if exists.
+Each operation is a single statement (INSERT ... ON CONFLICT / DELETE ... RETURNING), so
+concurrent first votes for the same item can't race into an IntegrityError.
+Per-item totals in vote_counts are adjusted in the same transaction: the upsert only touches
+rows whose vote_type actually changes, so every returned row maps to a known +1/-1 delta.
 """
 
+import base64
+import binascii
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime
+from decimal import Decimal
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Vote
+from app.db.session import AsyncSessionLocal
+from app.models import Vote, VoteCount
 from app.models.enums import SectionType, VoteType
 
+_OTHER_VOTE = {VoteType.up.value: VoteType.down.value, VoteType.down.value: VoteType.up.value}
 
-def save_or_update_vote(
-    db: Session,
+# Rows fetched per round trip by the server-side cursor of vote exports
+_EXPORT_YIELD_PER = 1000
+EXPORT_COLUMNS = ("section_type", "item_id", "vote_type", "created_at")
+
+
+def normalize_item_id(item_id: str) -> str:
+    """Stored form of an item id: stripped, then at most 255 characters (code points, like VARCHAR(255))."""
+    return (item_id or "").strip()[:255]
+
+
+def _normalize_item(section_type: SectionType | str, item_id: str) -> tuple[str, str]:
+    """(section value, normalize_item_id(item_id)); raise ValueError for an empty item_id."""
+    section_val = section_type.value if hasattr(section_type, "value") else str(section_type)
+    item_id_stripped = normalize_item_id(item_id)
+    if not item_id_stripped:
+        raise ValueError("item_id must be non-empty")
+    return section_val, item_id_stripped
+
+
+def _upsert_votes(rows: list[dict]):
+    """
+    INSERT ... ON CONFLICT DO UPDATE for (user_id, section_type, item_id, vote_type) rows. Unchanged
+    votes are skipped by the WHERE, so only inserted or flipped rows come back (with (xmax = 0) = inserted).
+    """
+    stmt = insert(Vote).values(rows)
+    return stmt.on_conflict_do_update(
+        constraint="uq_vote_user_section_item",
+        set_={"vote_type": stmt.excluded.vote_type},
+        where=Vote.vote_type != stmt.excluded.vote_type,
+    ).returning(
+        Vote.user_id,
+        Vote.section_type,
+        Vote.item_id,
+        Vote.vote_type,
+        literal_column("(xmax = 0)").label("inserted"),
+    )
+
+
+def _add_delta(deltas: dict[tuple[str, str], list[int]], key: tuple[str, str], vote_type: str, n: int) -> None:
+    delta = deltas.setdefault(key, [0, 0])
+    delta[0 if vote_type == VoteType.up.value else 1] += n
+
+
+async def _apply_count_deltas(db: AsyncSession, deltas: dict[tuple[str, str], list[int]]) -> None:
+    """Add [up, down] deltas to vote_counts with one multi-row upsert (rows in key order to avoid deadlocks)."""
+    rows = [
+        {"section_type": key[0], "item_id": key[1], "up": up, "down": down}
+        for key, (up, down) in sorted(deltas.items())
+        if up or down
+    ]
+    if not rows:
+        return
+    stmt = insert(VoteCount).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[VoteCount.section_type, VoteCount.item_id],
+        set_={"up": VoteCount.up + stmt.excluded.up, "down": VoteCount.down + stmt.excluded.down},
+    )
+    await db.execute(stmt)
+
+
+async def save_or_update_vote(
+    db: AsyncSession,
     user_id: UUID,
     section_type: SectionType | str,
     item_id: str,
@@ -21,66 +97,338 @@ def save_or_update_vote(
     """
     Store a vote or update existing one. Unique constraint (user_id, section_type, item_id)
     guarantees at most one vote per user per item per section – no duplicate rows.
+    One upsert statement; RETURNING (xmax = 0) tells a fresh insert from an update.
     Returns "created" or "updated".
     """
-    section_val = section_type.value if hasattr(section_type, "value") else str(section_type)
+    section_val, item_id_stripped = _normalize_item(section_type, item_id)
     vote_val = vote_type.value if hasattr(vote_type, "value") else str(vote_type)
-    item_id_stripped = (item_id or "").strip()[:255]
-    if not item_id_stripped:
-        raise ValueError("item_id must be non-empty")
+    key = (section_val, item_id_stripped)
 
-    existing = (
-        db.query(Vote)
-        .filter(
-            Vote.user_id == user_id,
-            Vote.section_type == section_val,
-            Vote.item_id == item_id_stripped,
+    row = (
+        await db.execute(
+            _upsert_votes(
+                [{"user_id": user_id, "section_type": section_val, "item_id": item_id_stripped, "vote_type": vote_val}]
+            )
         )
-        .first()
-    )
-    if existing:
-        existing.vote_type = vote_val
-        db.commit()
-        db.refresh(existing)
-        return "updated"
-    vote = Vote(
-        user_id=user_id,
-        section_type=section_val,
-        item_id=item_id_stripped,
-        vote_type=vote_val,
-    )
-    db.add(vote)
-    db.commit()
-    db.refresh(vote)
-    return "created"
+    ).first()
+    deltas: dict[tuple[str, str], list[int]] = {}
+    if row is not None:
+        _add_delta(deltas, key, vote_val, 1)
+        if not row.inserted:
+            _add_delta(deltas, key, _OTHER_VOTE[vote_val], -1)
+    await _apply_count_deltas(db, deltas)
+    await db.commit()
+    return "created" if row is not None and row.inserted else "updated"
 
 
-def cancel_vote(
-    db: Session,
+async def cancel_vote(
+    db: AsyncSession,
     user_id: UUID,
     section_type: SectionType | str,
     item_id: str,
 ) -> bool:
     """
-    Remove the user's vote for the given (section_type, item_id).
+    Remove the user's vote for the given (section_type, item_id) with one DELETE ... RETURNING.
     Returns True if a vote was deleted, False if none existed.
     """
-    section_val = section_type.value if hasattr(section_type, "value") else str(section_type)
-    item_id_stripped = (item_id or "").strip()[:255]
-    if not item_id_stripped:
-        raise ValueError("item_id must be non-empty")
+    section_val, item_id_stripped = _normalize_item(section_type, item_id)
 
-    existing = (
-        db.query(Vote)
-        .filter(
+    stmt = (
+        delete(Vote)
+        .where(
             Vote.user_id == user_id,
             Vote.section_type == section_val,
             Vote.item_id == item_id_stripped,
         )
-        .first()
+        .returning(Vote.vote_type)
+        .execution_options(synchronize_session=False)
+    )
+    old_vote = (await db.execute(stmt)).scalar_one_or_none()
+    if old_vote is not None:
+        deltas: dict[tuple[str, str], list[int]] = {}
+        _add_delta(deltas, (section_val, item_id_stripped), old_vote, -1)
+        await _apply_count_deltas(db, deltas)
+    await db.commit()
+    return old_vote is not None
+
+
+async def _apply_vote_states(
+    db: AsyncSession,
+    states: dict[tuple[UUID, str, str], tuple[str, str | None]],
+) -> dict[tuple[UUID, str, str], str]:
+    """
+    Apply final (op, vote_type) per (user_id, section_type, item_id) without committing: one
+    multi-row upsert for "vote", one DELETE ... RETURNING for "cancel", one vote_counts upsert.
+    Returns the action per key: created, updated, cancelled or not_found.
+    """
+    upserts = [
+        {"user_id": k[0], "section_type": k[1], "item_id": k[2], "vote_type": v}
+        for k, (op, v) in states.items()
+        if op == "vote"
+    ]
+    cancels = [k for k, (op, _) in states.items() if op == "cancel"]
+    # unchanged votes are not returned by the upsert: they stay "updated"
+    outcome = {k: ("updated" if op == "vote" else "not_found") for k, (op, _) in states.items()}
+    deltas: dict[tuple[str, str], list[int]] = {}
+
+    if upserts:
+        for user_id, section_val, item_val, vote_val, inserted in await db.execute(_upsert_votes(upserts)):
+            outcome[(user_id, section_val, item_val)] = "created" if inserted else "updated"
+            _add_delta(deltas, (section_val, item_val), vote_val, 1)
+            if not inserted:
+                _add_delta(deltas, (section_val, item_val), _OTHER_VOTE[vote_val], -1)
+    if cancels:
+        stmt = (
+            delete(Vote)
+            .where(tuple_(Vote.user_id, Vote.section_type, Vote.item_id).in_(cancels))
+            .returning(Vote.user_id, Vote.section_type, Vote.item_id, Vote.vote_type)
+            .execution_options(synchronize_session=False)
+        )
+        for user_id, section_val, item_val, vote_val in await db.execute(stmt):
+            outcome[(user_id, section_val, item_val)] = "cancelled"
+            _add_delta(deltas, (section_val, item_val), vote_val, -1)
+    await _apply_count_deltas(db, deltas)
+    return outcome
+
+
+async def apply_vote_batch(
+    db: AsyncSession,
+    user_id: UUID,
+    operations: Sequence[tuple[str, SectionType | str, str, VoteType | str | None]],
+) -> list[tuple[str, str, str]]:
+    """
+    Apply (op, section_type, item_id, vote_type) operations in one transaction: one multi-row
+    upsert for "vote" ops and one DELETE ... RETURNING for "cancel" ops. When several ops target
+    the same item, the last one wins and the earlier ones are reported as "superseded".
+    Returns (section_type, item_id, action) per operation, in input order; action is created,
+    updated, cancelled, not_found or superseded. Raises ValueError (nothing applied) for an empty item_id.
+    """
+    keys: list[tuple[UUID, str, str]] = []
+    last: dict[tuple[UUID, str, str], int] = {}
+    states: dict[tuple[UUID, str, str], tuple[str, str | None]] = {}
+    for i, (op, section_type, item_id, vote_type) in enumerate(operations):
+        key = (user_id, *_normalize_item(section_type, item_id))
+        keys.append(key)
+        last[key] = i
+        states[key] = (op, vote_type.value if hasattr(vote_type, "value") else vote_type)
+
+    outcome = await _apply_vote_states(db, states)
+    await db.commit()
+    return [
+        (key[1], key[2], outcome[key] if last[key] == i else "superseded")
+        for i, key in enumerate(keys)
+    ]
+
+
+async def apply_vote_states(
+    db: AsyncSession,
+    states: dict[tuple[UUID, str, str], tuple[str, str | None]],
+) -> None:
+    """
+    Write already-merged vote states of many users in one transaction (write-behind flushes).
+    Keys are (user_id, section_type, item_id) as produced by _normalize_item; values (op, vote_type).
+    """
+    if states:
+        await _apply_vote_states(db, states)
+        await db.commit()
+
+
+async def get_vote_counts(
+    db: AsyncSession,
+    section_type: SectionType | str,
+    item_ids: Iterable[str],
+) -> dict[str, tuple[int, int]]:
+    """
+    (up, down) per item_id for one section, with one primary-key lookup query.
+    Items nobody voted on are returned as (0, 0); blank ids are ignored.
+    """
+    section_val = section_type.value if hasattr(section_type, "value") else str(section_type)
+    ids = list(dict.fromkeys(filter(None, map(normalize_item_id, item_ids))))
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(VoteCount.item_id, VoteCount.up, VoteCount.down).where(
+            VoteCount.section_type == section_val,
+            VoteCount.item_id.in_(ids),
+        )
     )
-    if not existing:
-        return False
-    db.delete(existing)
-    db.commit()
-    return True
+    counts = {item_id: (up, down) for item_id, up, down in result}
+    return {item_id: counts.get(item_id, (0, 0)) for item_id in ids}
+
+
+async def top_voted(
+    db: AsyncSession,
+    section_type: SectionType | str,
+    limit: int,
+) -> list[tuple[str, int, int]]:
+    """Most up-voted items of a section as (item_id, up, down), best first (index scan on vote_counts)."""
+    section_val = section_type.value if hasattr(section_type, "value") else str(section_type)
+    result = await db.execute(
+        select(VoteCount.item_id, VoteCount.up, VoteCount.down)
+        .where(VoteCount.section_type == section_val, VoteCount.up > 0)
+        .order_by(VoteCount.up.desc(), VoteCount.item_id.desc())
+        .limit(limit)
+    )
+    return [(item_id, up, down) for item_id, up, down in result]
+
+
+def js_number(value: float) -> str:
+    """Format a float like JavaScript's String(Number) (shortest round-trip digits, JS exponent rules)."""
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    if value == 0:
+        return "0"
+    t = Decimal(repr(abs(value))).normalize().as_tuple()
+    digits = "".join(map(str, t.digits))
+    k, n = len(digits), len(digits) + t.exponent  # n: position of the decimal point
+    if k <= n <= 21:
+        s = digits + "0" * (n - k)
+    elif 0 < n <= 21:
+        s = f"{digits[:n]}.{digits[n:]}"
+    elif -6 < n <= 0:
+        s = "0." + "0" * -n + digits
+    else:
+        e = n - 1
+        s = digits[0] + (f".{digits[1:]}" if k > 1 else "") + f"e{'+' if e >= 0 else '-'}{abs(e)}"
+    return ("-" if value < 0 else "") + s
+
+
+def dashboard_vote_items(
+    prices: dict[str, float],
+    news: Iterable[dict | object],
+    ai_insight: str,
+    meme: dict | object | None,
+) -> list[tuple[str, str]]:
+    """
+    (section_type, item_id) of every votable dashboard item, using the frontend's item_id
+    conventions: news = url, price = "symbol|price" (JS number format), ai = the text, meme = image_url.
+    Ids are normalized as when votes are stored (normalize_item_id); the frontend votes on the ai
+    item with the id returned here.
+    """
+    def attr(obj, name: str) -> str:
+        return str((obj.get(name) if isinstance(obj, dict) else getattr(obj, name, "")) or "")
+
+    items = [(SectionType.news.value, attr(n, "url")) for n in news]
+    items += [(SectionType.price.value, f"{symbol}|{js_number(float(p))}") for symbol, p in prices.items()]
+    if ai_insight:
+        items.append((SectionType.ai.value, ai_insight))
+    if meme:
+        items.append((SectionType.meme.value, attr(meme, "image_url")))
+    normalized = [(section, normalize_item_id(item_id)) for section, item_id in items]
+    return [(section, item_id) for section, item_id in normalized if item_id]
+
+
+async def get_item_votes(
+    db: AsyncSession,
+    user_id: UUID,
+    items: Sequence[tuple[str, str]],
+) -> dict[tuple[str, str], tuple[int, int, str | None]]:
+    """
+    (up, down, user's vote or None) per (section_type, item_id), in one query: vote_counts rows by
+    primary key, LEFT JOIN the user's votes on the (user_id, section_type, item_id) unique index.
+    Every vote has a vote_counts row, so items missing from vote_counts have no votes at all.
+    """
+    keys = list(dict.fromkeys(items))
+    if not keys:
+        return {}
+    result = await db.execute(
+        select(VoteCount.section_type, VoteCount.item_id, VoteCount.up, VoteCount.down, Vote.vote_type)
+        .outerjoin(
+            Vote,
+            and_(
+                Vote.user_id == user_id,
+                Vote.section_type == VoteCount.section_type,
+                Vote.item_id == VoteCount.item_id,
+            ),
+        )
+        .where(tuple_(VoteCount.section_type, VoteCount.item_id).in_(keys))
+    )
+    found = {(section, item_id): (up, down, mine) for section, item_id, up, down, mine in result}
+    return {key: found.get(key, (0, 0, None)) for key in keys}
+
+
+def encode_vote_cursor(created_at: datetime, vote_id: UUID) -> str:
+    """Opaque cursor pointing just after the vote (created_at, id) in history order."""
+    raw = json.dumps([created_at.isoformat(), str(vote_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_vote_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor from encode_vote_cursor; raise ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, vote_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), UUID(vote_id)
+    except (ValueError, TypeError, binascii.Error, UnicodeEncodeError) as e:
+        raise ValueError("Invalid vote cursor") from e
+
+
+def _user_votes_query(user_id: UUID):
+    """The user's votes, newest first; served by ix_votes_user_created (user_id, created_at, id)."""
+    return (
+        select(Vote.id, Vote.section_type, Vote.item_id, Vote.vote_type, Vote.created_at)
+        .where(Vote.user_id == user_id)
+        .order_by(Vote.created_at.desc(), Vote.id.desc())
+    )
+
+
+async def list_user_votes(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[tuple[str, str, str, datetime]], str | None]:
+    """
+    One page of the user's votes, newest first, as (section_type, item_id, vote_type, created_at).
+    Keyset pagination: the cursor is the last row's (created_at, id), so every page is an index
+    range scan regardless of depth. Returns (rows, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for a malformed cursor.
+    """
+    stmt = _user_votes_query(user_id)
+    if cursor:
+        created_at, vote_id = decode_vote_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Vote.created_at, Vote.id)
+            < tuple_(literal(created_at, Vote.created_at.type), literal(vote_id, Vote.id.type))
+        )
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    next_cursor = encode_vote_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return [(r.section_type, r.item_id, r.vote_type, r.created_at) for r in rows[:limit]], next_cursor
+
+
+async def export_user_votes(user_id: UUID, fmt: str) -> AsyncIterator[str]:
+    """
+    Stream all of the user's votes as "csv" (with header) or "ndjson" text chunks, newest first.
+    Rows come from a server-side cursor, _EXPORT_YIELD_PER at a time, so memory stays constant.
+    Opens its own session: the generator outlives the request's dependencies.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(_user_votes_query(user_id).execution_options(yield_per=_EXPORT_YIELD_PER))
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(EXPORT_COLUMNS)
+            async for rows in result.partitions():
+                for r in rows:
+                    writer.writerow((r.section_type, r.item_id, r.vote_type, r.created_at.isoformat()))
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():
+                yield buf.getvalue()
+        else:
+            async for rows in result.partitions():
+                yield "".join(
+                    json.dumps(
+                        {
+                            "section_type": r.section_type,
+                            "item_id": r.item_id,
+                            "vote_type": r.vote_type,
+                            "created_at": r.created_at.isoformat(),
+                        }
+                    )
+                    + "\n"
+                    for r in rows
+                )
@@ -1,11 +1,30 @@
 """Pytest fixtures for API and service tests."""
 
+import os
 import uuid
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.main import app
+# TestClient requests may run on different event loops; don't pool asyncpg connections across them
+os.environ.setdefault("DB_NULL_POOL", "true")
+# Fail requests that run more SQL statements than their endpoint's query_budget
+os.environ.setdefault("QUERY_BUDGET_STRICT", "true")
+
+from app.main import app  # noqa: E402
+from app.services.dashboard_service import clear_fragments  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _clear_dashboard_fragments() -> None:
+    """Shared dashboard fragments would otherwise outlive the service patches of earlier tests."""
+    clear_fragments()
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """Run async tests (pytest.mark.anyio) on asyncio only."""
+    return "asyncio"
 
 
 @pytest.fixture
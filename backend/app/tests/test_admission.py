@@ -0,0 +1,115 @@
+"""Tests for threadpool queue-delay tracking and prioritized admission control."""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+
+from app.core.admission import (
+    AdmissionMiddleware,
+    admission_stats,
+    clear_admission,
+    configure_threadpool,
+    probe_queue_delay,
+    queue_delay,
+    request_priority,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    clear_admission()
+    yield
+    clear_admission()
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware)
+
+    @app.get("/health")
+    def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/dashboard/prices")
+    @app.get("/dashboard")
+    @app.post("/auth/login")
+    def ok() -> dict[str, bool]:
+        return {"ok": True}
+
+    return app
+
+
+def test_request_priority_puts_cache_reads_above_logins_and_ai():
+    assert request_priority("GET", "/dashboard/prices") == "high"
+    assert request_priority("GET", "/vote/counts/") == "high"
+    assert request_priority("GET", "/dashboard") == "normal"
+    assert request_priority("POST", "/vote/") == "normal"
+    assert request_priority("POST", "/auth/login") == "low"
+    assert request_priority("GET", "/dashboard/ai-insight") == "low"
+    assert request_priority("GET", "/health/threadpool") is None
+    assert request_priority("GET", "/metrics") is None
+    assert request_priority("OPTIONS", "/auth/login") is None
+
+
+@pytest.mark.parametrize(
+    ("delay", "rejected"),
+    [
+        (0.3, set()),
+        (0.8, {"/auth/login"}),
+        (1.5, {"/auth/login", "/dashboard"}),
+        (2.5, {"/auth/login", "/dashboard", "/dashboard/prices"}),
+    ],
+)
+def test_middleware_sheds_by_priority(delay, rejected):
+    client = TestClient(_app())
+    with patch("app.core.admission.get_settings") as mock_settings, patch(
+        "app.core.admission.queue_delay", return_value=delay
+    ):
+        mock_settings.return_value.ADMISSION_MAX_QUEUE_DELAY = 0.5
+        statuses = {
+            "/health": client.get("/health"),
+            "/dashboard/prices": client.get("/dashboard/prices"),
+            "/dashboard": client.get("/dashboard"),
+            "/auth/login": client.post("/auth/login"),
+        }
+    assert {path for path, res in statuses.items() if res.status_code == 503} == rejected
+    for path in rejected:
+        assert statuses[path].headers["Retry-After"] == ("3" if delay > 2 else "2" if delay > 1 else "1")
+        assert statuses[path].json() == {"detail": "Server is busy, please retry"}
+
+
+def test_middleware_disabled_when_threshold_is_zero():
+    with patch("app.core.admission.get_settings") as mock_settings, patch(
+        "app.core.admission.queue_delay", return_value=60.0
+    ):
+        mock_settings.return_value.ADMISSION_MAX_QUEUE_DELAY = 0
+        assert TestClient(_app()).post("/auth/login").status_code == 200
+
+
+@pytest.mark.anyio
+async def test_queue_delay_tracks_saturated_threadpool():
+    configure_threadpool(1)
+    assert current_default_thread_limiter().total_tokens == 1
+    release = threading.Event()
+    busy = asyncio.ensure_future(run_in_threadpool(release.wait, 5))
+    await asyncio.sleep(0.05)
+    probe = asyncio.ensure_future(probe_queue_delay())
+    await asyncio.sleep(0.2)
+
+    # The probe is still queued: its age is the current delay, and it is counted as waiting
+    assert queue_delay() >= 0.2
+    stats = admission_stats()
+    assert stats["size"] == 1 and stats["busy"] == 1 and stats["waiting"] == 1
+
+    release.set()
+    measured = await probe
+    await busy
+    assert measured >= 0.2
+    assert queue_delay() == measured
+    assert await probe_queue_delay() < measured
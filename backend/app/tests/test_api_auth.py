@@ -2,6 +2,8 @@
 
 import uuid
 
+from app.core.security import decode_access_token
+
 
 def test_signup_success(client):
     email = "signup-" + uuid.uuid4().hex + "@example.com"
@@ -31,3 +33,40 @@ def test_login_wrong_password_returns_401(client):
     client.post("/auth/signup", json={"email": email, "name": "U", "password": "secret"})
     res = client.post("/auth/login", json={"email": email, "password": "wrong"})
     assert res.status_code == 401
+
+
+def test_refresh_rotates_prefs_claim_after_onboarding(client):
+    email = "refresh-" + uuid.uuid4().hex + "@example.com"
+    client.post("/auth/signup", json={"email": email, "name": "U", "password": "secret"})
+    tokens = client.post("/auth/login", json={"email": email, "password": "secret"}).json()
+    assert tokens["refresh_token"]
+    assert decode_access_token(tokens["access_token"])["prefs"] is None
+    client.post(
+        "/onboarding",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        json={"assets": ["BTC"], "investor_type": "HODLer", "content_types": ["news"]},
+    )
+    res = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert res.status_code == 200
+    prefs = decode_access_token(res.json()["access_token"])["prefs"]
+    assert prefs["a"] == ["BTC"] and prefs["i"] == "HODLer"
+
+
+def test_refresh_rejects_access_token(client):
+    email = "refresh-bad-" + uuid.uuid4().hex + "@example.com"
+    client.post("/auth/signup", json={"email": email, "name": "U", "password": "secret"})
+    tokens = client.post("/auth/login", json={"email": email, "password": "secret"}).json()
+    res = client.post("/auth/refresh", json={"refresh_token": tokens["access_token"]})
+    assert res.status_code == 401
+
+
+def test_refresh_token_is_single_use(client):
+    email = "refresh-once-" + uuid.uuid4().hex + "@example.com"
+    client.post("/auth/signup", json={"email": email, "name": "U", "password": "secret"})
+    tokens = client.post("/auth/login", json={"email": email, "password": "secret"}).json()
+    first = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert first.status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    # the rotated token works once
+    res = client.post("/auth/refresh", json={"refresh_token": first.json()["refresh_token"]})
+    assert res.status_code == 200
@@ -1,9 +1,14 @@
 """API tests for dashboard endpoint."""
 
+import uuid
 from unittest.mock import MagicMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
 
+from app.api.routes.dashboard import parse_sections
+from app.services.dashboard_service import clear_last_good
+
 
 def test_dashboard_requires_auth(client: TestClient):
     res = client.get("/dashboard")
@@ -34,3 +39,118 @@ def test_dashboard_with_onboarding_returns_200(client: TestClient, auth_headers)
     assert res.status_code == 200
     data = res.json()
     assert "prices" in data and "news" in data and "ai_insight" in data and "meme" in data
+
+
+def test_dashboard_includes_item_votes(client: TestClient, auth_headers):
+    c, headers = auth_headers
+    c.post(
+        "/onboarding",
+        headers=headers,
+        json={"assets": ["BTC"], "investor_type": "HODLer", "content_types": ["ai", "price"]},
+    )
+    res = c.post("/vote", headers=headers, json={"section_type": "ai", "item_id": "Voted insight", "vote_type": "up"})
+    assert res.status_code == 200
+    with patch("app.api.routes.dashboard.get_prices", return_value=({"BTC": 50000.0}, None)), patch(
+        "app.api.routes.dashboard.get_news", return_value=([], None)
+    ), patch("app.api.routes.dashboard.get_ai_insight", return_value="Voted insight"):
+        res = c.get("/dashboard", headers=headers)
+    assert res.status_code == 200
+    votes = {(v["section_type"], v["item_id"]): v for v in res.json()["votes"]}
+    assert votes[("ai", "Voted insight")]["my_vote"] == "up"
+    assert votes[("ai", "Voted insight")]["up"] >= 1
+    assert votes[("price", "BTC|50000")]["my_vote"] is None
+
+
+def test_parse_sections_aliases_order_and_default():
+    assert parse_sections("memes,prices, AI", []) == ["price", "ai", "meme"]
+    assert parse_sections(None, ["meme", "news"]) == ["news", "meme"]
+    assert parse_sections("", []) == ["news", "price", "ai", "meme"]
+    with pytest.raises(ValueError, match="Unknown dashboard section: weather"):
+        parse_sections("news,weather", [])
+
+
+def test_dashboard_computes_only_requested_sections(client: TestClient, auth_headers):
+    c, headers = auth_headers
+    c.post(
+        "/onboarding",
+        headers=headers,
+        json={"assets": ["BTC"], "investor_type": "HODLer", "content_types": ["news", "ai"]},
+    )
+    with patch("app.api.routes.dashboard.get_prices", return_value=({"BTC": 50000.0}, None)) as prices, patch(
+        "app.api.routes.dashboard.get_news", return_value=([], None)
+    ) as news, patch("app.api.routes.dashboard.get_ai_insight", return_value="Insight") as ai, patch(
+        "app.api.routes.dashboard.get_meme", return_value=None
+    ) as meme:
+        res = c.get("/dashboard", headers=headers)
+        assert res.status_code == 200
+        assert res.json()["sections"] == ["news", "ai"]
+        assert res.json()["prices"] == {}
+        prices.assert_not_called()
+        meme.assert_not_called()
+
+        res = c.get("/dashboard?sections=prices", headers=headers)
+        assert res.status_code == 200
+        assert res.json()["sections"] == ["price"]
+        assert res.json()["prices"] == {"BTC": 50000.0}
+        assert res.json()["ai_insight"] == ""
+        assert news.call_count == 1 and ai.call_count == 1
+
+    res = c.get("/dashboard?sections=weather", headers=headers)
+    assert res.status_code == 400
+
+
+def test_dashboard_etag_304_until_vote(client: TestClient, auth_headers):
+    c, headers = auth_headers
+    c.post(
+        "/onboarding",
+        headers=headers,
+        json={"assets": ["BTC"], "investor_type": "HODLer", "content_types": ["ai"]},
+    )
+    clear_last_good()
+    with patch("app.api.routes.dashboard.insight_version", return_value=1), patch(
+        "app.api.routes.dashboard.get_ai_insight", side_effect=RuntimeError("upstream down")
+    ):
+        partial = c.get("/dashboard", headers=headers)
+    assert partial.status_code == 200
+    assert partial.json()["section_status"] == {"ai": "timed_out"}
+    assert "etag" not in partial.headers  # partial responses are not stored, so not tagged
+
+    with patch("app.api.routes.dashboard.insight_version", return_value=1), patch(
+        "app.api.routes.dashboard.get_ai_insight", return_value="Cached insight"
+    ) as ai:
+        first = c.get("/dashboard", headers=headers)
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        again = c.get("/dashboard", headers={**headers, "If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["etag"] == etag
+        assert ai.call_count == 1
+
+        res = c.post(
+            "/vote", headers=headers, json={"section_type": "ai", "item_id": "Cached insight", "vote_type": "up"}
+        )
+        assert res.status_code == 200
+        after_vote = c.get("/dashboard", headers={**headers, "If-None-Match": etag})
+        assert after_vote.status_code == 200
+        assert after_vote.headers["etag"] != etag
+        votes = {(v["section_type"], v["item_id"]): v for v in after_vote.json()["votes"]}
+        assert votes[("ai", "Cached insight")]["my_vote"] == "up"
+        etag = after_vote.headers["etag"]
+
+        # Votes are read from the DB: other users' votes count only on the items shown
+        other = _other_user_headers(c)
+        c.post("/vote", headers=other, json={"section_type": "news", "item_id": "unrelated", "vote_type": "up"})
+        assert c.get("/dashboard", headers={**headers, "If-None-Match": etag}).status_code == 304
+        c.post("/vote", headers=other, json={"section_type": "ai", "item_id": "Cached insight", "vote_type": "up"})
+        after_other = c.get("/dashboard", headers={**headers, "If-None-Match": etag})
+        assert after_other.status_code == 200
+        votes = {(v["section_type"], v["item_id"]): v for v in after_other.json()["votes"]}
+        assert votes[("ai", "Cached insight")]["up"] == 2
+        assert ai.call_count == 1  # re-rendering reused the shared insight fragment
+
+
+def _other_user_headers(c: TestClient) -> dict[str, str]:
+    email = f"other-{uuid.uuid4().hex}@example.com"
+    c.post("/auth/signup", json={"email": email, "name": "Other", "password": "testpass123"})
+    res = c.post("/auth/login", json={"email": email, "password": "testpass123"})
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
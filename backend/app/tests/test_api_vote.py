@@ -1,5 +1,7 @@
 """API tests for vote endpoints."""
 
+from unittest.mock import patch
+
 
 def test_post_vote_requires_auth(client):
     res = client.post(
@@ -49,3 +51,96 @@ def test_delete_vote_nonexistent_returns_404(client, auth_headers):
         json={"section_type": "news", "item_id": "no-such-id"},
     )
     assert res.status_code == 404
+
+
+def test_post_vote_batch(client, auth_headers):
+    _, headers = auth_headers
+    res = client.post(
+        "/vote/batch",
+        headers=headers,
+        json={
+            "operations": [
+                {"section_type": "news", "item_id": "batch-1", "vote_type": "up"},
+                {"op": "cancel", "section_type": "news", "item_id": "batch-2"},
+                {"section_type": "news", "item_id": "batch-1", "vote_type": "down"},
+            ]
+        },
+    )
+    assert res.status_code == 200
+    assert [r["action"] for r in res.json()["results"]] == ["superseded", "not_found", "created"]
+
+
+def test_post_vote_batch_rejects_vote_without_type(client, auth_headers):
+    _, headers = auth_headers
+    res = client.post(
+        "/vote/batch",
+        headers=headers,
+        json={"operations": [{"section_type": "news", "item_id": "x"}]},
+    )
+    assert res.status_code == 422
+
+
+def test_post_vote_batch_rejects_oversized_batch(client, auth_headers):
+    _, headers = auth_headers
+    ops = [{"section_type": "price", "item_id": f"i{n}", "vote_type": "up"} for n in range(101)]
+    res = client.post("/vote/batch", headers=headers, json={"operations": ops})
+    assert res.status_code == 422
+
+
+def test_get_vote_counts(client, auth_headers):
+    _, headers = auth_headers
+    client.post("/vote", headers=headers, json={"section_type": "news", "item_id": "count-a", "vote_type": "down"})
+    res = client.get(
+        "/vote/counts",
+        headers=headers,
+        params=[("section_type", "news"), ("item_id", "count-a"), ("item_id", "count-none")],
+    )
+    assert res.status_code == 200
+    counts = {c["item_id"]: c for c in res.json()["counts"]}
+    assert counts["count-a"]["down"] >= 1
+    assert counts["count-none"] == {"item_id": "count-none", "up": 0, "down": 0}
+
+
+def test_get_vote_top_requires_auth(client):
+    res = client.get("/vote/top", params={"section_type": "news"})
+    assert res.status_code == 401
+
+
+def test_post_vote_write_behind_queues(client, auth_headers):
+    _, headers = auth_headers
+    with patch("app.api.routes.vote.settings") as mock_settings, patch(
+        "app.api.routes.vote.enqueue_votes"
+    ) as enqueue:
+        mock_settings.VOTE_WRITE_BEHIND = True
+        res = client.post(
+            "/vote",
+            headers=headers,
+            json={"section_type": "news", "item_id": "queued-1", "vote_type": "up"},
+        )
+    assert res.status_code == 200
+    assert res.json()["action"] == "queued"
+    enqueue.assert_called_once()
+
+
+def test_get_my_votes_and_export(client, auth_headers):
+    _, headers = auth_headers
+    for item_id in ("mine-1", "mine-2", "mine-3"):
+        client.post("/vote", headers=headers, json={"section_type": "news", "item_id": item_id, "vote_type": "up"})
+    res = client.get("/vote/mine", headers=headers, params={"limit": 2})
+    assert res.status_code == 200
+    page = res.json()
+    assert len(page["votes"]) == 2 and page["next_cursor"]
+    res = client.get("/vote/mine", headers=headers, params={"limit": 2, "cursor": page["next_cursor"]})
+    assert len(res.json()["votes"]) == 1 and res.json()["next_cursor"] is None
+
+    res = client.get("/vote/mine/export", headers=headers, params={"format": "csv"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    lines = res.text.strip().splitlines()
+    assert lines[0] == "section_type,item_id,vote_type,created_at" and len(lines) == 4
+
+
+def test_get_my_votes_invalid_cursor_returns_400(client, auth_headers):
+    _, headers = auth_headers
+    res = client.get("/vote/mine", headers=headers, params={"cursor": "bogus"})
+    assert res.status_code == 400
@@ -0,0 +1,105 @@
+"""Tests for in-process metrics: sharded counters/histograms, exposition and instrumented services."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from app.core import metrics
+from app.core.metrics import (
+    CACHE_REQUESTS,
+    FALLBACKS,
+    Counter,
+    Histogram,
+    clear_metrics,
+    render_metrics,
+    route_template,
+)
+from app.services.coin_service import _refresh_prices_cache, clear_prices_cache, get_prices
+
+
+def test_counter_sums_thread_shards():
+    counter = Counter("test_events_total", "Test events", ("kind",))
+    clear_metrics()
+
+    def work() -> None:
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc("b", amount=2)
+    text = render_metrics()
+    assert "# TYPE test_events_total counter" in text
+    assert 'test_events_total{kind="a"} 4000' in text
+    assert 'test_events_total{kind="b"} 2' in text
+
+
+def test_shards_of_exited_threads_are_folded():
+    counter = Counter("test_folded_total", "Test events")
+    clear_metrics()
+    for _ in range(20):
+        t = threading.Thread(target=counter.inc)
+        t.start()
+        t.join()
+    assert "test_folded_total 20" in render_metrics()
+    assert not any(not shard.alive() for shard in metrics._shards)
+    counter.inc()
+    assert "test_folded_total 21" in render_metrics()
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram("test_latency_seconds", "Test latency", ("op",), buckets=(0.1, 1.0))
+    clear_metrics()
+    hist.observe(0.05, "read")
+    hist.observe(0.1, "read")
+    hist.observe(0.5, "read")
+    hist.observe(3.0, "read")
+    text = render_metrics()
+    assert 'test_latency_seconds_bucket{op="read",le="0.1"} 2' in text
+    assert 'test_latency_seconds_bucket{op="read",le="1.0"} 3' in text
+    assert 'test_latency_seconds_bucket{op="read",le="+Inf"} 4' in text
+    assert 'test_latency_seconds_count{op="read"} 4' in text
+    assert 'test_latency_seconds_sum{op="read"} 3.65' in text
+
+
+def test_collectors_add_samples_to_families():
+    clear_metrics()
+    CACHE_REQUESTS.inc("prices", "hit")
+    text = render_metrics([
+        ("cache_requests_total", "counter", "", lambda: [({"cache": "jwt", "result": "miss"}, 3)]),
+        ("test_queue_depth", "gauge", "Queue depth", lambda: [({}, 7)]),
+    ])
+    assert text.count("# TYPE cache_requests_total counter") == 1
+    assert 'cache_requests_total{cache="prices",result="hit"} 1' in text
+    assert 'cache_requests_total{cache="jwt",result="miss"} 3' in text
+    assert "# TYPE test_queue_depth gauge\ntest_queue_depth 7" in text
+
+
+def test_route_template_restores_path_params():
+    scope = {"route": object(), "path": "/items/42/votes", "path_params": {"item_id": "42"}}
+    assert route_template(scope) == "/items/{item_id}/votes"
+    assert route_template({"path": "/wp-login.php"}) == "unmatched"
+
+
+def test_prices_fallback_and_cache_counters():
+    """CoinGecko failure counts a Binance fallback; lookups count hits and misses."""
+    clear_metrics()
+    clear_prices_cache()
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value.get.side_effect = httpx.ConnectError("down")
+    with patch("app.services.coin_service.httpx.Client", return_value=mock_client), patch(
+        "app.services.coin_service._fetch_prices_binance", return_value={"BTC": 50000.0}
+    ):
+        _refresh_prices_cache()
+    get_prices(["BTC"])
+    get_prices(["BTC", "ETH"])
+    text = render_metrics()
+    assert 'provider_fallbacks_total{fallback="coingecko_binance"} 1' in text
+    assert 'provider_request_duration_seconds_count{provider="coingecko",outcome="error"} 1' in text
+    assert 'cache_requests_total{cache="prices",result="hit"} 1' in text
+    assert 'cache_requests_total{cache="prices",result="miss"} 1' in text
+    clear_prices_cache()
+    assert FALLBACKS.name == "provider_fallbacks_total"
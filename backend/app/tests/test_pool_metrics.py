@@ -0,0 +1,57 @@
+"""Unit tests for connection pool instrumentation (SQLite engine, no Postgres needed)."""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db.pool_metrics import InstrumentedQueuePool, get_pool_stats, pool_status
+
+
+def test_pool_records_checkouts_waits_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="test-pool",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        status = pool_status(engine, "test-pool")
+        assert status["checked_out"] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    status = pool_status(engine, "test-pool")
+    assert status["checkouts"] == 1
+    assert status["timeouts"] == 1
+    assert status["waits"] == 1
+    assert status["checked_out"] == 0
+
+
+def test_pool_counts_checkout_that_waits_for_a_checkin(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="test-pool-wait",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=5,
+    )
+    first = engine.connect()
+    waiter = threading.Thread(target=lambda: engine.connect().close())
+    waiter.start()
+    time.sleep(0.1)
+    first.close()
+    waiter.join(5)
+    engine.dispose()  # recreated pool keeps releasing slots
+    with engine.connect():
+        pass
+    status = pool_status(engine, "test-pool-wait")
+    assert status["checkouts"] == 3
+    assert status["waits"] == 1
+    assert status["timeouts"] == 0
+    assert get_pool_stats("test-pool-wait").in_use == 0
@@ -0,0 +1,70 @@
+"""Unit tests for the authenticated-principal cache (no DB on cache hit)."""
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.principal import (
+    clear_principal_cache,
+    invalidate_principal,
+    load_principal,
+    principal_from_user,
+)
+from app.models import Preferences, User
+from app.models.enums import InvestorType
+
+
+def _user_with_preferences() -> User:
+    user = User(id=uuid.uuid4(), email="p@example.com", name="P", hashed_password="x")
+    user.preferences = Preferences(
+        assets=["BTC", "ETH"],
+        investor_type=InvestorType.HODLer,
+        content_types=["News", "price"],
+    )
+    return user
+
+
+def test_principal_from_user_snapshots_preferences():
+    principal = principal_from_user(_user_with_preferences())
+    assert principal.preferences is not None
+    assert principal.preferences.assets == ("BTC", "ETH")
+    assert principal.preferences.investor_type == "HODLer"
+    assert principal.preferences.content_types == ("news", "price")
+
+
+@pytest.mark.anyio
+async def test_load_principal_hits_db_once_until_invalidated():
+    clear_principal_cache()
+    user = _user_with_preferences()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = user
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    first = await load_principal(db, user.id)
+    second = await load_principal(db, user.id)
+    assert first is second
+    assert db.execute.call_count == 1
+    invalidate_principal(user.id)
+    await load_principal(db, user.id)
+    assert db.execute.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_load_racing_an_invalidation_does_not_fill_the_cache():
+    clear_principal_cache()
+    user = _user_with_preferences()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = user
+
+    async def execute_then_preferences_saved(*args, **kwargs):
+        invalidate_principal(user.id)  # save_preferences commits while this load is in flight
+        return result
+
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=execute_then_preferences_saved)
+    await load_principal(db, user.id)
+    db.execute = AsyncMock(return_value=result)
+    await load_principal(db, user.id)
+    await load_principal(db, user.id)
+    assert db.execute.call_count == 1  # the second load filled the cache
@@ -0,0 +1,70 @@
+"""Tests for opt-in request profiling: selection, stack sampling and stored artifacts."""
+
+import time
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware, list_profiles, load_profile, top_functions
+
+
+def _settings(mock, tmp_path, rate: float = 0.0) -> None:
+    mock.return_value.PROFILING_TOKEN = "admin-token"
+    mock.return_value.PROFILING_SAMPLE_RATE = rate
+    mock.return_value.PROFILING_INTERVAL_MS = 1
+    mock.return_value.PROFILING_DIR = str(tmp_path)
+    mock.return_value.PROFILING_MAX_ARTIFACTS = 2
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow() -> dict[str, str]:
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"ok": "yes"}
+
+    app.add_middleware(ProfilingMiddleware)
+    return app
+
+
+def test_top_functions_counts_total_and_self():
+    stacks = {"main;a;b": 3, "main;a;c": 1, "worker;a": 2}
+    top = top_functions(stacks)
+    assert top[0] == {"function": "a", "total": 6, "self": 2}
+    assert {"function": "b", "total": 3, "self": 3} in top
+
+
+def test_profiles_request_with_admin_token(tmp_path):
+    with patch("app.core.profiling.get_settings") as mock_settings:
+        _settings(mock_settings, tmp_path)
+        client = TestClient(_app())
+        plain = client.get("/slow")
+        wrong = client.get("/slow", headers={"X-Profile-Token": "nope"})
+        profiled = client.get("/slow", headers={"X-Profile-Token": "admin-token"})
+
+        assert "x-profile-id" not in plain.headers
+        assert "x-profile-id" not in wrong.headers
+        profile_id = profiled.headers["x-profile-id"]
+        artifact = load_profile(profile_id)
+        assert artifact["path"] == "/slow"
+        assert artifact["status"] == 200
+        assert artifact["trigger"] == "header"
+        assert artifact["samples"] > 0
+        assert any("slow" in f["function"] for f in artifact["top"])
+        assert [p["id"] for p in list_profiles()] == [profile_id]
+        assert load_profile("../" + profile_id) is None
+
+
+def test_sampling_keeps_latest_artifacts(tmp_path):
+    with patch("app.core.profiling.get_settings") as mock_settings:
+        _settings(mock_settings, tmp_path, rate=1.0)
+        client = TestClient(_app())
+        ids = [client.get("/slow").headers["x-profile-id"] for _ in range(3)]
+        stored = list_profiles()
+        assert len(stored) == 2
+        assert ids[0] not in {p["id"] for p in stored}
+        assert all(p["trigger"] == "sample" for p in stored)
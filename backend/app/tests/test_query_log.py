@@ -0,0 +1,96 @@
+"""Tests for the slow-query log (redacted parameters) and per-endpoint query budgets."""
+
+import logging
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core import timing
+from app.db.query_log import QueryBudgetExceeded, instrument_queries, query_budget, query_count, redact_parameters
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://")
+    instrument_queries(engine)
+    yield engine
+    engine.dispose()
+
+
+def _app(engine, budget: int, queries: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items", dependencies=[query_budget(budget)])
+    def items() -> dict[str, int | None]:
+        with engine.connect() as conn:
+            for i in range(queries):
+                conn.execute(text("SELECT :n"), {"n": i})
+        return {"queries": query_count()}
+
+    return app
+
+
+def test_redact_parameters_keeps_shape_not_values():
+    assert redact_parameters({"email": "a@b.c", "n": 3, "x": None}) == {"email": "<str>", "n": "<int>", "x": None}
+    assert redact_parameters(("secret", 1.5)) == ["<str>", "<float>"]
+    rows = [{"id": i} for i in range(10)]
+    assert redact_parameters(rows) == [{"id": "<int>"}, "... 10 rows"]
+
+
+def test_slow_query_logged_without_parameter_values(sqlite_engine, caplog):
+    with patch("app.db.query_log.get_settings") as mock_settings:
+        mock_settings.return_value.SLOW_QUERY_MS = 0.000001
+        with caplog.at_level(logging.WARNING, logger="app.db.query_log"):
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT :email"), {"email": "alice@example.com"})
+    records = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow query")]
+    assert len(records) == 1
+    assert "SELECT ?" in records[0]
+    assert "<str>" in records[0]
+    assert "alice@example.com" not in records[0]
+
+
+def test_failed_statement_leaves_no_start_time(sqlite_engine):
+    timings: list[tuple[str, float]] = []
+    token = timing._timings.set(timings)
+    try:
+        with sqlite_engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            assert not conn.info.get("query_log_start")
+            conn.execute(text("SELECT 1"))
+    finally:
+        timing._timings.reset(token)
+    assert [name for name, _ in timings] == ["db"]
+
+
+def test_query_budget_counts_request_statements(sqlite_engine):
+    with patch("app.db.query_log.get_settings") as mock_settings:
+        mock_settings.return_value.SLOW_QUERY_MS = 0
+        mock_settings.return_value.QUERY_BUDGET_STRICT = True
+        res = TestClient(_app(sqlite_engine, budget=3, queries=3)).get("/items")
+    assert res.status_code == 200
+    assert res.json() == {"queries": 3}
+    assert query_count() is None
+
+
+def test_query_budget_exceeded_strict_raises(sqlite_engine):
+    with patch("app.db.query_log.get_settings") as mock_settings:
+        mock_settings.return_value.SLOW_QUERY_MS = 0
+        mock_settings.return_value.QUERY_BUDGET_STRICT = True
+        with pytest.raises(QueryBudgetExceeded, match="ran 5 SQL statements"):
+            TestClient(_app(sqlite_engine, budget=2, queries=5)).get("/items")
+
+
+def test_query_budget_exceeded_warns_when_not_strict(sqlite_engine, caplog):
+    with patch("app.db.query_log.get_settings") as mock_settings:
+        mock_settings.return_value.SLOW_QUERY_MS = 0
+        mock_settings.return_value.QUERY_BUDGET_STRICT = False
+        with caplog.at_level(logging.WARNING, logger="app.db.query_log"):
+            res = TestClient(_app(sqlite_engine, budget=2, queries=5)).get("/items")
+    assert res.status_code == 200
+    assert any("GET /items ran 5 SQL statements (budget 2)" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,37 @@
+"""Tests for the fast JSON path: same bytes as pydantic's JSON mode, with and without orjson."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app.core.responses import FastJSONResponse, dumps
+from app.schemas.dashboard import NewsItem
+from app.schemas.vote import VoteHistoryItem, VoteHistoryResponse
+
+
+def _history() -> list[dict]:
+    now = datetime(2025, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    return [
+        {"section_type": "news", "item_id": f"https://example.com/{i}", "vote_type": "up", "created_at": now - timedelta(minutes=i)}
+        for i in range(3)
+    ]
+
+
+@pytest.mark.parametrize("with_orjson", [True, False])
+def test_dumps_matches_pydantic_json(with_orjson):
+    rows = _history()
+    expected = VoteHistoryResponse(votes=[VoteHistoryItem(**r) for r in rows], next_cursor="c").model_dump_json()
+    content = {"votes": rows, "next_cursor": "c"}
+    if with_orjson:
+        assert dumps(content) == expected.encode()
+    else:
+        with patch("app.core.responses.orjson", None):
+            assert dumps(content) == expected.encode()
+
+
+def test_fast_json_response_encodes_models():
+    item = NewsItem(id="1", title="Ünïcode", url="https://x", source="s", published_at="2025-01-01T00:00:00Z", coins=["BTC"])
+    res = FastJSONResponse({"news": [item], "message": None})
+    assert res.media_type == "application/json"
+    assert res.body == b'{"news":[' + item.model_dump_json().encode() + b'],"message":null}'
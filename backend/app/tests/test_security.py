@@ -1,13 +1,20 @@
 """Unit tests for security (hash, verify, JWT)."""
 
-from unittest.mock import patch
+import threading
+from unittest.mock import MagicMock, patch
 
 import pytest
+from jose import jwt
 
 from app.core.security import (
+    PasswordHasherBusy,
+    clear_token_cache,
     create_access_token,
+    create_refresh_token,
     decode_access_token,
+    decode_refresh_token,
     hash_password,
+    password_needs_rehash,
     verify_password,
 )
 
@@ -49,3 +56,47 @@ def test_create_and_decode_access_token():
 
 def test_decode_access_token_invalid_returns_none():
     assert decode_access_token("invalid.jwt.here") is None
+
+
+def test_password_needs_rehash_when_cost_differs():
+    with patch("app.core.security.get_settings") as mock_settings:
+        mock_settings.return_value.BCRYPT_ROUNDS = 12
+        assert password_needs_rehash("$2b$12$" + "a" * 53) is False
+        assert password_needs_rehash("$2b$10$" + "a" * 53) is True
+        assert password_needs_rehash("not-a-bcrypt-hash") is True
+
+
+def test_hash_password_rejects_when_pool_full():
+    """A saturated bcrypt pool fails fast with PasswordHasherBusy instead of queueing."""
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    with patch("app.core.security._get_bcrypt_pool", return_value=(MagicMock(), slots)):
+        with pytest.raises(PasswordHasherBusy):
+            hash_password("secret")
+
+
+def test_decode_access_token_cached_until_key_rotation():
+    """A reused token is verified once; changing SECRET_KEY invalidates cached payloads."""
+    clear_token_cache()
+    with patch("app.core.security.get_settings") as mock_settings:
+        mock_settings.return_value.SECRET_KEY = "key-one"
+        mock_settings.return_value.ALGORITHM = "HS256"
+        mock_settings.return_value.ACCESS_TOKEN_EXPIRE_MINUTES = 60
+        token = create_access_token({"sub": "user-1"})
+        with patch("app.core.security.jwt.decode", wraps=jwt.decode) as spy:
+            assert decode_access_token(token)["sub"] == "user-1"
+            assert decode_access_token(token)["sub"] == "user-1"
+            assert spy.call_count == 1
+            mock_settings.return_value.SECRET_KEY = "key-two"
+            assert decode_access_token(token) is None
+            assert spy.call_count == 2
+
+
+def test_refresh_token_is_not_an_access_token():
+    with patch("app.core.security.get_settings") as mock_settings:
+        mock_settings.return_value.SECRET_KEY = "test-secret-key-for-tests"
+        mock_settings.return_value.ALGORITHM = "HS256"
+        mock_settings.return_value.REFRESH_TOKEN_EXPIRE_MINUTES = 60
+        token = create_refresh_token({"sub": "user-id-123"})
+        assert decode_access_token(token) is None
+        assert decode_refresh_token(token)["sub"] == "user-id-123"
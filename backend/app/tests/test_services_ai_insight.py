@@ -4,10 +4,13 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from app.core.cache import cache_stats
 from app.services.ai_insight_service import (
     FALLBACK_INSIGHT,
     build_prompt,
+    clear_insight_cache,
     get_ai_insight,
+    insight_version,
 )
 
 
@@ -57,3 +60,35 @@ def test_get_ai_insight_with_mock_returns_text():
         result = get_ai_insight(assets=["BTC"])
         assert "Bitcoin" in result or "volatile" in result
         assert result != FALLBACK_INSIGHT
+
+
+def test_insight_version_is_per_prompt():
+    """Generating one profile's insight leaves every other profile's version unchanged."""
+    clear_insight_cache()
+    btc, eth = build_prompt(assets=["BTC"]), build_prompt(assets=["ETH"])
+    with patch("app.services.ai_insight_service.get_settings") as mock_settings, patch(
+        "app.services.ai_insight_service._request_insight", side_effect=["BTC insight", "ETH insight", FALLBACK_INSIGHT]
+    ):
+        mock_settings.return_value.OPENROUTER_API_KEY = "test-key"
+        assert insight_version(btc) is None
+        assert get_ai_insight(assets=["BTC"]) == "BTC insight"
+        btc_version = insight_version(btc)
+        assert btc_version is not None
+
+        assert get_ai_insight(assets=["ETH"]) == "ETH insight"
+        assert insight_version(eth) not in (None, btc_version)
+        assert insight_version(btc) == btc_version
+        assert get_ai_insight(assets=["BTC"]) == "BTC insight"  # cached
+
+        assert get_ai_insight(assets=["SOL"]) == FALLBACK_INSIGHT
+        assert insight_version(build_prompt(assets=["SOL"])) is None  # fallback is not cached
+
+        # Version reads are not insight reads: they stay out of the cache hit ratio
+        stats = cache_stats()["insight"]
+        insight_version(btc)
+        insight_version(build_prompt(assets=["DOGE"]))
+        assert cache_stats()["insight"] == stats
+
+        mock_settings.return_value.OPENROUTER_API_KEY = ""
+        assert insight_version(btc) == 0
+    clear_insight_cache()
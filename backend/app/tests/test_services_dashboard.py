@@ -0,0 +1,175 @@
+"""Unit tests for dashboard section deadlines, shared fragments and the per-user response cache."""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.services.dashboard_service import (
+    SectionJob,
+    assets_key,
+    cached_response,
+    clear_fragments,
+    clear_last_good,
+    collect_sections,
+    dashboard_etag,
+    etag_matches,
+    invalidate_dashboard,
+    render_json_object,
+    section_fragment,
+    section_timeout,
+    store_response,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def _settings():
+    clear_last_good()
+    clear_fragments()
+    with patch("app.services.dashboard_service.get_settings") as mock_settings:
+        mock_settings.return_value.DASHBOARD_DEADLINE = 0.2
+        mock_settings.return_value.DASHBOARD_NEWS_BUDGET = 0.1
+        mock_settings.return_value.DASHBOARD_AI_BUDGET = 0
+        mock_settings.return_value.DASHBOARD_MEME_BUDGET = 1.0
+        yield
+    clear_last_good()
+
+
+def test_section_timeout_is_budget_capped_by_deadline():
+    assert section_timeout("news") == 0.1
+    assert section_timeout("ai") == 0.2
+    assert section_timeout("meme") == 0.2
+
+
+async def test_slow_section_times_out_then_serves_last_good_value():
+    release = threading.Event()
+    finished = threading.Event()
+    calls = 0
+
+    def slow_insight() -> str:
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            release.wait(5)
+        finished.set()
+        return f"insight {calls}"
+
+    jobs = [SectionJob("news", ("BTC",), lambda: ["article"]), SectionJob("ai", ("BTC",), slow_insight)]
+    first = await collect_sections(jobs)
+    assert first["ai"].value == "insight 1" and first["ai"].status == "fresh"
+
+    finished.clear()
+    second = await collect_sections(jobs)
+    assert second["news"].status == "fresh"
+    assert second["news"].value == ["article"]
+    assert second["ai"].status == "stale"
+    assert second["ai"].value == "insight 1"
+
+    # The late call keeps running and becomes the next last good value
+    release.set()
+    assert await asyncio.to_thread(finished.wait, 5)
+    await asyncio.sleep(0.05)
+    release.clear()
+    third = await collect_sections(jobs)
+    assert third["ai"].status == "stale"
+    assert third["ai"].value == "insight 2"
+    release.set()
+
+
+async def test_slow_section_without_last_good_value_is_empty():
+    release = threading.Event()
+    results = await collect_sections([SectionJob("news", ("ETH",), lambda: release.wait(5) and ["late"])])
+    release.set()
+    assert results["news"].status == "timed_out"
+    assert results["news"].value is None
+
+
+async def test_failed_section_serves_last_good_value_or_nothing():
+    fail = False
+
+    def news() -> list[str]:
+        if fail:
+            raise RuntimeError("upstream down")
+        return ["article"]
+
+    assert (await collect_sections([SectionJob("news", ("BTC",), news)]))["news"].status == "fresh"
+    fail = True
+    stale = await collect_sections([SectionJob("news", ("BTC",), news), SectionJob("news2", ("ETH",), news)])
+    assert stale["news"].status == "stale" and stale["news"].value == ["article"]
+    assert stale["news2"].status == "timed_out" and stale["news2"].value is None
+
+
+async def test_concurrent_requests_share_one_job_per_section_and_key():
+    release = threading.Event()
+    calls = []
+
+    def slow_insight() -> str:
+        calls.append(1)
+        release.wait(5)
+        return "insight"
+
+    jobs = [SectionJob("ai", "prompt", slow_insight)]
+    first = await collect_sections(jobs)
+    second = await collect_sections(jobs)
+    assert first["ai"].status == second["ai"].status == "timed_out"
+    release.set()
+    await asyncio.sleep(0.05)
+    assert len(calls) == 1
+    assert (await collect_sections(jobs))["ai"].value == "insight"
+
+
+def test_section_fragment_shared_per_profile_and_version():
+    builds = []
+
+    def build() -> dict[str, float]:
+        builds.append(1)
+        return {"BTC": 1.5, "ETH": 2.0}
+
+    key = assets_key(["eth", "BTC", "ETH"])
+    assert key == ("BTC", "ETH")
+    first = section_fragment("price", key, 1, build)
+    again = section_fragment("price", assets_key(["BTC", "ETH"]), 1, build)
+    assert again is first
+    assert first.body == b'{"BTC":1.5,"ETH":2.0}'
+    section_fragment("price", key, 2, build)  # source refreshed
+    section_fragment("price", key, None, build)  # source empty or expired: never cached
+    section_fragment("price", key, None, build)
+    assert len(builds) == 4
+
+
+def test_section_fragment_skips_values_that_are_not_shareable():
+    calls = []
+    for _ in range(2):
+        section_fragment("ai", "prompt", 1, lambda: calls.append(1) or "fallback", shareable=lambda t: t != "fallback")
+    assert len(calls) == 2
+
+
+def test_render_json_object_joins_encoded_members():
+    body = render_json_object({"news": b"[]", "ai_insight": b'"hi"', "meme": b"null"})
+    assert body == b'{"news":[],"ai_insight":"hi","meme":null}'
+
+
+def test_response_cache_matches_key_and_is_invalidated():
+    key = dashboard_etag("user-1", ["ai"], 3)
+    assert key != dashboard_etag("user-1", ["ai"], 4)
+    votes = {("ai", "insight"): (1, 0, None)}
+    entry = store_response("user-1", key, votes, b"{}")
+    assert cached_response("user-1", key) is entry
+    assert entry.body == b"{}"
+    assert cached_response("user-1", dashboard_etag("user-1", ["ai"], 4)) is None
+    # The ETag covers the votes shown: another vote on the item makes a new one
+    assert entry.etag != store_response("user-1", key, {("ai", "insight"): (2, 0, None)}, b"{}").etag
+    invalidate_dashboard("user-1")
+    assert cached_response("user-1", key) is None
+
+
+def test_etag_matches_if_none_match_lists():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches('"a", W/"b"', 'W/"b"')
+    assert dashboard_etag("user-1").startswith('W/"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
@@ -4,10 +4,29 @@ from unittest.mock import MagicMock, patch
 
 import httpx
 
-from app.services.news_service import fetch_market_news, get_news
+import pytest
+
+from app.services.news_service import (
+    clear_news_cache,
+    fetch_market_news,
+    fetch_market_news_page,
+    get_news,
+)
+
+
+def _mock_news_client(MockClient, data):
+    mock_response = MagicMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.json.return_value = data
+    mock_client_instance = MagicMock()
+    mock_client_instance.get.return_value = mock_response
+    MockClient.return_value.__enter__.return_value = mock_client_instance
+    MockClient.return_value.__exit__.return_value = None
+    return mock_client_instance
 
 
 def test_fetch_market_news_success_parses_response():
+    clear_news_cache()
     mock_data = {"Data": [{"title": "Bitcoin Rises", "url": "https://example.com/btc", "published_on": 1609459200, "categories": "BTC|MARKET", "body": ""}]}
     with patch("app.services.news_service.httpx.Client") as MockClient:
         mock_response = MagicMock()
@@ -24,6 +43,7 @@ def test_fetch_market_news_success_parses_response():
 
 
 def test_fetch_market_news_http_error_falls_back():
+    clear_news_cache()
     with patch("app.services.news_service.httpx.Client") as MockClient:
         mock_client_instance = MagicMock()
         MockClient.return_value.__enter__.return_value = mock_client_instance
@@ -40,3 +60,30 @@ def test_get_news_returns_list_and_none_message():
     assert len(news) == 1
     assert news[0].title == "T"
     assert message is None
+
+
+def test_fetch_market_news_page_cursor_walks_corpus_without_refetch():
+    """Pages follow (published_at, id) order; later pages come from the corpus, not upstream."""
+    clear_news_cache()
+    mock_data = {
+        "Data": [
+            {"id": str(i), "title": f"BTC news {i}", "url": f"https://example.com/{i}",
+             "published_on": 1609459200 + i, "categories": "BTC", "body": ""}
+            for i in range(5)
+        ]
+    }
+    with patch("app.services.news_service.httpx.Client") as MockClient:
+        client = _mock_news_client(MockClient, mock_data)
+        first, cursor = fetch_market_news_page(["BTC"], limit=2)
+        second, cursor2 = fetch_market_news_page(["BTC"], limit=2, cursor=cursor)
+        third, cursor3 = fetch_market_news_page(["BTC"], limit=2, cursor=cursor2)
+    assert client.get.call_count == 1
+    assert [i["id"] for i in first] == ["4", "3"]
+    assert [i["id"] for i in second] == ["2", "1"]
+    assert [i["id"] for i in third] == ["0"]
+    assert cursor3 is None
+
+
+def test_fetch_market_news_page_invalid_cursor_raises():
+    with pytest.raises(ValueError, match="cursor"):
+        fetch_market_news_page(["BTC"], cursor="not-a-cursor")
@@ -1,17 +1,63 @@
 """Unit tests for vote_service (DB required)."""
 
+import asyncio
 import uuid
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal
 from app.models import User
 from app.models.enums import SectionType, VoteType
-from app.services.vote_service import cancel_vote, save_or_update_vote
+from app.services.vote_service import (
+    apply_vote_batch,
+    cancel_vote,
+    dashboard_vote_items,
+    get_vote_counts,
+    js_number,
+    list_user_votes,
+    normalize_item_id,
+    save_or_update_vote,
+    top_voted,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_js_number_matches_javascript_formatting():
+    """Price item ids are built client-side with String(Number(price))."""
+    assert js_number(95000.0) == "95000"
+    assert js_number(95000.5) == "95000.5"
+    assert js_number(0.0000123) == "0.0000123"
+    assert js_number(1e-7) == "1e-7"
+    assert js_number(1.5e21) == "1.5e+21"
+
+
+def test_dashboard_vote_items_use_frontend_item_ids():
+    """news = url, price = symbol|price, ai = first 255 chars, meme = image_url."""
+    items = dashboard_vote_items(
+        {"BTC": 95000.0},
+        [{"url": "https://example.com/a"}],
+        "x" * 300,
+        {"image_url": "https://i.imgflip.com/1.jpg"},
+    )
+    assert items == [
+        ("news", "https://example.com/a"),
+        ("price", "BTC|95000"),
+        ("ai", "x" * 255),
+        ("meme", "https://i.imgflip.com/1.jpg"),
+    ]
+
+
+def test_dashboard_vote_items_normalize_ids_like_stored_votes():
+    """Leading whitespace is stripped and the 255 limit counts code points (emoji = 1)."""
+    insight = "  " + "\U0001F680" * 10 + "y" * 300
+    items = dashboard_vote_items({}, [{"url": " https://example.com/a "}], insight, None)
+    assert items == [("news", "https://example.com/a"), ("ai", normalize_item_id(insight))]
+    assert items[1][1] == "\U0001F680" * 10 + "y" * 245
 
 
-def _make_test_user(db: Session) -> User:
+async def _make_test_user(db: AsyncSession) -> User:
     from app.core.security import hash_password
     user = User(
         email=f"vote-test-{uuid.uuid4().hex}@example.com",
@@ -19,61 +65,162 @@ def _make_test_user(db: Session) -> User:
         hashed_password=hash_password("pass123"),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @pytest.fixture
-def db_session():
-    """Yield a real DB session (uses project DB)."""
-    db = SessionLocal()
-    try:
+async def db_session():
+    """Yield a real async DB session (uses project DB)."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def test_save_or_update_vote_created(db_session: Session):
+async def test_save_or_update_vote_created(db_session: AsyncSession):
     """First vote for (user, section, item) returns 'created'."""
-    user = _make_test_user(db_session)
-    action = save_or_update_vote(
+    user = await _make_test_user(db_session)
+    action = await save_or_update_vote(
         db_session, user.id, SectionType.news, "https://example.com/1", VoteType.up
     )
     assert action == "created"
 
 
-def test_save_or_update_vote_updated(db_session: Session):
+async def test_save_or_update_vote_updated(db_session: AsyncSession):
     """Second vote for same (user, section, item) returns 'updated'."""
-    user = _make_test_user(db_session)
-    save_or_update_vote(
+    user = await _make_test_user(db_session)
+    await save_or_update_vote(
         db_session, user.id, SectionType.price, "BTC|100", VoteType.up
     )
-    action = save_or_update_vote(
+    action = await save_or_update_vote(
         db_session, user.id, SectionType.price, "BTC|100", VoteType.down
     )
     assert action == "updated"
 
 
-def test_save_or_update_vote_empty_item_id_raises(db_session: Session):
+async def test_save_or_update_vote_empty_item_id_raises(db_session: AsyncSession):
     """Empty item_id raises ValueError."""
-    user = _make_test_user(db_session)
+    user = await _make_test_user(db_session)
     with pytest.raises(ValueError, match="item_id"):
-        save_or_update_vote(
+        await save_or_update_vote(
             db_session, user.id, SectionType.ai, "  ", VoteType.up
         )
 
 
-def test_cancel_vote_returns_true_when_deleted(db_session: Session):
+async def test_cancel_vote_returns_true_when_deleted(db_session: AsyncSession):
     """cancel_vote returns True when a vote existed and was removed."""
-    user = _make_test_user(db_session)
-    save_or_update_vote(db_session, user.id, SectionType.meme, "meme-1", VoteType.up)
-    removed = cancel_vote(db_session, user.id, SectionType.meme, "meme-1")
+    user = await _make_test_user(db_session)
+    await save_or_update_vote(db_session, user.id, SectionType.meme, "meme-1", VoteType.up)
+    removed = await cancel_vote(db_session, user.id, SectionType.meme, "meme-1")
     assert removed is True
 
 
-def test_cancel_vote_returns_false_when_none(db_session: Session):
+async def test_cancel_vote_returns_false_when_none(db_session: AsyncSession):
     """cancel_vote returns False when no vote existed."""
-    user = _make_test_user(db_session)
-    removed = cancel_vote(db_session, user.id, SectionType.news, "no-such-id")
+    user = await _make_test_user(db_session)
+    removed = await cancel_vote(db_session, user.id, SectionType.news, "no-such-id")
     assert removed is False
+
+
+async def test_concurrent_first_votes_do_not_conflict(db_session: AsyncSession):
+    """Two first votes for the same item at once: one creates, the other updates (no IntegrityError)."""
+    user = await _make_test_user(db_session)
+
+    async def vote(vote_type: VoteType) -> str:
+        async with AsyncSessionLocal() as db:
+            return await save_or_update_vote(db, user.id, SectionType.news, "race-item", vote_type)
+
+    actions = await asyncio.gather(vote(VoteType.up), vote(VoteType.down))
+    assert sorted(actions) == ["created", "updated"]
+
+
+async def test_apply_vote_batch_results_in_order(db_session: AsyncSession):
+    """Batch reports created/updated/cancelled/not_found/superseded per operation, in order."""
+    user = await _make_test_user(db_session)
+    await save_or_update_vote(db_session, user.id, SectionType.news, "n1", VoteType.up)
+    await save_or_update_vote(db_session, user.id, SectionType.meme, "m1", VoteType.up)
+    results = await apply_vote_batch(
+        db_session,
+        user.id,
+        [
+            ("vote", SectionType.news, "n1", VoteType.down),
+            ("vote", SectionType.price, "BTC|1", VoteType.up),
+            ("cancel", SectionType.meme, "m1", None),
+            ("cancel", SectionType.ai, "missing", None),
+            ("vote", SectionType.ai, "x", VoteType.up),
+            ("cancel", SectionType.ai, "x", None),
+        ],
+    )
+    assert [a for _, _, a in results] == [
+        "updated", "created", "cancelled", "not_found", "superseded", "not_found",
+    ]
+    assert await cancel_vote(db_session, user.id, SectionType.price, "BTC|1") is True
+    assert await cancel_vote(db_session, user.id, SectionType.meme, "m1") is False
+
+
+async def test_vote_counts_follow_votes_and_cancels(db_session: AsyncSession):
+    """vote_counts tracks create, flip, repeat and cancel in the same transaction."""
+    alice = await _make_test_user(db_session)
+    bob = await _make_test_user(db_session)
+    item = f"counts-{uuid.uuid4().hex}"
+    await save_or_update_vote(db_session, alice.id, SectionType.news, item, VoteType.up)
+    await save_or_update_vote(db_session, bob.id, SectionType.news, item, VoteType.up)
+    assert (await get_vote_counts(db_session, SectionType.news, [item]))[item] == (2, 0)
+
+    await save_or_update_vote(db_session, bob.id, SectionType.news, item, VoteType.down)
+    await save_or_update_vote(db_session, bob.id, SectionType.news, item, VoteType.down)
+    assert (await get_vote_counts(db_session, SectionType.news, [item]))[item] == (1, 1)
+
+    await cancel_vote(db_session, alice.id, SectionType.news, item)
+    await apply_vote_batch(db_session, bob.id, [("cancel", SectionType.news, item, None)])
+    counts = await get_vote_counts(db_session, SectionType.news, [item, "never-voted"])
+    assert counts == {item: (0, 0), "never-voted": (0, 0)}
+
+
+async def test_vote_counts_subtract_votes_of_deleted_user(db_session: AsyncSession):
+    """Deleting a user (ON DELETE CASCADE to votes) takes their votes out of vote_counts."""
+    alice = await _make_test_user(db_session)
+    bob = await _make_test_user(db_session)
+    item = f"deleted-user-{uuid.uuid4().hex}"
+    await save_or_update_vote(db_session, alice.id, SectionType.news, item, VoteType.up)
+    await save_or_update_vote(db_session, bob.id, SectionType.news, item, VoteType.down)
+    await db_session.delete(alice)
+    await db_session.commit()
+    assert (await get_vote_counts(db_session, SectionType.news, [item]))[item] == (0, 1)
+
+async def test_top_voted_orders_by_up_count(db_session: AsyncSession):
+    """top_voted returns the most up-voted items of a section first."""
+    users = [await _make_test_user(db_session) for _ in range(3)]
+    section = SectionType.meme
+    prefix = f"top-{uuid.uuid4().hex}"
+    for n, user in enumerate(users):
+        # item-0 gets 3 up votes, item-1 gets 2, item-2 gets 1
+        ops = [("vote", section, f"{prefix}-{i}", VoteType.up) for i in range(n + 1)]
+        await apply_vote_batch(db_session, user.id, ops)
+    top = [t for t in await top_voted(db_session, section, 100) if t[0].startswith(prefix)]
+    assert [(item_id, up) for item_id, up, _ in top] == [
+        (f"{prefix}-0", 3), (f"{prefix}-1", 2), (f"{prefix}-2", 1),
+    ]
+
+
+async def test_list_user_votes_keyset_pages(db_session: AsyncSession):
+    """Pages follow (created_at, id) newest first without gaps or repeats."""
+    user = await _make_test_user(db_session)
+    # one batch: all rows share created_at, so the id tie-breaker decides the order
+    await apply_vote_batch(db_session, user.id, [("vote", SectionType.news, f"h{i}", VoteType.up) for i in range(5)])
+    await save_or_update_vote(db_session, user.id, SectionType.meme, "latest", VoteType.down)
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = await list_user_votes(db_session, user.id, 2, cursor)
+        seen.extend(item_id for _, item_id, _, _ in rows)
+        if cursor is None:
+            break
+    assert seen[0] == "latest"
+    assert sorted(seen) == sorted(["latest"] + [f"h{i}" for i in range(5)])
+
+
+async def test_list_user_votes_invalid_cursor_raises(db_session: AsyncSession):
+    user = await _make_test_user(db_session)
+    with pytest.raises(ValueError):
+        await list_user_votes(db_session, user.id, 10, "not-a-cursor")
@@ -0,0 +1,63 @@
+"""Unit tests for SingleFlight (sync and async call coalescing)."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_do_coalesces_concurrent_callers():
+    """Concurrent callers with the same key share one execution and its result."""
+    flight = SingleFlight("test-sync")
+    calls = 0
+    started = threading.Event()
+
+    def work() -> int:
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.2)
+        return 42
+
+    results: list[int] = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join()
+    assert results == [42] * 5
+    assert calls == 1
+    assert flight.stats()["coalesced"] == 4
+
+
+def test_do_propagates_exception_and_forgets_key():
+    """The leader's exception is raised; the next call runs again."""
+    flight = SingleFlight("test-error")
+    with pytest.raises(RuntimeError):
+        flight.do("k", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    assert flight.do("k", lambda: "ok") == "ok"
+    assert flight.stats()["executions"] == 2
+
+
+def test_do_async_coalesces_concurrent_callers():
+    flight = SingleFlight("test-async")
+    calls = 0
+
+    async def work() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main() -> list[str]:
+        return await asyncio.gather(*(flight.do_async("k", work) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["done"] * 10
+    assert calls == 1
+    assert flight.stats()["coalesced"] == 9
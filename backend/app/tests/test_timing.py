@@ -0,0 +1,73 @@
+"""Unit tests for per-request timing (Server-Timing)."""
+
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core import timing
+from app.core.timing import (
+    TimedJSONResponse,
+    TimingMiddleware,
+    server_timing_header,
+    summarize,
+    timed,
+)
+from app.db.query_log import instrument_queries
+
+
+def _app() -> FastAPI:
+    app = FastAPI(default_response_class=TimedJSONResponse)
+    app.add_middleware(TimingMiddleware)
+
+    @app.get("/work")
+    def work() -> dict[str, bool]:
+        with timed("news"):
+            pass
+        with timed("news"):
+            pass
+        return {"ok": True}
+
+    return app
+
+
+def test_timed_is_noop_outside_sampled_request():
+    with timed("news"):
+        pass  # no current request: nothing recorded, no error
+
+
+def test_summarize_sums_repeated_names_in_order():
+    totals = summarize([("auth", 0.001), ("db", 0.002), ("auth", 0.003)])
+    assert list(totals) == ["auth", "db"]
+    assert round(totals["auth"], 3) == 4.0
+    assert server_timing_header({"db": 2.0}, 5.25) == "db;dur=2.0, total;dur=5.2"
+
+
+def test_middleware_adds_server_timing_when_sampled():
+    with patch("app.core.timing.get_settings") as mock_settings:
+        mock_settings.return_value.TIMING_SAMPLE_RATE = 1.0
+        res = TestClient(_app()).get("/work")
+    assert res.status_code == 200
+    names = [part.split(";")[0] for part in res.headers["server-timing"].split(", ")]
+    assert names == ["news", "render", "total"]
+
+
+def test_middleware_skips_unsampled_requests():
+    with patch("app.core.timing.get_settings") as mock_settings:
+        mock_settings.return_value.TIMING_SAMPLE_RATE = 0.0
+        res = TestClient(_app()).get("/work")
+    assert "server-timing" not in res.headers
+
+
+def test_instrument_queries_records_db_time():
+    engine = create_engine("sqlite://")
+    instrument_queries(engine)
+    timings: list[tuple[str, float]] = []
+    token = timing._timings.set(timings)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        timing._timings.reset(token)
+    assert [name for name, _ in timings] == ["db"]
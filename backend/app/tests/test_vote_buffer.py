@@ -0,0 +1,131 @@
+"""Unit tests for the write-behind vote buffer (no DB: writes are mocked)."""
+
+import json
+import os
+import threading
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services import vote_buffer
+from app.services.vote_buffer import (
+    VoteBufferFull,
+    clear_vote_buffer,
+    enqueue_votes,
+    flush_votes,
+    start_vote_buffer,
+    stop_vote_buffer,
+    vote_buffer_stats,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def buffer_settings(tmp_path):
+    clear_vote_buffer()
+    with patch("app.services.vote_buffer.get_settings") as mock_settings:
+        mock_settings.return_value.VOTE_LOG_PATH = str(tmp_path / "votes.jsonl")
+        mock_settings.return_value.VOTE_BUFFER_MAX_PENDING = 3
+        mock_settings.return_value.VOTE_FLUSH_INTERVAL = 60
+        mock_settings.return_value.VOTE_FLUSH_MAX_BATCH = 100
+        yield mock_settings.return_value
+    clear_vote_buffer()
+
+
+def _log_lines(settings) -> list[dict]:
+    with open(settings.VOTE_LOG_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+async def test_enqueue_logs_then_flush_writes_latest_state(buffer_settings):
+    user = uuid.uuid4()
+    with patch.object(vote_buffer, "_write_states", new=AsyncMock()) as write:
+        await start_vote_buffer()
+        try:
+            enqueue_votes(user, [("vote", "news", " n1 ", "up"), ("vote", "price", "BTC", "up")])
+            enqueue_votes(user, [("vote", "news", "n1", "down")])
+            assert len(_log_lines(buffer_settings)) == 3
+
+            assert await flush_votes() == 2
+            write.assert_awaited_once_with(
+                {(user, "news", "n1"): ("vote", "down"), (user, "price", "BTC"): ("vote", "up")}
+            )
+            assert _log_lines(buffer_settings) == []
+            stats = vote_buffer_stats()
+            assert stats["pending"] == 0
+            assert stats["last_flush_size"] == 2
+        finally:
+            await stop_vote_buffer()
+
+
+async def test_failed_flush_keeps_votes_queued(buffer_settings):
+    user = uuid.uuid4()
+    with patch.object(vote_buffer, "_write_states", new=AsyncMock(side_effect=OSError("db down"))):
+        await start_vote_buffer()
+        enqueue_votes(user, [("cancel", "meme", "m1", None)])
+        with pytest.raises(OSError):
+            await flush_votes()
+        assert vote_buffer_stats()["pending"] == 1
+        assert vote_buffer_stats()["flush_failures"] == 1
+        await stop_vote_buffer()
+    assert len(_log_lines(buffer_settings)) == 1
+
+
+async def test_start_replays_log(buffer_settings):
+    user = uuid.uuid4()
+    entries = [
+        {"u": str(user), "s": "ai", "i": "insight", "op": "vote", "v": "up"},
+        {"u": str(user), "s": "ai", "i": "insight", "op": "cancel", "v": None},
+    ]
+    with open(buffer_settings.VOTE_LOG_PATH, "w", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e) + "\n" for e in entries) + '{"u": "torn')
+    with patch.object(vote_buffer, "_write_states", new=AsyncMock()) as write:
+        await start_vote_buffer()
+        assert vote_buffer_stats()["replayed"] == 2
+        await stop_vote_buffer()
+    write.assert_awaited_once_with({(user, "ai", "insight"): ("cancel", None)})
+
+
+async def test_full_buffer_rejects_new_items(buffer_settings):
+    user = uuid.uuid4()
+    with patch.object(vote_buffer, "_write_states", new=AsyncMock()):
+        await start_vote_buffer()
+        try:
+            enqueue_votes(user, [("vote", "news", f"n{i}", "up") for i in range(3)])
+            with pytest.raises(VoteBufferFull):
+                enqueue_votes(user, [("vote", "news", "n3", "up")])
+            # updates to pending items are still accepted
+            enqueue_votes(user, [("vote", "news", "n0", "down")])
+            with pytest.raises(ValueError):
+                enqueue_votes(user, [("vote", "news", "  ", "up")])
+        finally:
+            await stop_vote_buffer()
+
+
+async def test_votes_enqueued_during_log_rewrite_are_kept(buffer_settings):
+    user = uuid.uuid4()
+    fsync = os.fsync
+    during_rewrite: list[threading.Thread] = []
+
+    def fsync_snapshot(fd: int) -> None:
+        # the first fsync of the flush is the compacted snapshot: enqueue while it runs
+        if not during_rewrite:
+            t = threading.Thread(target=enqueue_votes, args=(user, [("vote", "meme", "m2", "up")]))
+            during_rewrite.append(t)
+            t.start()
+            t.join(5)
+            assert not t.is_alive(), "enqueue_votes blocked behind the log rewrite"
+        fsync(fd)
+
+    with patch.object(vote_buffer, "_write_states", new=AsyncMock()):
+        await start_vote_buffer()
+        try:
+            enqueue_votes(user, [("vote", "meme", "m1", "up")])
+            with patch.object(vote_buffer.os, "fsync", side_effect=fsync_snapshot):
+                assert await flush_votes() == 1
+            assert [e["i"] for e in _log_lines(buffer_settings)] == ["m2"]
+            assert vote_buffer_stats()["pending"] == 1
+        finally:
+            await stop_vote_buffer()
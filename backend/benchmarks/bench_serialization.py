@@ -0,0 +1,106 @@
+"""
+Per-response serialization cost on the hot endpoints: FastAPI's response_model path (response
+model built from the data, re-validated against response_model, dumped to a dict and encoded with
+json.dumps by TimedJSONResponse) vs. the fast path (the same data as plain dicts, encoded by
+FastJSONResponse with orjson, or stdlib json when orjson is not installed). Both must produce the
+same bytes.
+
+Run from backend/:  python -m benchmarks.bench_serialization [iterations]
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from fastapi.utils import create_model_field
+from pydantic import BaseModel
+
+from app.core import responses
+from app.core.responses import FastJSONResponse
+from app.core.timing import TimedJSONResponse
+from app.schemas.dashboard import NewsItem, NewsResponse, PricesResponse
+from app.schemas.vote import VoteHistoryItem, VoteHistoryResponse
+
+
+def _news() -> list[NewsItem]:
+    return [
+        NewsItem(
+            id=f"{i:016x}",
+            title=f"Bitcoin and Ethereum see institutional inflows, week {i}",
+            url=f"https://www.cryptocompare.com/news/article-{i}/",
+            source="CryptoCompare",
+            published_at="2025-01-01T12:00:00Z",
+            coins=["BTC", "ETH"],
+        )
+        for i in range(50)
+    ]
+
+
+def _history_rows() -> list[tuple[str, str, str, datetime]]:
+    now = datetime.now(timezone.utc)
+    return [("news", f"https://example.com/{i}", "up", now - timedelta(minutes=i)) for i in range(100)]
+
+
+def _cases() -> dict[str, tuple[type[BaseModel], Callable[[], BaseModel], Callable[[], dict]]]:
+    """name -> (response model, response_model content, fast path content)."""
+    prices = {f"C{i}": 1000.0 + i for i in range(10)}
+    news = _news()
+    rows = _history_rows()
+    return {
+        "/dashboard/prices": (
+            PricesResponse,
+            lambda: PricesResponse(prices=prices, message=None),
+            lambda: {"prices": prices, "message": None},
+        ),
+        "/dashboard/news (50 items)": (
+            NewsResponse,
+            lambda: NewsResponse(news=news, next_cursor="abc", message=None),
+            lambda: {"news": news, "next_cursor": "abc", "message": None},
+        ),
+        "/vote/mine (100 items)": (
+            VoteHistoryResponse,
+            lambda: VoteHistoryResponse(
+                votes=[VoteHistoryItem(section_type=s, item_id=i, vote_type=v, created_at=c) for s, i, v, c in rows]
+            ),
+            lambda: {
+                "votes": [
+                    {"section_type": s, "item_id": i, "vote_type": v, "created_at": c} for s, i, v, c in rows
+                ],
+                "next_cursor": None,
+            },
+        ),
+    }
+
+
+def _per_call_us(fn: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 5000) -> None:
+    encoder = "orjson" if responses.orjson is not None else "stdlib json"
+    print(f"iterations: {iterations}, fast path encoder: {encoder}")
+    print(f"{'endpoint':<28}{'response_model':>16}{'fast path':>12}{'saving':>16}")
+    for name, (model, validated, plain) in _cases().items():
+        field = create_model_field(name="Response_" + model.__name__, type_=model, mode="serialization")
+
+        def default_path() -> bytes:
+            # what fastapi.routing.serialize_response does for a route with response_model
+            value, errors = field.validate(validated(), {}, loc=("response",))
+            assert not errors
+            return TimedJSONResponse(field.serialize(value, by_alias=True)).body
+
+        def fast_path() -> bytes:
+            return FastJSONResponse(plain()).body
+
+        assert default_path() == fast_path(), name
+        slow = _per_call_us(default_path, iterations)
+        fast = _per_call_us(fast_path, iterations)
+        print(f"{name:<28}{slow:>13.1f} us{fast:>9.1f} us{slow - fast:>9.1f} us ({slow / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,215 @@
+"""
+Local stand-ins for the upstream providers (CoinGecko, Binance, CryptoCompare, OpenRouter) so load
+tests never touch the real APIs. Each provider can be given a latency (plus jitter), an error rate
+(503) and a rate-limit rate (429 with Retry-After); GET /_stats returns per-provider call counts.
+
+Run from backend/ and start the API with the printed environment:
+
+  python -m benchmarks.fake_providers --port 9100 --latency-ms 80 --error-rate 0.02 \\
+      --provider openrouter=1500,0,0.1
+
+benchmarks.load_suite starts this server itself unless it is given --url.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.models.enums import AssetSymbol
+from app.services.coin_service import ASSET_TO_COINGECKO_ID
+
+PROVIDERS = ("coingecko", "binance", "cryptocompare", "openrouter")
+
+
+@dataclass
+class ProviderBehavior:
+    """How one fake provider answers: delay, then maybe a 429 or a 503, else a valid payload."""
+
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+
+@dataclass
+class ProviderStats:
+    calls: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    by_status: dict[int, int] = field(default_factory=dict)
+
+
+def parse_provider_override(value: str) -> tuple[str, ProviderBehavior]:
+    """Parse NAME=latency_ms[,error_rate[,rate_limit_rate]] (e.g. openrouter=1500,0,0.1)."""
+    name, _, spec = value.partition("=")
+    if name not in PROVIDERS or not spec:
+        raise argparse.ArgumentTypeError(f"expected one of {', '.join(PROVIDERS)}=latency_ms[,error_rate[,rate_limit_rate]]")
+    parts = [float(p) for p in spec.split(",")]
+    behavior = ProviderBehavior(latency_ms=parts[0])
+    if len(parts) > 1:
+        behavior.error_rate = parts[1]
+    if len(parts) > 2:
+        behavior.rate_limit_rate = parts[2]
+    return name, behavior
+
+
+def provider_env(base_url: str) -> dict[str, str]:
+    """API settings that point every provider at a fake server on base_url."""
+    base_url = base_url.rstrip("/")
+    return {
+        "COINGECKO_API_URL": f"{base_url}/coingecko/api/v3/simple/price",
+        "BINANCE_TICKER_URL": f"{base_url}/binance/api/v3/ticker/price",
+        "CRYPTOCOMPARE_NEWS_URL": f"{base_url}/cryptocompare/data/v2/news/",
+        "OPENROUTER_URL": f"{base_url}/openrouter/api/v1/chat/completions",
+        "OPENROUTER_API_KEY": "fake-provider-key",
+    }
+
+
+def _prices(rng: random.Random) -> dict[str, float]:
+    return {sym.value: round(rng.uniform(0.01, 60000), 4) for sym in AssetSymbol}
+
+
+def _articles(count: int = 60) -> list[dict]:
+    symbols = [s.value for s in AssetSymbol]
+    now = int(time.time())
+    return [
+        {
+            "id": str(100000 + i),
+            "title": f"{symbols[i % len(symbols)]} market update #{i}",
+            "url": f"https://news.example.com/articles/{i}",
+            "published_on": now - i * 600,
+            "categories": f"{symbols[i % len(symbols)]}|MARKET",
+            "body": f"Traders watch {symbols[(i * 7) % len(symbols)]} and {symbols[i % len(symbols)]}.",
+        }
+        for i in range(count)
+    ]
+
+
+def create_app(behaviors: dict[str, ProviderBehavior], seed: int | None = None) -> FastAPI:
+    """Fake provider app; `behaviors` maps provider name -> ProviderBehavior (defaults if missing)."""
+    app = FastAPI(title="Fake providers")
+    rng = random.Random(seed)
+    prices = _prices(rng)
+    articles = _articles()
+    stats = {name: ProviderStats() for name in PROVIDERS}
+
+    async def simulate(name: str) -> JSONResponse | None:
+        """Apply the provider's latency; return an error response when this call should fail."""
+        behavior = behaviors.get(name) or ProviderBehavior()
+        s = stats[name]
+        s.calls += 1
+        delay = behavior.latency_ms + rng.uniform(-behavior.jitter_ms, behavior.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = rng.random()
+        if roll < behavior.rate_limit_rate:
+            s.rate_limited += 1
+            s.by_status[429] = s.by_status.get(429, 0) + 1
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "1"})
+        if roll < behavior.rate_limit_rate + behavior.error_rate:
+            s.errors += 1
+            s.by_status[503] = s.by_status.get(503, 0) + 1
+            return JSONResponse({"error": "unavailable"}, status_code=503)
+        s.by_status[200] = s.by_status.get(200, 0) + 1
+        return None
+
+    @app.get("/coingecko/api/v3/simple/price")
+    async def coingecko(request: Request):
+        if (failed := await simulate("coingecko")) is not None:
+            return failed
+        ids = set((request.query_params.get("ids") or "").split(","))
+        return {
+            cg_id: {"usd": prices[sym.value]}
+            for sym, cg_id in ASSET_TO_COINGECKO_ID.items()
+            if cg_id in ids
+        }
+
+    @app.get("/binance/api/v3/ticker/price")
+    async def binance():
+        if (failed := await simulate("binance")) is not None:
+            return failed
+        return [{"symbol": f"{sym}USDT", "price": str(price)} for sym, price in prices.items()]
+
+    @app.get("/cryptocompare/data/v2/news/")
+    async def cryptocompare():
+        if (failed := await simulate("cryptocompare")) is not None:
+            return failed
+        return {"Type": 100, "Message": "News list successfully returned", "Data": articles}
+
+    @app.post("/openrouter/api/v1/chat/completions")
+    async def openrouter(request: Request):
+        if (failed := await simulate("openrouter")) is not None:
+            return failed
+        body = await request.json()
+        return {
+            "model": body.get("model"),
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": "Markets are mixed today; volatility stays elevated across large caps. "
+                        "Position sizing and a long horizon matter more than short-term moves.",
+                    }
+                }
+            ],
+        }
+
+    @app.get("/_stats")
+    async def provider_stats():
+        return {
+            name: {"calls": s.calls, "errors": s.errors, "rate_limited": s.rate_limited, "by_status": s.by_status}
+            for name, s in stats.items()
+        }
+
+    return app
+
+
+def add_behavior_args(parser: argparse.ArgumentParser) -> None:
+    """CLI flags shared with load_suite: default behaviour for all providers plus overrides."""
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Provider response delay")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- delay added per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument(
+        "--provider",
+        action="append",
+        type=parse_provider_override,
+        default=[],
+        metavar="NAME=LATENCY_MS[,ERROR_RATE[,RATE_LIMIT_RATE]]",
+        help="Override one provider (repeatable)",
+    )
+
+
+def behaviors_from_args(args: argparse.Namespace) -> dict[str, ProviderBehavior]:
+    behaviors = {
+        name: ProviderBehavior(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate)
+        for name in PROVIDERS
+    }
+    for name, behavior in args.provider:
+        behavior.jitter_ms = args.jitter_ms
+        behaviors[name] = behavior
+    return behaviors
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=None)
+    add_behavior_args(parser)
+    args = parser.parse_args()
+
+    for key, value in provider_env(f"http://{args.host}:{args.port}").items():
+        print(f"{key}={value}")
+    uvicorn.run(create_app(behaviors_from_args(args), seed=args.seed), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Load benchmark: many concurrent clients against a running API; reports requests/sec and latency
+percentiles per target. Run it against two builds to compare them, e.g. the previous (sync) build
+on :8000 and the current (async) build on :8001:
+
+  python -m benchmarks.load_dashboard --url http://localhost:8000 --url http://localhost:8001 \\
+      --concurrency 500 --duration 30 --path /dashboard/prices --path /dashboard
+
+Each target gets its own benchmark user (signup, login, onboarding) before the timed run.
+"""
+
+import argparse
+import asyncio
+import math
+import time
+import uuid
+
+import httpx
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+async def create_bench_user(
+    client: httpx.AsyncClient, email: str | None = None, password: str = "bench-password"
+) -> dict[str, str]:
+    """Sign up, log in and onboard a throwaway user; return its Authorization header."""
+    email = email or f"bench-{uuid.uuid4().hex}@example.com"
+    res = await client.post("/auth/signup", json={"email": email, "name": "Bench", "password": password})
+    res.raise_for_status()
+    res = await client.post("/auth/login", json={"email": email, "password": password})
+    res.raise_for_status()
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+    res = await client.post(
+        "/onboarding/",
+        headers=headers,
+        json={"assets": ["BTC", "ETH"], "investor_type": "HODLer", "content_types": ["news", "price", "ai", "meme"]},
+    )
+    res.raise_for_status()
+    # Log in again to get an access token carrying the new preferences claim (where supported)
+    res = await client.post("/auth/login", json={"email": email, "password": password})
+    res.raise_for_status()
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+async def run_load(
+    url: str,
+    paths: list[str],
+    concurrency: int,
+    duration: float,
+    headers: dict[str, str] | None = None,
+    timeout: float = 60.0,
+) -> dict[str, float]:
+    """Drive `concurrency` clients over `paths` (round-robin) for `duration` seconds."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies: list[float] = []
+    errors = 0
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        if headers is None:
+            headers = await create_bench_user(client)
+        deadline = time.perf_counter() + duration
+
+        async def worker(n: int) -> None:
+            nonlocal errors
+            i = n
+            while time.perf_counter() < deadline:
+                path = paths[i % len(paths)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    res = await client.get(path, headers=headers)
+                    ok = res.status_code < 500
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def print_report(results: dict[str, dict[str, float]]) -> None:
+    print(f"{'target':<32} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for target, r in results.items():
+        print(
+            f"{target:<32} {r['requests']:>9.0f} {r['errors']:>7.0f} {r['rps']:>9.1f} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", required=True, help="API base URL (repeat to compare builds)")
+    parser.add_argument("--path", action="append", help="GET path to hit (repeatable; default /dashboard)")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per target")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    for url in args.url:
+        results[url] = await run_load(url, args.path or ["/dashboard"], args.concurrency, args.duration)
+    print_report(results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
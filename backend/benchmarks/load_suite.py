@@ -0,0 +1,218 @@
+"""
+Offline load suite: drives POST /auth/login, GET /dashboard and POST /vote at a fixed concurrency and
+reports requests/sec and p50/p95/p99 per scenario. Upstream providers are local fakes
+(benchmarks.fake_providers) with configurable latency, error rate and 429s, so runs are repeatable
+and never hit CoinGecko, CryptoCompare or OpenRouter. The API still needs its PostgreSQL database.
+
+Run from backend/. By default the suite starts the fake providers and the API (uvicorn) itself:
+
+  python -m benchmarks.load_suite --concurrency 100 --duration 20 --latency-ms 80 \\
+      --provider openrouter=1500,0,0.1 --json results/v1.4.json --baseline results/v1.3.json
+
+With --url it targets an already running API (start it with the fake_providers environment).
+--json saves the results; --baseline compares against a previous --json file to spot regressions.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_providers import PROVIDERS, add_behavior_args, provider_env
+from benchmarks.load_dashboard import create_bench_user, percentile, print_report
+
+SCENARIOS = ("login", "dashboard", "vote")
+SECTION_TYPES = ("news", "price", "ai", "meme")
+BENCH_PASSWORD = "bench-password"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# One request of a scenario: (client, user index, rng) -> response
+RequestFn = Callable[[httpx.AsyncClient, int, random.Random], Awaitable[httpx.Response]]
+
+
+class BenchUsers:
+    """Throwaway users created before the timed runs (login credentials and access tokens)."""
+
+    def __init__(self) -> None:
+        self.emails: list[str] = []
+        self.headers: list[dict[str, str]] = []
+
+    async def create(self, client: httpx.AsyncClient, count: int) -> None:
+        for _ in range(count):
+            email = f"bench-{uuid.uuid4().hex}@example.com"
+            self.headers.append(await create_bench_user(client, email, BENCH_PASSWORD))
+            self.emails.append(email)
+
+
+def scenario_requests(users: BenchUsers, vote_items: int) -> dict[str, RequestFn]:
+    async def login(client: httpx.AsyncClient, n: int, rng: random.Random) -> httpx.Response:
+        email = users.emails[n % len(users.emails)]
+        return await client.post("/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+
+    async def dashboard(client: httpx.AsyncClient, n: int, rng: random.Random) -> httpx.Response:
+        return await client.get("/dashboard", headers=users.headers[n % len(users.headers)])
+
+    async def vote(client: httpx.AsyncClient, n: int, rng: random.Random) -> httpx.Response:
+        body = {
+            "section_type": rng.choice(SECTION_TYPES),
+            "item_id": f"bench-item-{rng.randrange(vote_items)}",
+            "vote_type": rng.choice(("up", "down")),
+        }
+        return await client.post("/vote/", json=body, headers=users.headers[n % len(users.headers)])
+
+    return {"login": login, "dashboard": dashboard, "vote": vote}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, request: RequestFn, concurrency: int, duration: float, seed: int
+) -> dict[str, float]:
+    """Run `concurrency` workers issuing `request` for `duration` seconds; non-2xx count as errors."""
+    latencies: list[float] = []
+    errors = 0
+    statuses: dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed * 100003 + n)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                res = await request(client, n, rng)
+                status = str(res.status_code)
+            except httpx.HTTPError:
+                status = "transport_error"
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not status.isdigit() or not 200 <= int(status) < 300:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "statuses": statuses,
+    }
+
+
+def print_comparison(results: dict[str, dict], baseline: dict[str, dict]) -> None:
+    """Change vs a previous run per scenario (positive rps / negative latency deltas are better)."""
+    print(f"\n{'vs baseline':<32} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+
+        def delta(key: str) -> str:
+            return f"{(r[key] - base[key]) / base[key] * 100:+.1f}%" if base[key] else "n/a"
+
+        print(f"{name:<32} {delta('rps'):>9} {delta('p50_ms'):>9} {delta('p95_ms'):>9} {delta('p99_ms'):>9}")
+
+
+async def wait_until_up(url: str, path: str = "/health", timeout: float = 60.0) -> None:
+    """Poll url + path until it answers 200."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=2.0) as client:
+        while True:
+            try:
+                if (await client.get(path)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+            await asyncio.sleep(0.25)
+
+
+def start_process(args: list[str], env: dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env={**os.environ, **env})
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Running API to target (default: start fake providers and the API)")
+    parser.add_argument("--api-port", type=int, default=8010)
+    parser.add_argument("--providers-port", type=int, default=9100)
+    parser.add_argument("--api-env", action="append", default=[], metavar="KEY=VALUE", help="Extra setting for the started API")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenario to run (repeatable; default all)")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per scenario")
+    parser.add_argument("--users", type=int, default=10, help="Benchmark users (requests rotate over them)")
+    parser.add_argument("--vote-items", type=int, default=200, help="Distinct item ids votes are spread over")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--baseline", type=Path, help="Previous --json file to compare against")
+    add_behavior_args(parser)
+    args = parser.parse_args()
+
+    processes: list[subprocess.Popen] = []
+    url = args.url
+    providers_url = f"http://127.0.0.1:{args.providers_port}"
+    try:
+        if url is None:
+            behavior_args = ["--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+                             "--error-rate", str(args.error_rate), "--rate-limit-rate", str(args.rate_limit_rate),
+                             "--port", str(args.providers_port), "--seed", str(args.seed)]
+            for name, b in args.provider:
+                behavior_args += ["--provider", f"{name}={b.latency_ms},{b.error_rate},{b.rate_limit_rate}"]
+            processes.append(start_process(["-m", "benchmarks.fake_providers", *behavior_args], {}))
+            await wait_until_up(providers_url, "/_stats")
+            api_env = provider_env(providers_url)
+            api_env.update(kv.split("=", 1) for kv in args.api_env)
+            processes.append(start_process(
+                ["-m", "uvicorn", "app.main:app", "--port", str(args.api_port), "--log-level", "warning"], api_env
+            ))
+            url = f"http://127.0.0.1:{args.api_port}"
+            await wait_until_up(url)
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+            users = BenchUsers()
+            await users.create(client, max(1, args.users))
+            requests = scenario_requests(users, max(1, args.vote_items))
+            results: dict[str, dict] = {}
+            for name in args.scenario or SCENARIOS:
+                results[name] = await run_scenario(client, requests[name], args.concurrency, args.duration, args.seed)
+
+        print_report(results)
+        for name, r in results.items():
+            print(f"{name:<32} statuses: {r['statuses']}")
+        if not args.url:
+            async with httpx.AsyncClient(base_url=providers_url) as client:
+                upstream = (await client.get("/_stats")).json()
+            for name in PROVIDERS:
+                print(f"upstream {name:<23} {upstream[name]}")
+
+        if args.baseline:
+            print_comparison(results, json.loads(args.baseline.read_text())["results"])
+        if args.json:
+            args.json.parent.mkdir(parents=True, exist_ok=True)
+            meta = {k: v for k, v in vars(args).items() if k not in ("json", "baseline", "provider")}
+            meta["provider"] = [f"{n}={b.latency_ms},{b.error_rate},{b.rate_limit_rate}" for n, b in args.provider]
+            meta["started_api"] = not args.url
+            args.json.write_text(json.dumps({"meta": meta, "results": results}, indent=2, default=str))
+    finally:
+        for proc in reversed(processes):
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
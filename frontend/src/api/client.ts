@@ -3,6 +3,7 @@ import axios from 'axios'
 const baseURL = import.meta.env.VITE_API_BASE_URL ?? 'http://localhost:8000'
 
 const TOKEN_KEY = 'auth_token'
+const REFRESH_TOKEN_KEY = 'auth_refresh_token'
 
 export const apiClient = axios.create({
   baseURL,
@@ -20,8 +21,18 @@ export function setStoredToken(token: string): void {
   localStorage.setItem(TOKEN_KEY, token)
 }
 
+export function getStoredRefreshToken(): string | null {
+  return localStorage.getItem(REFRESH_TOKEN_KEY)
+}
+
+export function setStoredRefreshToken(token: string | null | undefined): void {
+  if (token) localStorage.setItem(REFRESH_TOKEN_KEY, token)
+  else localStorage.removeItem(REFRESH_TOKEN_KEY)
+}
+
 export function clearStoredToken(): void {
   localStorage.removeItem(TOKEN_KEY)
+  localStorage.removeItem(REFRESH_TOKEN_KEY)
 }
 
 apiClient.interceptors.request.use((config) => {
@@ -29,3 +40,39 @@ apiClient.interceptors.request.use((config) => {
   if (token) config.headers.Authorization = `Bearer ${token}`
   return config
 })
+
+// Access tokens are short-lived: on 401, exchange the refresh token once and retry.
+// Concurrent 401s share one refresh request.
+let refreshing: Promise<string | null> | null = null
+
+async function refreshAccessToken(): Promise<string | null> {
+  const refreshToken = getStoredRefreshToken()
+  if (!refreshToken) return null
+  try {
+    const { data } = await axios.post<{ access_token: string; refresh_token?: string }>(
+      `${baseURL}/auth/refresh`,
+      { refresh_token: refreshToken },
+    )
+    setStoredToken(data.access_token)
+    setStoredRefreshToken(data.refresh_token)
+    return data.access_token
+  } catch {
+    clearStoredToken()
+    return null
+  }
+}
+
+apiClient.interceptors.response.use(undefined, async (error) => {
+  const config = error.config
+  if (error.response?.status !== 401 || !config || config._retried || config.url?.startsWith('/auth/')) {
+    return Promise.reject(error)
+  }
+  refreshing ??= refreshAccessToken().finally(() => {
+    refreshing = null
+  })
+  const token = await refreshing
+  if (!token) return Promise.reject(error)
+  config._retried = true
+  config.headers.Authorization = `Bearer ${token}`
+  return apiClient(config)
+})
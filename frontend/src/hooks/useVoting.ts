@@ -1,5 +1,6 @@
 import { useCallback, useState } from 'react'
 import { deleteVote, postVote } from '../api'
+import type { ItemVotes } from '../types/dashboard'
 import type { SectionType, VoteType } from '../types/vote'
 
 function voteKey(section: SectionType, itemId: string): string {
@@ -23,6 +24,15 @@ export function useVoting() {
     []
   )
 
+  /** Replace local state with the user's votes as returned by GET /dashboard. */
+  const seedVotes = useCallback((items: ItemVotes[]) => {
+    const next: Record<string, VoteType> = {}
+    for (const item of items) {
+      if (item.my_vote) next[voteKey(item.section_type, item.item_id)] = item.my_vote
+    }
+    setVotes(next)
+  }, [])
+
   const vote = useCallback(
     async (section: SectionType, itemId: string, voteType: VoteType) => {
       const key = voteKey(section, itemId)
@@ -81,5 +91,5 @@ export function useVoting() {
     [loadingKeys]
   )
 
-  return { vote, cancelVote, getVote, isLoading }
+  return { vote, cancelVote, getVote, isLoading, seedVotes }
 }
@@ -5,13 +5,14 @@ import { useVoting } from '../hooks/useVoting'
 import { useAuth } from '../store/AuthContext'
 import type { DashboardResponse } from '../types/dashboard'
 import { formatNewsDate } from '../utils/formatDate'
+import { aiInsightItemId } from '../utils/voteItemId'
 import './Dashboard.css'
 
 const NEWS_TITLE_MAX_CHARS = 70
 
 export default function Dashboard() {
   const { user, logout } = useAuth()
-  const { vote, cancelVote, getVote, isLoading } = useVoting()
+  const { vote, cancelVote, getVote, isLoading, seedVotes } = useVoting()
   const [data, setData] = useState<DashboardResponse | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
@@ -20,7 +21,9 @@ export default function Dashboard() {
     const controller = new AbortController()
     getDashboard(controller.signal)
       .then((res) => {
-        if (!controller.signal.aborted) setData(res)
+        if (controller.signal.aborted) return
+        setData(res)
+        seedVotes(res.votes ?? [])
       })
       .catch((err) => {
         if (err?.name === 'CanceledError' || err?.name === 'AbortError' || err?.code === 'ERR_CANCELED') return
@@ -31,7 +34,7 @@ export default function Dashboard() {
         if (!controller.signal.aborted) setLoading(false)
       })
     return () => controller.abort()
-  }, [])
+  }, [seedVotes])
 
   return (
     <div className="dashboard">
@@ -48,6 +51,9 @@ export default function Dashboard() {
       {!loading && !error && !data && null}
       {!loading && !error && data && (
         <>
+      {Object.values(data.section_status ?? {}).some((s) => s !== 'fresh') && (
+        <p className="dashboard-partial">Some sections are still updating. Refresh in a moment for the latest.</p>
+      )}
       {data.news.length > 0 && (
         <section className="dashboard-section news" aria-label="News">
           <h2>News</h2>
@@ -81,34 +87,36 @@ export default function Dashboard() {
         </section>
       )}
 
-      <section className="dashboard-section prices" aria-label="Prices">
-        <h2>Price</h2>
-        {Object.keys(data.prices ?? {}).length > 0 ? (
-          <ul>
-            {Object.entries(data.prices ?? {}).map(([symbol, price]) => {
-              const priceItemId = `${symbol}|${Number(price)}`
-              return (
-                <li key={priceItemId} className="section-item">
-                  <div className="item-content">
-                    <span className="symbol">{symbol}</span>
-                    <span>${Number(price).toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 6 })}</span>
-                  </div>
-                  <VoteButtons
-                    sectionType="price"
-                    itemId={priceItemId}
-                    currentVote={getVote('price', priceItemId)}
-                    onVote={vote}
-                    onCancel={cancelVote}
-                    loading={isLoading('price', priceItemId)}
-                  />
-                </li>
-              )
-            })}
-          </ul>
-        ) : (
-          <p className="prices-unavailable">Price service is currently unavailable. Please try again later.</p>
-        )}
-      </section>
+      {(!data.sections || data.sections.includes('price')) && (
+        <section className="dashboard-section prices" aria-label="Prices">
+          <h2>Price</h2>
+          {Object.keys(data.prices ?? {}).length > 0 ? (
+            <ul>
+              {Object.entries(data.prices ?? {}).map(([symbol, price]) => {
+                const priceItemId = `${symbol}|${Number(price)}`
+                return (
+                  <li key={priceItemId} className="section-item">
+                    <div className="item-content">
+                      <span className="symbol">{symbol}</span>
+                      <span>${Number(price).toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 6 })}</span>
+                    </div>
+                    <VoteButtons
+                      sectionType="price"
+                      itemId={priceItemId}
+                      currentVote={getVote('price', priceItemId)}
+                      onVote={vote}
+                      onCancel={cancelVote}
+                      loading={isLoading('price', priceItemId)}
+                    />
+                  </li>
+                )
+              })}
+            </ul>
+          ) : (
+            <p className="prices-unavailable">Price service is currently unavailable. Please try again later.</p>
+          )}
+        </section>
+      )}
 
       {data.ai_insight && (
         <section className="dashboard-section ai" aria-label="AI Insight">
@@ -117,11 +125,11 @@ export default function Dashboard() {
             <div className="item-content ai-block">{data.ai_insight}</div>
             <VoteButtons
               sectionType="ai"
-              itemId={data.ai_insight.slice(0, 255)}
-              currentVote={getVote('ai', data.ai_insight.slice(0, 255))}
+              itemId={aiInsightItemId(data)}
+              currentVote={getVote('ai', aiInsightItemId(data))}
               onVote={vote}
               onCancel={cancelVote}
-              loading={isLoading('ai', data.ai_insight.slice(0, 255))}
+              loading={isLoading('ai', aiInsightItemId(data))}
             />
           </div>
         </section>
@@ -7,7 +7,12 @@ import {
   type ReactNode,
 } from 'react'
 import { login as apiLogin, signup as apiSignup, getMe } from '../api'
-import { clearStoredToken, getStoredToken, setStoredToken } from '../api/client'
+import {
+  clearStoredToken,
+  getStoredToken,
+  setStoredRefreshToken,
+  setStoredToken,
+} from '../api/client'
 import type { User } from '../types/auth'
 import type { LoginRequest, SignupRequest } from '../types/auth'
 
@@ -62,8 +67,9 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   }, [])
 
   const login = useCallback(async (body: LoginRequest) => {
-    const { access_token } = await apiLogin(body)
+    const { access_token, refresh_token } = await apiLogin(body)
     setStoredToken(access_token)
+    setStoredRefreshToken(refresh_token)
     setStored(access_token)
     const me = await getMe()
     setUser(me)
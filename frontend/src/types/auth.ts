@@ -13,6 +13,8 @@ export interface LoginRequest {
 export interface LoginResponse {
   access_token: string
   token_type: string
+  refresh_token?: string
+  expires_in?: number
 }
 
 export interface SignupRequest {
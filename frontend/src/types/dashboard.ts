@@ -1,4 +1,7 @@
+import type { SectionType, VoteType } from './vote'
+
 export interface NewsItem {
+  id?: string
   title: string
   url: string
   source?: string
@@ -12,9 +15,24 @@ export interface MemeItem {
   image_url: string
 }
 
+export interface ItemVotes {
+  section_type: SectionType
+  item_id: string
+  up: number
+  down: number
+  my_vote: VoteType | null
+}
+
+export type SectionStatus = 'fresh' | 'stale' | 'timed_out'
+
 export interface DashboardResponse {
   news: NewsItem[]
   prices: Record<string, number>
   ai_insight: string
   meme: MemeItem | null
+  votes?: ItemVotes[]
+  /** Sections computed for this response; others are left empty */
+  sections?: SectionType[]
+  /** fresh, stale (last good value) or timed_out (left empty) per computed section */
+  section_status?: Partial<Record<SectionType, SectionStatus>>
 }
@@ -0,0 +1,11 @@
+import type { DashboardResponse } from '../types/dashboard'
+
+/** Stored form of a vote item id, as the backend normalizes it: trimmed, at most 255 code points. */
+export function normalizeItemId(itemId: string): string {
+  return Array.from(itemId.trim()).slice(0, 255).join('')
+}
+
+/** Item id of the AI insight: the one the backend returned in `votes`, else computed the same way. */
+export function aiInsightItemId(data: DashboardResponse): string {
+  return data.votes?.find((v) => v.section_type === 'ai')?.item_id ?? normalizeItemId(data.ai_insight)
+}